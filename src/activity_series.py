@@ -0,0 +1,130 @@
+"""
+Weekly activity series for repositories and contributors.
+
+A repo's history used to be reduced to its duration and one
+"x.y commits/week" string. A WeeklySeries keeps a bit more: commits and
+changed lines (insertions + deletions) per calendar week, as two flat
+`array` vectors filled while the history is aggregated (no second walk).
+Weeks start on Monday 00:00 UTC.
+
+The series is stored in the scan in a compact form:
+
+    {"start": <unix seconds of the first week's Monday>,
+     "commits": [per-week commit counts],
+     "loc": [per-week changed lines]}
+
+covering only the weeks from the first to the last active one, and the
+derived metrics (commits per week, active weeks, streaks, bursts) are
+computed from the vectors, never from the history again.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Optional
+
+WEEK_SECONDS = 7 * 86400
+
+# 1970-01-01 was a Thursday; weeks are counted from the following Monday
+_MONDAY_OFFSET = 4 * 86400
+
+# A week counts as a burst when it has at least this many times the mean
+# commits of the active weeks
+BURST_FACTOR = 2.0
+
+
+def week_of(timestamp: int) -> int:
+    """Week index (Monday-based, UTC) of a unix timestamp."""
+    return (int(timestamp) - _MONDAY_OFFSET) // WEEK_SECONDS
+
+
+def week_start(week: int) -> int:
+    """Unix seconds of the Monday that starts the given week index."""
+    return week * WEEK_SECONDS + _MONDAY_OFFSET
+
+
+class WeeklySeries:
+    """
+    Commits and changed lines per week. The vectors grow in both directions
+    (histories are streamed newest first, but that is not guaranteed) with
+    doubling headroom, so adding a commit is amortized O(1).
+    """
+
+    def __init__(self):
+        self._base = None            # week index of slot 0
+        self._commits = array("I")
+        self._loc = array("d")       # sampled commits add extrapolated (fractional) LOC
+
+    def _slot(self, week: int) -> int:
+        if self._base is None:
+            self._base = week
+            self._commits.append(0)
+            self._loc.append(0.0)
+        size = len(self._commits)
+        if week < self._base:
+            grow = max(self._base - week, size)
+            self._commits[0:0] = array("I", bytes(grow * self._commits.itemsize))
+            self._loc[0:0] = array("d", bytes(grow * self._loc.itemsize))
+            self._base -= grow
+        elif week >= self._base + size:
+            grow = max(week - self._base - size + 1, size)
+            self._commits.extend(array("I", bytes(grow * self._commits.itemsize)))
+            self._loc.extend(array("d", bytes(grow * self._loc.itemsize)))
+        return week - self._base
+
+    def add_commit(self, timestamp: int) -> None:
+        self._commits[self._slot(week_of(timestamp))] += 1
+
+    def remove_commit(self, timestamp: int) -> None:
+        """Takes back a commit added with add_commit."""
+        self._commits[self._slot(week_of(timestamp))] -= 1
+
+    def add_loc(self, timestamp: int, lines) -> None:
+        if lines:
+            self._loc[self._slot(week_of(timestamp))] += lines
+
+    def clear_loc(self) -> None:
+        """Drops the changed lines (commits are kept), e.g. before a sampled pass re-adds them."""
+        self._loc = array("d", bytes(len(self._loc) * self._loc.itemsize))
+
+    def _span(self):
+        """(first, last) slot holding any activity, or None when empty."""
+        active = [i for i, (c, l) in enumerate(zip(self._commits, self._loc)) if c or l]
+        if not active:
+            return None
+        return active[0], active[-1]
+
+    def compact(self) -> Optional[Dict]:
+        """The stored form (see module docstring), or None when nothing was recorded."""
+        span = self._span()
+        if span is None:
+            return None
+        first, last = span
+        return {
+            "start": week_start(self._base + first),
+            "commits": self._commits[first:last + 1].tolist(),
+            "loc": [round(v) for v in self._loc[first:last + 1]],
+        }
+
+
+def series_metrics(series: Optional[Dict]) -> Dict:
+    """
+    Metrics of a compact series:
+        active_weeks          - weeks with at least one commit
+        longest_streak_weeks  - longest run of consecutive active weeks
+        peak_week_commits     - most commits in a single week
+        burst_weeks           - weeks with >= BURST_FACTOR x the mean commits of active weeks
+    """
+    commits = array("I", series["commits"]) if series else array("I")
+    active = [c for c in commits if c]
+    streak = longest = 0
+    for c in commits:
+        streak = streak + 1 if c else 0
+        longest = max(longest, streak)
+    mean = sum(active) / len(active) if active else 0
+    return {
+        "active_weeks": len(active),
+        "longest_streak_weeks": longest,
+        "peak_week_commits": max(active, default=0),
+        "burst_weeks": sum(1 for c in active if c >= BURST_FACTOR * mean) if len(active) > 1 else 0,
+    }
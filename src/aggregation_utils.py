@@ -0,0 +1,259 @@
+"""
+One-pass per-project aggregation used by alternative_analysis.py
+
+- Indexes detailed_data once (repo_name -> repo, filename -> repo) so nothing
+  scans the project list per project
+- ProjectAccumulator folds each file in as it is seen, so the whole
+  aggregation is O(files + projects)
+- The global skill usage / contributor profiles are built from per-project
+  partials (merge_*), so projects can be analyzed in separate processes
+- Language shares are weighted by bytes (or sniffed line counts), leaving
+  out vendored / generated files (is_vendored)
+
+"""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from analysis_utils import record_epoch
+from classification import detect_activity, skill_from_ext
+
+
+def index_repositories(detailed_data: Any) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """
+    Returns (repo_name -> first repo with that name, filename -> repo holding the file).
+    Both are empty without detailed data.
+    """
+    repos_by_name: Dict[str, Dict] = {}
+    file_to_repo: Dict[str, Dict] = {}
+    if isinstance(detailed_data, dict):
+        for repo in detailed_data.get("projects", []):
+            name = repo.get("repo_name")
+            if name is not None:
+                repos_by_name.setdefault(name, repo)
+            for f in repo.get("files", []):
+                fname = f.get("filename")
+                if fname:
+                    file_to_repo[fname] = repo
+    return repos_by_name, file_to_repo
+
+
+def is_clean_file(f: Dict[str, Any]) -> bool:
+    """Real files only: no folders, no __MACOSX folder stuff, no "._" resource files mac adds."""
+    name = f["filename"]
+    if not f.get("isFile", True):
+        return False
+    if "/__MACOSX/" in name or name.startswith("__MACOSX/"):
+        return False
+    if os.path.basename(name).startswith("._"):
+        return False
+    return True
+
+
+# folders of third-party or build output, anywhere in the path
+VENDORED_DIRS = frozenset({
+    "node_modules", "bower_components", "vendor", "vendors", "third_party", "thirdparty",
+    "site-packages", ".venv", "venv", "__pycache__", "dist", "build", "target", ".next",
+    "Pods", "Carthage",
+})
+
+# generated / minified files
+GENERATED_SUFFIXES = (".min.js", ".min.css", ".map", "_pb2.py", ".pb.go", ".g.dart", ".designer.cs")
+GENERATED_NAMES = frozenset({"package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Cargo.lock"})
+
+
+def is_vendored(path: str) -> bool:
+    """Third-party / generated code that says nothing about the author's languages."""
+    parts = path.replace("\\", "/").split("/")
+    name = parts[-1]
+    if name in GENERATED_NAMES or name.lower().endswith(GENERATED_SUFFIXES):
+        return True
+    return any(part in VENDORED_DIRS for part in parts[:-1])
+
+
+class ProjectAccumulator:
+    """
+    Everything analyze_projects needs about one project, updated once per file.
+    Repo metadata is folded once per distinct repo (in first-seen order), not
+    once per file.
+    """
+
+    def __init__(self, name: str, lang_map: Dict[str, str], skill_usage: Optional[Dict[str, Dict]]):
+        self.name = name
+        self.lang_map = lang_map
+        # skill -> {"first", "last", "count"} to update; None when skills are not generated
+        self.skill_usage = skill_usage
+
+        self.clean_files = 0
+        self.first_mod = None  # epoch seconds of the known modification times, None if none known
+        self.last_mod = None
+        self.has_git_path = False  # any path (folders included) with ".git" in it
+        self.activity_counts = Counter()
+        self.langs = set()
+        self.skills = set()
+        # language -> bytes / sniffed lines / files, of non-vendored files (see language_shares)
+        self.lang_bytes = Counter()
+        self.lang_lines = Counter()
+        self.lang_files = Counter()
+        self.lines_complete = True  # every counted file had a line count
+
+        # repo / git infos (from detailed_extraction / repo_extractor)
+        self._seen_repos = set()
+        self.repo_names = {}  # dicts as insertion-ordered sets
+        self.repo_roots = {}
+        self.repo_authors = set()
+        self.repo_contributors = set()
+        self.branch_count = None
+        self.has_merges_flags = []
+        self.project_type = None
+        self.repo_duration_days = None
+        self.commit_frequency = None
+        self.commits_per_week = None
+        self.activity = None
+
+    def add_file(self, f: Dict[str, Any], repo_meta: Optional[Dict]) -> None:
+        if ".git" in f["filename"]:
+            self.has_git_path = True
+        if not is_clean_file(f):
+            return
+        self.clean_files += 1
+
+        filename = f["filename"]
+        ext = f.get("extension", "").lower()
+        category = f.get("category", "uncategorized")
+
+        # duration: based on first + last modified timestamps (unknown ones are left out)
+        file_time = record_epoch(f)
+        if file_time is not None:
+            if self.first_mod is None or file_time < self.first_mod:
+                self.first_mod = file_time
+            if self.last_mod is None or file_time > self.last_mod:
+                self.last_mod = file_time
+
+        # activity type
+        self.activity_counts[detect_activity(category, filename)] += 1
+
+        # language (prefer per-file language, fall back to filters)
+        lang = f.get("language") or self.lang_map.get(ext, "Unknown")
+        if lang != "Unknown":
+            self.langs.add(lang)
+            if not is_vendored(f.get("logical_path") or filename):
+                self.lang_bytes[lang] += f.get("size") or 0
+                self.lang_files[lang] += 1
+                if f.get("line_count") is None:
+                    self.lines_complete = False
+                else:
+                    self.lang_lines[lang] += f["line_count"]
+
+        if self.skill_usage is not None:
+            s = skill_from_ext(ext)
+            if s:
+                self.skills.add(s)
+
+                # track global usage for chronological skill list
+                info = self.skill_usage.get(s)
+                if info is None:
+                    self.skill_usage[s] = {"first": file_time, "last": file_time, "count": 1}
+                else:
+                    _widen(info, file_time, file_time)
+                    info["count"] += 1
+
+        # attach repo metadata if this file belongs to a git repo
+        if repo_meta and id(repo_meta) not in self._seen_repos:
+            self._seen_repos.add(id(repo_meta))
+            self._add_repo(repo_meta)
+
+    def language_shares(self, weight: str = "bytes") -> Tuple[Optional[str], Dict[str, float]]:
+        """
+        (basis, language -> share of the project, summing to 1). weight="lines"
+        uses the sniffed line counts when every counted file has one; otherwise
+        bytes, or file counts when no sizes are known. (None, {}) without languages.
+        """
+        for basis, counts in (("lines", self.lang_lines), ("bytes", self.lang_bytes), ("files", self.lang_files)):
+            if basis == "lines" and (weight != "lines" or not self.lines_complete):
+                continue
+            total = sum(counts.values())
+            if total:
+                return basis, {lang: n / total for lang, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])) if n}
+        return None, {}
+
+    def _add_repo(self, repo_meta: Dict) -> None:
+        self.repo_names.setdefault(repo_meta.get("repo_name", ""), None)
+        self.repo_roots.setdefault(repo_meta.get("repo_root", ""), None)
+
+        # authors is just a list of names
+        for a in repo_meta.get("authors", []):
+            if a:
+                self.repo_authors.add(str(a))
+
+        # contributors might be dicts with stats
+        for c in repo_meta.get("contributors", []):
+            if isinstance(c, dict):
+                name = c.get("name")
+                if name:
+                    self.repo_contributors.add(name)
+            elif c:
+                self.repo_contributors.add(str(c))
+
+        bc = repo_meta.get("branch_count")
+        if bc is not None:
+            self.branch_count = bc if self.branch_count is None else max(self.branch_count, bc)
+
+        hm = repo_meta.get("has_merges")
+        if hm is not None:
+            self.has_merges_flags.append(hm)
+
+        # first repo that has a value wins
+        pt = repo_meta.get("project_type")
+        if pt and self.project_type is None:
+            self.project_type = pt
+
+        rd = repo_meta.get("duration_days")
+        if rd is not None:
+            self.repo_duration_days = rd if self.repo_duration_days is None else max(self.repo_duration_days, rd)
+
+        cf = repo_meta.get("commit_frequency")
+        if cf and self.commit_frequency is None:
+            self.commit_frequency = cf
+
+        cpw = repo_meta.get("commits_per_week")
+        if cpw is not None and self.commits_per_week is None:
+            self.commits_per_week = cpw
+
+        act = repo_meta.get("activity")
+        if act and self.activity is None:
+            self.activity = act
+
+
+# --------------------------------------------------------
+# Mergeable partials (per-project results -> global structures)
+# --------------------------------------------------------
+
+def _widen(info: Dict, first, last) -> None:
+    """Extends info's first/last (epoch seconds) to cover [first, last]; None is unknown and ignored."""
+    if first is not None and (info["first"] is None or first < info["first"]):
+        info["first"] = first
+    if last is not None and (info["last"] is None or last > info["last"]):
+        info["last"] = last
+
+
+def merge_skill_usage(total: Dict[str, Dict], partial: Dict[str, Dict]) -> None:
+    """Folds one project's skill usage into the global one (min first, max last, summed count)."""
+    for skill, info in partial.items():
+        seen = total.get(skill)
+        if seen is None:
+            total[skill] = dict(info)
+            continue
+        _widen(seen, info["first"], info["last"])
+        seen["count"] += info["count"]
+
+
+def merge_contributor_profiles(total: Dict[str, Dict], partial: Dict[str, Dict]) -> None:
+    """Folds one project's contributor profiles into the global ones (skills union, projects appended)."""
+    for name, profile in partial.items():
+        target = total[name]
+        target["skills"].update(profile["skills"])
+        target["projects"].extend(profile["projects"])
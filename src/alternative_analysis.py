@@ -1,27 +1,37 @@
 # this checks all the projects and tries to guess what kind of work it was
 # (code, docs, design etc). also counts stuff, finds duration, langs, frameworks, skills
 
-import json
 import os
-import shutil
-from datetime import datetime
-from analysis_utils import center_text, to_datetime
-from classification import detect_activity, detect_framework, skill_from_ext
-from contributor_utils import apply_contributor_breakdown
-from scoring_utils import compute_project_score
-
-from collections import defaultdict, Counter
-import csv
-from resume_generator import build_project_line
-from print_utils import (
-    print_repo_summary,
-    print_project_rankings,
-    print_chronological_projects,
-    print_skills_timeline,
-    print_resume_summaries,
-    print_contributor_stats,
+from aggregation_utils import (
+    ProjectAccumulator,
+    index_repositories,
+    merge_contributor_profiles,
+    merge_skill_usage,
+)
+from analysis_utils import center_text, epoch_date, epoch_to_datetime, span_days
+from classification import detect_activity, skill_from_ext
+from contributor_utils import apply_contributor_breakdown, contributor_scores
+from scoring_utils import (
+    FeatureTable,
+    activity_points,
+    effective_languages,
+    features_from_summary,
+    ranking,
+    scoring_params,
+    variety_points,
 )
 
+from collections import defaultdict
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dir_tree import DirTree
+from export_utils import export_options, export_scan
+from functools import cache
+from scan_result import ScanResult
+from resume_generator import build_project_line
+from print_utils import BufferedRenderer
+
 
 
 
@@ -44,10 +54,299 @@ def _project_name(filename: str) -> str:
 
 
 
+# Above this many projects analyze_projects fans out to a process pool
+PARALLEL_PROJECT_THRESHOLD = 500
+
+# projects turned into résumé-style summaries
+RESUME_TOP_N = 3
+
+# directories listed in the "largest directories" report
+LARGEST_DIRECTORIES_N = 10
+
+
+def _analyze_project(task):
+    """
+    Analyzes one project (inline or in a worker process, so it only touches
+    what it is given). Returns None for projects without real files, else
+        {"summary": project summary row (not scored yet),
+         "features": score features for the FeatureTable (see scoring_utils),
+         "repo_summary": renderer.repo_summary args (advanced mode) or None,
+         "skill_usage": this project's partial skill usage (None without skills_gen),
+         "contributor_profiles": this project's partial contributor profiles}
+    The partials are combined with merge_skill_usage / merge_contributor_profiles,
+    and all projects are scored at once by the caller (_apply_score).
+    """
+    proj_name, rows, project_meta, lang_map, filters, advanced_options, detailed = task
+
+    # partial skill usage / contributor profiles: merged into the global ones by the caller
+    skill_usage = {} if advanced_options.get("skills_gen", True) else None
+    contributor_profiles = defaultdict(lambda: {
+        "skills": set(),
+        "projects": []
+    })
+
+    acc = ProjectAccumulator(proj_name, lang_map, skill_usage)
+    for row, repo_meta in rows:
+        acc.add_file(row, repo_meta)
+
+    # if nothing real here then skip this project
+    if not acc.clean_files:
+        return None
+
+    # epoch seconds (None if no file had a known time: duration 0, dates unknown)
+    first_mod = acc.first_mod
+    last_mod = acc.last_mod
+    duration_days = span_days(first_mod, last_mod)
+
+    activity_counts = acc.activity_counts
+    langs = acc.langs
+    skills = acc.skills
+    # how much of each language (by bytes, or lines with language_weight="lines")
+    share_basis, language_shares = acc.language_shares(advanced_options.get("language_weight", "bytes"))
+
+    # --- Extract frameworks from detailed_data only ---
+    frameworks = set()
+    if advanced_options.get("framework_scan", True) and project_meta and "frameworks" in project_meta:
+        # just take them as-is
+        frameworks.update(project_meta["frameworks"])
+
+    repo_authors = acc.repo_authors
+    repo_contributors = acc.repo_contributors
+
+    # basic numbers
+    total_files = acc.clean_files
+    code_files = activity_counts["code"]
+    test_files = activity_counts["test"]
+    doc_files = activity_counts["documentation"]
+    design_files = activity_counts["design"]
+
+    # pick some "main" values from the aggregated repo info
+    repo_name = next(iter(acc.repo_names), proj_name)
+    repo_root = next(iter(acc.repo_roots), "")
+    branch_count = acc.branch_count or 0
+    has_merges = (
+        "Yes"
+        if any(acc.has_merges_flags)
+        else "No"
+        if acc.has_merges_flags
+        else "Unknown"
+    )
+    project_type = acc.project_type or "Unknown"
+    repo_duration_days = (
+        acc.repo_duration_days if acc.repo_duration_days is not None else duration_days
+    )
+    commit_frequency = acc.commit_frequency or "Unknown"
+    commits_per_week = acc.commits_per_week
+    activity = acc.activity
+
+    # if no frameworks detected, assign "NA"
+    if not frameworks:
+        frameworks.add("NA")
+
+    # collab guess: .git present OR multiple authors/contributors
+    is_collab = (
+        acc.has_git_path
+        or len(repo_authors) > 1
+        or len(repo_contributors) > 1
+    )
+
+    # ----------------------------------------------------
+    # "depth + variety" features for ranking projects
+    # (weights and caps are applied by FeatureTable.scores)
+    # ----------------------------------------------------
+    # commits/week: numeric from the repo analysis; older scans only have the "15.6 commits/week" string
+    if commits_per_week is None:
+        try:
+            commits_per_week = float(str(commit_frequency).split()[0])
+        except (ValueError, IndexError):
+            pass
+
+    features = {
+        "volume": total_files,
+        "activity": activity_points(code_files, test_files, doc_files, design_files),
+        "variety": variety_points(len(skills), effective_languages(language_shares)),
+        "duration": duration_days,
+        "collab": 1 if is_collab else 0,
+        "branch": branch_count,
+        "merge": 1 if has_merges == "Yes" else 0,
+        "commit": commits_per_week or 0,
+    }
+
+    # ----------------------------------------------------
+# Per-contributor breakdown
+# ----------------------------------------------------
+    _, per_contributor_pct, per_contributor_skills, per_contributor_activity = apply_contributor_breakdown(
+        proj_name=proj_name,
+        score=None,
+        filters=filters,
+        project_meta=project_meta,
+        contributor_profiles=contributor_profiles,
+        detect_activity=detect_activity,
+        skill_from_ext=skill_from_ext,
+)
+
+
+
+    # repo info printed to terminal in advanced mode (by the caller, in project order)
+    repo_summary = None
+    if detailed:
+        repo_summary = (
+            proj_name,
+            repo_name,
+            repo_root,
+            repo_authors,
+            repo_contributors,
+            branch_count,
+            has_merges,
+            project_type,
+            repo_duration_days,
+            commit_frequency,
+        )
+    
+
+    
+    summary = {
+        "project": proj_name,
+        "total_files": total_files,
+        "duration_days": duration_days,
+        "code_files": code_files,
+        "test_files": test_files,
+        "doc_files": doc_files,
+        "design_files": design_files,
+        "languages": ", ".join(sorted(langs)) if langs else "Unknown",
+        # language -> share of the project (biggest first, vendored files left out) and what it is weighted by
+        "language_shares": language_shares,
+        "language_share_basis": share_basis,
+        "frameworks": ", ".join(sorted(frameworks)),
+        "skills": ", ".join(sorted(skills)) if skills else "NA",
+        "is_collaborative": "Yes" if is_collab else "No",
+        # GIT / REPO FIELDS (for advanced mode & reports)
+        "repo_name": repo_name,
+        "repo_root": repo_root,
+        "authors": ", ".join(sorted(repo_authors)) if repo_authors else "",
+        "contributors": ", ".join(sorted(repo_contributors))
+        if repo_contributors
+        else "",
+        "branch_count": branch_count,
+        "has_merges": has_merges,
+        "project_type": project_type,
+        "repo_duration_days": repo_duration_days,
+        "commit_frequency": commit_frequency,
+        "commits_per_week": commits_per_week,
+        # weekly activity metrics plus the compact series (see activity_series)
+        "activity": activity,
+        # dates for chronological project list (NEW), None when unknown
+        "first_modified": epoch_to_datetime(first_mod),
+        "last_modified": epoch_to_datetime(last_mod),
+        # final score used for ranking (NEW) and its per-contributor shares, filled in by _apply_score
+        "score": None,
+        # raw inputs of the score, so stored scans can be rescored (rescore_results)
+        "score_features": features,
+        "per_contributor_scores": None,
+        "per_contributor_pct": per_contributor_pct,
+        "per_contributor_skills": {k: sorted(list(v)) for k, v in per_contributor_skills.items()},
+        "per_contributor_activity": per_contributor_activity,
+
+    }
+
+    return {
+        "summary": summary,
+        "span": (first_mod, last_mod),
+        "features": features,
+        "repo_summary": repo_summary,
+        "skill_usage": skill_usage,
+        "contributor_profiles": dict(contributor_profiles),
+    }
+
+
+def _apply_score(summary, score, profile_entries=()):
+    """Fills a project's score into its summary and its contributors' shares (their profile entries)."""
+    summary["score"] = score
+    summary["per_contributor_scores"] = contributor_scores(score, summary.get("per_contributor_pct") or {})
+    _score_profile_entries(profile_entries, score)
+
+
+def _score_profile_entries(profile_entries, score):
+    for entry in profile_entries:
+        entry["score"] = score * ((entry.get("pct") or 0.0) / 100.0)
+
+
+def _time_key(ts):
+    """Sort key for epoch timestamps: oldest first, unknown (None) last."""
+    return (ts is None, ts or 0)
+
+
+def _resume_summaries(ranked_summaries):
+    """Résumé-style lines for the top RESUME_TOP_N projects."""
+    return [build_project_line(p) for p in ranked_summaries[:RESUME_TOP_N]]
+
+
+def rescore_results(results, weights=None, caps=None):
+    """
+    Rescores stored analysis results in place (no archive access): score,
+    per_contributor_scores, contributor profile scores, the ranking and
+    resume_summaries follow the given weights / caps (defaults when None).
+    Projects saved without "score_features" get them rebuilt from the summary.
+    A read-only mapping (a fresh ScanResult) is copied into a dict first.
+    """
+    if not isinstance(results, MutableMapping):
+        results = dict(results)
+    if weights is None or caps is None:
+        default_weights, default_caps = scoring_params(None)
+        weights = default_weights if weights is None else weights
+        caps = default_caps if caps is None else caps
+
+    summaries = list(results.get("project_summaries") or [])
+    features = FeatureTable()
+    for p in summaries:
+        p.setdefault("score_features", features_from_summary(p))
+        features.append(p["score_features"])
+    scores = features.scores(weights, caps)
+
+    # project name -> its entries in the contributor profiles
+    entries = defaultdict(list)
+    for profile in (results.get("contributor_profiles") or {}).values():
+        for entry in profile.get("projects", []):
+            entries[entry.get("name")].append(entry)
+
+    for p, score in zip(summaries, scores):
+        _apply_score(p, score, entries.get(p.get("project"), ()))
+
+    results["project_summaries"] = [summaries[i] for i in ranking(scores)]
+    results["resume_summaries"] = _resume_summaries(results["project_summaries"])
+    results["scoring"] = {"weights": dict(weights), "caps": dict(caps)}
+    return results
+
+
+def _run_project_tasks(tasks, workers=None):
+    """
+    Results of _analyze_project for every task, in task order. workers=None
+    picks the pool automatically (CPU count above PARALLEL_PROJECT_THRESHOLD
+    projects, serial below); 1 forces the serial path.
+    """
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(tasks) >= PARALLEL_PROJECT_THRESHOLD else 1
+    workers = max(1, min(int(workers), len(tasks)))
+    if workers == 1:
+        return map(_analyze_project, tasks)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_analyze_project, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    except BrokenProcessPool as e:
+        # results do not depend on where a project ran, so just redo it inline
+        print(center_text(f"[WARN] Parallel project analysis failed ({e}), continuing serially"))
+        return map(_analyze_project, tasks)
+
+
 # --------------------------------------------------------
 # MAIN ANALYSIS FUNCTION
 # --------------------------------------------------------
-def analyze_projects(extracted_data, filters, advanced_options, detailed_data=None, write_csv=True ):
+def analyze_projects(extracted_data, filters, advanced_options, detailed_data=None, write_csv=True, renderer=None):
+    # terminal output by default; the service layer passes a NullRenderer
+    if renderer is None:
+        renderer = BufferedRenderer()
+
     if advanced_options is None:
     # default: everything ON
         advanced_options = {
@@ -61,27 +360,11 @@ def analyze_projects(extracted_data, filters, advanced_options, detailed_data=No
     # not heavily used now, but keep in case we want ext->lang fallback later
     lang_map = filters.get("languages", {})
 
-    # track global skill usage over time for chronological skills output
-    skill_usage = {}  # skill -> {"first": datetime, "last": datetime, "count": int}
-
-    # map each file path to its repo metadata (if advanced scan ran)
-    file_to_repo = {}
-    if isinstance(detailed_data, dict):
-        for repo in detailed_data.get("projects", []):
-            for f in repo.get("files", []):
-                fname = f.get("filename")
-                if fname:
-                    file_to_repo[fname] = repo
+    # repo_name -> repo metadata and file path -> repo metadata (if advanced scan ran)
+    repos_by_name, file_to_repo = index_repositories(detailed_data)
 
     # group files by project prefer Git repo name (repo_name) when we have it, otherwise fall back to guessing from the path
-    
     projects = defaultdict(list)
-
-    contributor_profiles = defaultdict(lambda: {
-        "skills": set(),
-        "projects": []
-    })
-
     for row in extracted_data:
         filename = row["filename"]
 
@@ -96,357 +379,75 @@ def analyze_projects(extracted_data, filters, advanced_options, detailed_data=No
             # basic mode or files not tied to a git repo
             proj = _project_name(path_for_project)
 
-        projects[proj].append(row)
-
-
-    project_summaries = []
-
-    for proj_name, files in projects.items():
-        # only real files, no folders, no junk
-        clean_files = []
-        for f in files:
-            name = f["filename"]
-
-            # skip folders
-            if not f.get("isFile", True):
-                continue
-
-            # skip __MACOSX folder stuff from mac zip
-            if "/__MACOSX/" in name or name.startswith("__MACOSX/"):
-                continue
-
-            # skip "._" resource files mac adds for each file
-            if os.path.basename(name).startswith("._"):
-                continue
-
-            clean_files.append(f)
-
-        # if nothing real here then skip this project
-        if not clean_files:
+        projects[proj].append((row, repo_meta))
+
+    # Projects are independent apart from skill usage / contributor profiles,
+    # which come back as partials and are merged in project order when read
+    tasks = [
+        (proj_name, rows, repos_by_name.get(proj_name) if detailed_data else None,
+         lang_map, filters, advanced_options, bool(detailed_data))
+        for proj_name, rows in projects.items()
+    ]
+
+    try:
+        weights, caps = scoring_params(advanced_options)
+    except ValueError as e:
+        print(center_text(f"[WARN] {e}; using the default score weights"))
+        weights, caps = scoring_params(None)
+
+    project_results = []
+    for result in _run_project_tasks(tasks, advanced_options.get("analysis_workers")):
+        if result is None:
             continue
 
-
-
-        
-
-        # duration: based on first + last modified timestamps
-        mod_times = [to_datetime(f["last_modified"]) for f in clean_files]
-        first_mod = min(mod_times)
-        last_mod = max(mod_times)
-        duration_days = (last_mod - first_mod).days + 1
-        
-
-        # counters + sets
-        activity_counts = Counter()
-        langs = set()
-        skills = set()
-
-
-        # --- Extract frameworks from detailed_data only ---
-        frameworks = set()
-        if advanced_options.get("framework_scan", True) and detailed_data:
-            project_meta = next(
-                (p for p in detailed_data.get("projects", []) if p.get("repo_name") == proj_name),
-                None,
-            )
-            if project_meta and "frameworks" in project_meta:
-                # just take them as-is
-                frameworks.update(project_meta["frameworks"])
-
-        # if no frameworks detected, assign "NA"
-        if not frameworks:
-            frameworks.add("NA")
-
-
-
-
-        # repo / git infos (from detailed_extraction / repo_extractor)
-        repo_names = set()
-        repo_roots = set()
-        repo_authors = set()
-        repo_contributors = set()
-        branch_counts = []
-        has_merges_flags = []
-        project_types = []
-        repo_duration_vals = []
-        commit_freqs = []
-
-        # go through all real files in this project
-        for f in clean_files:
-            filename = f["filename"]
-            ext = f.get("extension", "").lower()
-            category = f.get("category", "uncategorized")
-
-            # activity type
-            act = detect_activity(category, filename)
-            activity_counts[act] += 1
-
-            # language (prefer per-file language, fall back to filters)
-            lang = f.get("language") or lang_map.get(ext, "Unknown")
-
-            if lang != "Unknown":
-                langs.add(lang)
-
-
-
-
-            if advanced_options.get("skills_gen", True):
-                # skills
-                s = skill_from_ext(ext)
-                if s:
-                    skills.add(s)
-
-                    # track global usage for chronological skill list
-                    file_time = to_datetime(f["last_modified"])
-                    info = skill_usage.get(s)
-                    if info is None:
-                        skill_usage[s] = {
-                            "first": file_time,
-                            "last": file_time,
-                            "count": 1,
-                        }
-                    else:
-                        if file_time < info["first"]:
-                            info["first"] = file_time
-                        if file_time > info["last"]:
-                            info["last"] = file_time
-                        info["count"] += 1
-
-            # attach repo metadata if this file belongs to a git repo
-            repo_meta = file_to_repo.get(filename)
-            if repo_meta:
-                repo_names.add(repo_meta.get("repo_name", ""))
-                repo_roots.add(repo_meta.get("repo_root", ""))
-
-                # authors is just a list of names
-                for a in repo_meta.get("authors", []):
-                    if a:
-                        repo_authors.add(str(a))
-
-                # contributors might be dicts with stats
-                for c in repo_meta.get("contributors", []):
-                    if isinstance(c, dict):
-                        name = c.get("name")
-                        if name:
-                            repo_contributors.add(name)
-                    elif c:
-                        repo_contributors.add(str(c))
-
-                bc = repo_meta.get("branch_count")
-                if bc is not None:
-                    branch_counts.append(bc)
-
-                hm = repo_meta.get("has_merges")
-                if hm is not None:
-                    has_merges_flags.append(hm)
-
-                pt = repo_meta.get("project_type")
-                if pt:
-                    project_types.append(pt)
-
-                rd = repo_meta.get("duration_days")
-                if rd is not None:
-                    repo_duration_vals.append(rd)
-
-                cf = repo_meta.get("commit_frequency")
-                if cf:
-                    commit_freqs.append(cf)
-
-        # basic numbers
-        total_files = len(clean_files)
-        code_files = activity_counts["code"]
-        test_files = activity_counts["test"]
-        doc_files = activity_counts["documentation"]
-        design_files = activity_counts["design"]
-
-        # pick some "main" values from the aggregated repo info
-        repo_name = next(iter(repo_names), proj_name)
-        repo_root = next(iter(repo_roots), "")
-        branch_count = max(branch_counts) if branch_counts else 0
-        has_merges = (
-            "Yes"
-            if any(has_merges_flags)
-            else "No"
-            if has_merges_flags
-            else "Unknown"
-        )
-        project_type = next(iter(project_types), "Unknown")
-        repo_duration_days = (
-            max(repo_duration_vals) if repo_duration_vals else duration_days
-        )
-        commit_frequency = next(iter(commit_freqs), "Unknown")
-
-        # if no frameworks detected, assign "NA"
-        if not frameworks:
-            frameworks.add("NA")
-
-        # collab guess: .git present OR multiple authors/contributors
-        is_collab = (
-            any(".git" in f["filename"] for f in files)
-            or len(repo_authors) > 1
-            or len(repo_contributors) > 1
-        )
-
-        # ----------------------------------------------------
-        # "depth + variety" score for ranking projects
-        # ----------------------------------------------------
-        skills_count = len(skills)
-        languages_count = len(langs)
-
-        # size (capped so giant repos don't dominate everything)
-        volume_score = min(total_files, 60) * 1.0
-
-        # type of work
-        activity_score = (
-            code_files * 3
-            + test_files * 2
-            + doc_files * 1
-            + design_files * 1
-        )
-
-        # variety of skills / languages
-        variety_score = skills_count * 2 + languages_count * 1.5
-
-        # duration (how long you worked on it)
-        duration_score = min(duration_days, 90) * 0.5
-
-        # collab / repo sophistication
-        collab_bonus = 8 if is_collab else 0
-        branch_bonus = min(branch_count, 5) * 1.5
-        merge_bonus = 5 if has_merges == "Yes" else 0
-
-        # small bonus for higher commit frequency if numeric ("ex. 15.6 commits/week")
-        commit_bonus = 0
-        try:
-            num_commits = float(str(commit_frequency).split()[0])
-            commit_bonus = min(num_commits, 30) * 0.2
-        except Exception:
-            pass
-
-        score = compute_project_score(
-             volume_score=volume_score,
-             activity_score=activity_score,
-            variety_score=variety_score,
-             duration_score=duration_score,
-            collab_bonus=collab_bonus,
-            branch_bonus=branch_bonus,
-            merge_bonus=merge_bonus,
-            commit_bonus=commit_bonus,
-)
-
-        project_meta = None
-        if detailed_data:
-            project_meta = next(
-            (p for p in detailed_data.get("projects", [])
-            if p.get("repo_name") == proj_name),
-            None,
-    )
-
-    # ----------------------------------------------------
-# Per-contributor breakdown
-# ----------------------------------------------------
-        per_contributor_scores, per_contributor_pct, per_contributor_skills = apply_contributor_breakdown(
-            proj_name=proj_name,
-            score=score,
-            filters=filters,
-            project_meta=project_meta,
-            contributor_profiles=contributor_profiles,
-            detect_activity=detect_activity,
-            skill_from_ext=skill_from_ext,
-)
-
-
-
         # print repo info to terminal in advanced mode
-        if detailed_data:
-            print_repo_summary(
-                proj_name,
-                repo_name,
-                repo_root,
-                repo_authors,
-                repo_contributors,
-                branch_count,
-                has_merges,
-                project_type,
-                repo_duration_days,
-                commit_frequency,
-            )
-        
-
-        
-        project_summaries.append(
-            {
-                "project": proj_name,
-                "total_files": total_files,
-                "duration_days": duration_days,
-                "code_files": code_files,
-                "test_files": test_files,
-                "doc_files": doc_files,
-                "design_files": design_files,
-                "languages": ", ".join(sorted(langs)) if langs else "Unknown",
-                "frameworks": ", ".join(sorted(frameworks)),
-                "skills": ", ".join(sorted(skills)) if skills else "NA",
-                "is_collaborative": "Yes" if is_collab else "No",
-                # GIT / REPO FIELDS (for advanced mode & reports)
-                "repo_name": repo_name,
-                "repo_root": repo_root,
-                "authors": ", ".join(sorted(repo_authors)) if repo_authors else "",
-                "contributors": ", ".join(sorted(repo_contributors))
-                if repo_contributors
-                else "",
-                "branch_count": branch_count,
-                "has_merges": has_merges,
-                "project_type": project_type,
-                "repo_duration_days": repo_duration_days,
-                "commit_frequency": commit_frequency,
-                # dates for chronological project list (NEW)
-                "first_modified": first_mod,
-                "last_modified": last_mod,
-                # final score used for ranking (NEW)
-                "score": score,
-                "per_contributor_scores": per_contributor_scores,
-                "per_contributor_pct": per_contributor_pct,
-                "per_contributor_skills": {k: sorted(list(v)) for k, v in per_contributor_skills.items()},
-
-            }
-        )
-
-    
+        if result["repo_summary"] is not None:
+            renderer.repo_summary(*result["repo_summary"])
 
+        project_results.append(result)
 
     # --------------------------------------------------------
-    # OUTPUT PART 1: ranked project table
+    # Result sections: each one is built when first read (see scan_result)
     # --------------------------------------------------------
-    # sort projects so biggest score first
-    project_summaries.sort(key=lambda x: x["score"], reverse=True)
-    print_project_rankings(project_summaries)
 
-    # --------------------------------------------------------
-    # OUTPUT PART 2: chronological list of projects
-    # --------------------------------------------------------
-    projects_chrono = sorted(
-        project_summaries,
-        key=lambda x: x["first_modified"],
-    )
-    chronological_projects = []
-    for p in projects_chrono:
-        first_date = p["first_modified"].date().isoformat()
-        last_date = p["last_modified"].date().isoformat()
-        chronological_projects.append(
-            {
-                "name": p["project"],
-                "first_used": first_date,
-                "last_used": last_date,
-            }
-        )
-    print_chronological_projects(chronological_projects)
+    @cache
+    def ranked_results():
+        # every project scored in one pass over the feature columns, biggest score first
+        features = FeatureTable()
+        for r in project_results:
+            features.append(r["features"])
+        scores = features.scores(weights, caps)
+        for r, score in zip(project_results, scores):
+            r["score"] = score
+            _apply_score(r["summary"], score)
+        return [project_results[i] for i in ranking(scores)]
+
+    def project_summaries():
+        return [r["summary"] for r in ranked_results()]
+
+    def projects_chronological():
+        chronological_projects = []
+        for r in sorted(ranked_results(), key=lambda r: _time_key(r["span"][0])):
+            first_ts, last_ts = r["span"]
+            chronological_projects.append(
+                {
+                    "name": r["summary"]["project"],
+                    "first_used": epoch_date(first_ts),
+                    "last_used": epoch_date(last_ts),
+                }
+            )
+        return chronological_projects
+
+    def skills_chronological():
+        skills_output = []
+        if not advanced_options.get("skills_gen", True):
+            return skills_output
+
+        # global skill usage over time: skill -> {"first": epoch|None, "last": epoch|None, "count": int}
+        skill_usage = {}
+        for r in project_results:
+            merge_skill_usage(skill_usage, r["skill_usage"])
 
-    # --------------------------------------------------------
-    # OUTPUT PART 3: chronological list of skills exercised
-    # --------------------------------------------------------
-    
-    skills_output = []
-    if advanced_options.get("skills_gen", True):
         skills_chrono = sorted(
             (
                 {
@@ -457,120 +458,89 @@ def analyze_projects(extracted_data, filters, advanced_options, detailed_data=No
                 }
                 for skill, info in skill_usage.items()
             ),
-            key=lambda x: x["first_used"],
+            key=lambda x: _time_key(x["first_used"]),
         )
 
         for row in skills_chrono:
-            first_date = row["first_used"].date().isoformat()
-            last_date = row["last_used"].date().isoformat()
             skills_output.append(
                 {
                     "skill": row["skill"],
-                    "first_used": first_date,
-                    "last_used": last_date,
+                    "first_used": epoch_date(row["first_used"]),
+                    "last_used": epoch_date(row["last_used"]),
                 }
             )
-        print_skills_timeline(skills_output)
-
-    # --------------------------------------------------------
-    # OUTPUT PART 4: resume style summaries of top projects
-    # --------------------------------------------------------
-    TOP_N = 3
-    top_projects = project_summaries[:TOP_N]
-    resume_summaries = []
-    for p in top_projects:
-        line = build_project_line(p)
-        resume_summaries.append(line)
-    print_resume_summaries(resume_summaries)
-    
+        return skills_output
+
+    def resume_summaries():
+        return _resume_summaries(analysis_results["project_summaries"])
+
+    def contributor_profiles():
+        ranked_results()  # profile entries get their share of the project score
+        merged = defaultdict(lambda: {
+            "skills": set(),
+            "projects": []
+        })
+        for r in project_results:
+            for profile in r["contributor_profiles"].values():
+                _score_profile_entries(profile["projects"], r["score"])
+            merge_contributor_profiles(merged, r["contributor_profiles"])
+
+        # Serialize contributor profiles (sets to lists)
+        final_contributor_profiles = {}
+        for k, v in merged.items():
+            final_contributor_profiles[k] = {
+                "skills": sorted(list(v["skills"])),
+                "projects": v["projects"]
+            }
+        return final_contributor_profiles
 
     # --------------------------------------------------------
-    # OUTPUT PART 5: Per-Contributor Rankings (per person)
+    # To make text and doc file from analysis
     # --------------------------------------------------------
-    print_contributor_stats(project_summaries)
-    
-
 
+    analysis_results = ScanResult({
+    "project_summaries": project_summaries,
+    "resume_summaries": resume_summaries,        # résumé-style top projects
+    "skills_chronological": skills_chronological,      # skills exercised over time
+    "projects_chronological": projects_chronological,  # projects in chronological order
+    "contributor_profiles": contributor_profiles,
+    "scoring": lambda: {"weights": weights, "caps": caps},  # what the scores were computed with
+    # directory path -> subtree size / file counts / dates (see dir_tree)
+    "directory_tree": lambda: DirTree.from_records(row for rows in projects.values() for row, _ in rows),
+})
+
+    # a NullRenderer reads nothing, so no section is built for it
+    if renderer.enabled:
+        # OUTPUT PART 1: ranked project table
+        renderer.project_rankings(analysis_results["project_summaries"])
+        # OUTPUT PART 2: chronological list of projects
+        renderer.chronological_projects(analysis_results["projects_chronological"])
+        # OUTPUT PART 3: chronological list of skills exercised
+        if advanced_options.get("skills_gen", True):
+            renderer.skills_timeline(analysis_results["skills_chronological"])
+        # OUTPUT PART 4: resume style summaries of top projects
+        renderer.resume_summaries(analysis_results["resume_summaries"])
+        # OUTPUT PART 5: Per-Contributor Rankings (per person)
+        renderer.contributor_stats(analysis_results["project_summaries"])
+        # OUTPUT PART 6: where the bytes are
+        renderer.largest_directories(analysis_results["directory_tree"].largest(LARGEST_DIRECTORIES_N))
 
     # --------------------------------------------------------
-    # CSV OUTPUT (we might not need this anymore since we have word doc now. can delete later. just here for now.)
+    # EXPORT: project / contributor / file / skill tables (see export_utils)
     # --------------------------------------------------------
     if write_csv:
-        from file_parser import OUTPUT_DIR
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        out_path = os.path.join(OUTPUT_DIR, "project_contribution_summary.csv")
-
-        while True:
-            try:
-                with open(out_path, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.DictWriter(
-                        f,
-                        fieldnames=[
-                            "project",
-                            "total_files",
-                            "duration_days",
-                            "code_files",
-                            "test_files",
-                            "doc_files",
-                            "design_files",
-                            "languages",
-                            "frameworks",
-                            "skills",
-                            "is_collaborative",
-                            "repo_name",
-                            "repo_root",
-                            "authors",
-                            "contributors",
-                            "branch_count",
-                            "has_merges",
-                            "project_type",
-                            "repo_duration_days",
-                            "commit_frequency",
-                            "first_modified",
-                            "last_modified",
-                            "score",
-                            "per_contributor_scores",
-                            "per_contributor_pct",
-                            "per_contributor_skills",
-                        ],
-                    )
-                    writer.writeheader()
-                    writer.writerows(
-                        [{k: v for k, v in p.items() if k in writer.fieldnames}
-                            for p in project_summaries]
-                    )
-
-                print(center_text(f"saved file to {out_path}"))
-                break
-            except PermissionError:
-                print()
-                print(center_text(f"[!] Could not save CSV to '{out_path}' because it is open."))
-                print(center_text("Please close the file and press Enter to retry, or type 'cancel' to skip."))
-                if input("> ").strip().lower() == "cancel":
-                    break
-            except Exception as e:
-                print()
-                print(center_text(f"[WARN] Could not save CSV: {e}"))
-                break
-
-
-
-    # Serialize contributor profiles (sets to lists)
-    final_contributor_profiles = {}
-    for k, v in contributor_profiles.items():
-        final_contributor_profiles[k] = {
-            "skills": sorted(list(v["skills"])),
-            "projects": v["projects"]
-        }
-    
-    # --------------------------------------------------------
-    # To make text and doc file from analysis
-    # --------------------------------------------------------
+        try:
+            formats, tables = export_options(advanced_options)
+        except ValueError as e:
+            print(center_text(f"[WARN] {e}; exporting the default tables as CSV"))
+            formats, tables = export_options(None)
+        paths = export_scan(
+            analysis_results,
+            files=lambda: ((name, row) for name, rows in projects.items() for row, _ in rows),
+            formats=formats,
+            tables=tables,
+            scan_name=advanced_options.get("export_name"),
+        )
+        renderer.exports(paths)
 
-    return {
-    "project_summaries": project_summaries,
-    "resume_summaries": resume_summaries,        # résumé-style top projects
-    "skills_chronological": skills_output,      # skills exercised over time
-    "projects_chronological": chronological_projects,  # projects in chronological order
-    "contributor_profiles": final_contributor_profiles,
-}
+    return analysis_results
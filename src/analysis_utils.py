@@ -6,8 +6,8 @@ Small utility helpers used by alternative_analysis.py
 from __future__ import annotations
 
 import shutil
-from datetime import datetime
-from typing import Any, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, Mapping, Optional
 
 
 def center_text(text: str) -> str:
@@ -19,28 +19,79 @@ def center_text(text: str) -> str:
     return " " * padding + text
 
 
-def to_datetime(dt_value: Any) -> datetime:
+# Timestamps are stored as epoch seconds of the wall-clock time (zip entries
+# carry no timezone), so durations match plain datetime arithmetic.
+# None means unknown: it is skipped by duration / chronology computations
+# instead of being replaced by "now".
+_EPOCH = datetime(1970, 1, 1)
+
+UNKNOWN_DATE = "unknown"
+
+
+def to_epoch(dt_value: Any) -> Optional[int]:
     """
-    Converts common timestamp formats into a datetime.
+    Converts common timestamp formats into epoch seconds, once at ingestion.
 
     Supports:
     - zipfile tuple/list: (Y, M, D, H, M, S, ...)
     - ISO strings: "2025-11-19T01:23:45" or "...Z"
-    Falls back to datetime.now() if parsing fails.
+    - datetime objects and epoch numbers
+    Returns None (unknown) if parsing fails.
     """
+    if isinstance(dt_value, bool) or dt_value is None:
+        return None
+    if isinstance(dt_value, (int, float)):
+        return int(dt_value)
+
+    dt = None
     # zipfile gives time as tuple/list (Y, M, D, H, M, S)
     if isinstance(dt_value, (list, tuple)) and len(dt_value) >= 6:
         try:
             y, mo, d, h, mi, s = dt_value[:6]
-            return datetime(int(y), int(mo), int(d), int(h), int(mi), int(s))
-        except Exception:
-            pass
+            dt = datetime(int(y), int(mo), int(d), int(h), int(mi), int(s))
+        except (TypeError, ValueError):
+            return None
 
     # ISO string like "2025-11-19T01:23:45" or "2025-11-19T01:23:45Z"
-    if isinstance(dt_value, str):
+    elif isinstance(dt_value, str):
         try:
-            return datetime.fromisoformat(dt_value.replace("Z", ""))
-        except Exception:
-            pass
+            dt = datetime.fromisoformat(dt_value.replace("Z", ""))
+        except ValueError:
+            return None
+
+    elif isinstance(dt_value, datetime):
+        dt = dt_value
+
+    if dt is None:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // timedelta(seconds=1)
+
+
+def record_epoch(f: Mapping[str, Any]) -> Optional[int]:
+    """A file record's modification time: "modified_ts" from ingestion, else parsed from last_modified."""
+    if "modified_ts" in f:
+        return f["modified_ts"]
+    return to_epoch(f.get("last_modified"))
+
+
+def epoch_to_datetime(ts: Optional[int]) -> Optional[datetime]:
+    """Naive datetime for output (summaries, reports); None stays None."""
+    if ts is None:
+        return None
+    return _EPOCH + timedelta(seconds=ts)
+
+
+def epoch_date(ts: Optional[int]) -> str:
+    """ISO date of an epoch timestamp, or UNKNOWN_DATE."""
+    if ts is None:
+        return UNKNOWN_DATE
+    return epoch_to_datetime(ts).date().isoformat()
+
 
-    return datetime.now()
+def span_days(first_ts: Optional[int], last_ts: Optional[int]) -> int:
+    """Days covered by [first, last], counting both ends; 0 when unknown."""
+    if first_ts is None or last_ts is None:
+        return 0
+    return (last_ts - first_ts) // 86400 + 1
@@ -4,12 +4,13 @@ Flask API skeleton for Skill Scope.
 
 import json
 import tempfile
+from collections.abc import Mapping
 from typing import Any, Dict
 
 from flask import Flask, jsonify, request
 
 from file_parser import check_file_validity
-from services.scan_service import run_scan
+from services.scan_service import rescore_scans, run_scan
 
 
 def _parse_bool(value, default=False) -> bool:
@@ -40,7 +41,11 @@ def _parse_advanced_options(value) -> Dict[str, Any]:
 
 
 def _json_safe(payload: Any) -> Any:
-    return json.loads(json.dumps(payload, default=str))
+    # scan results are lazy Mappings (ScanResult), not dicts
+    def _default(value):
+        return dict(value) if isinstance(value, Mapping) else str(value)
+
+    return json.loads(json.dumps(payload, default=_default))
 
 
 def create_app() -> Flask:
@@ -86,13 +91,16 @@ def create_app() -> Flask:
         if not file_list:
             return jsonify({"error": "invalid or empty zip file"}), 400
 
-        results = run_scan(
-            file_list,
-            analysis_mode,
-            advanced_options,
-            consent=consent,
-            persist=persist,
-        )
+        try:
+            results = run_scan(
+                file_list,
+                analysis_mode,
+                advanced_options,
+                consent=consent,
+                persist=persist,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         return jsonify(
             {
@@ -102,6 +110,35 @@ def create_app() -> Flask:
             }
         )
 
+    def _rescore(summary_ids):
+        payload = request.get_json(silent=True) or {}
+        try:
+            rescored = rescore_scans(
+                summary_ids,
+                score_weights=payload.get("score_weights"),
+                score_caps=payload.get("score_caps"),
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"rescored": rescored})
+
+    @app.post("/scans/rescore")
+    def rescore_all_scans():
+        payload = request.get_json(silent=True) or {}
+        summary_ids = payload.get("summary_ids")
+        if summary_ids is not None and not isinstance(summary_ids, list):
+            return jsonify({"error": "summary_ids must be a list"}), 400
+        return _rescore(summary_ids)
+
+    @app.post("/scans/<int:summary_id>/rescore")
+    def rescore_scan(summary_id):
+        response = _rescore([summary_id])
+        if isinstance(response, tuple):
+            return response
+        if not response.get_json()["rescored"]:
+            return jsonify({"error": "scan not found"}), 404
+        return response
+
     return app
 
 
@@ -0,0 +1,590 @@
+"""
+Reads git history straight out of a zip archive, without extracting `.git/`.
+
+The object store of a repository is usually the biggest part of an upload,
+and extracting it only so that git can read it back is wasted I/O. An
+ArchiveRepository reads the archive members under a `<project>/.git/`
+prefix directly:
+
+    refs          HEAD, loose refs/* members and packed-refs
+    loose objects zlib-compressed objects/xx/yyyy... members
+    packs         objects/pack/*.idx (v1/v2) + *.pack, including
+                  OFS_DELTA / REF_DELTA resolution
+
+That is enough to walk the commits and diff trees, so it yields the same
+records as git_history.iter_git_log (numstat against the first parent,
+no rename detection, binary files as 0/0). Line counts come from a Myers
+edit distance, which gives the minimal diff; git's xdiff may settle for a
+slightly larger one on very big, heavily edited files. The diff is bounded:
+past MAX_DIFF_LINES changed lines or MAX_EDIT_DISTANCE edits a file counts
+as rewritten (every changed line deleted and re-added), and the diff loop
+checks the analysis deadline.
+
+Pack and index members are streamed once into an anonymous temporary file
+and memory-mapped (the archive members are compressed streams, so they
+cannot be sliced in place); only the pages of objects actually read are
+loaded.
+"""
+
+from __future__ import annotations
+
+import heapq
+import mmap
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from deadlines import check_deadline
+
+_OBJ_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+_OFS_DELTA = 6
+_REF_DELTA = 7
+
+# git treats a blob as binary when its first 8000 bytes contain a NUL
+_BINARY_SNIFF = 8000
+
+_TREE_MODE = b"40000"
+_GITLINK_MODE = b"160000"
+
+_INFLATE_CHUNK = 64 * 1024
+_CACHE_ENTRIES = 512  # resolved delta bases / trees kept around
+
+# Bounds of the line diff (see count_line_changes); past them a file counts as rewritten
+MAX_DIFF_LINES = 50_000
+MAX_EDIT_DISTANCE = 1_000
+
+
+class ArchiveGitError(Exception):
+    """Raised when the archive does not contain a readable git repository."""
+
+
+# ----------------------------------------------------------------------------
+# Low-level object decoding
+# ----------------------------------------------------------------------------
+def _inflate(data, pos: int) -> bytes:
+    """Decompresses the zlib stream that starts at data[pos] (its length is not stored)."""
+    view = memoryview(data)
+    d = zlib.decompressobj()
+    out = []
+    while not d.eof:
+        chunk = view[pos:pos + _INFLATE_CHUNK]
+        if not chunk:
+            raise ArchiveGitError("truncated zlib stream in pack")
+        out.append(d.decompress(chunk))
+        pos += len(chunk)
+    return b"".join(out)
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    pos = 0
+
+    def varint():
+        nonlocal pos
+        value = shift = 0
+        while True:
+            c = delta[pos]
+            pos += 1
+            value |= (c & 0x7F) << shift
+            shift += 7
+            if not c & 0x80:
+                return value
+
+    varint()  # source size
+    target_size = varint()
+    out = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            # copy from base: offset/size bytes present per bit
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset:offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos:pos + op]
+            pos += op
+        else:
+            raise ArchiveGitError("invalid delta opcode 0")
+    if len(out) != target_size:
+        raise ArchiveGitError("delta produced the wrong size")
+    return bytes(out)
+
+
+def _spooled_map(member_file) -> Tuple[Optional[mmap.mmap], object]:
+    """
+    Streams an open archive member into an anonymous temporary file and
+    memory-maps it: random access at constant memory. Returns (map, file).
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        shutil.copyfileobj(member_file, spool, _INFLATE_CHUNK)
+        spool.flush()
+        if not spool.tell():
+            return None, spool  # mmap cannot map an empty file
+        return mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ), spool
+    except BaseException:
+        spool.close()
+        raise
+
+
+class _Pack:
+    """One idx/pack pair, memory-mapped (see _spooled_map)."""
+
+    def __init__(self, idx, pack, files=()):
+        self.pack = pack
+        self.idx = idx
+        self._files = list(files)  # spool files behind the maps, closed with the pack
+        if idx is None or pack is None or len(idx) < 1024:
+            raise ArchiveGitError("empty or truncated pack")
+        if idx[:4] == b"\xfftOc":
+            if struct.unpack(">I", idx[4:8])[0] != 2:
+                raise ArchiveGitError("unsupported pack index version")
+            self.version = 2
+            fanout_at = 8
+        else:
+            self.version = 1
+            fanout_at = 0
+        self.fanout = struct.unpack(">256I", idx[fanout_at:fanout_at + 1024])
+        self.count = self.fanout[255]
+        self._names_at = fanout_at + 1024
+
+    def _name(self, i: int) -> bytes:
+        if self.version == 2:
+            at = self._names_at + 20 * i
+        else:
+            at = self._names_at + 24 * i + 4
+        return self.idx[at:at + 20]
+
+    def _offset(self, i: int) -> int:
+        if self.version == 1:
+            at = self._names_at + 24 * i
+            return struct.unpack(">I", self.idx[at:at + 4])[0]
+        offsets_at = self._names_at + 24 * self.count  # names (20) + crc (4) per object
+        (offset,) = struct.unpack(">I", self.idx[offsets_at + 4 * i:offsets_at + 4 * i + 4])
+        if offset & 0x80000000:
+            large_at = offsets_at + 4 * self.count + 8 * (offset & 0x7FFFFFFF)
+            (offset,) = struct.unpack(">Q", self.idx[large_at:large_at + 8])
+        return offset
+
+    def find(self, raw_sha: bytes) -> Optional[int]:
+        """Pack offset of an object (binary SHA), or None if the pack lacks it."""
+        first = raw_sha[0]
+        lo = self.fanout[first - 1] if first else 0
+        hi = self.fanout[first]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self._name(mid)
+            if name < raw_sha:
+                lo = mid + 1
+            elif name > raw_sha:
+                hi = mid
+            else:
+                return self._offset(mid)
+        return None
+
+    def close(self) -> None:
+        for data in (self.pack, self.idx):
+            if isinstance(data, mmap.mmap):
+                data.close()
+        for f in self._files:
+            f.close()
+
+
+# ----------------------------------------------------------------------------
+# Line diff
+# ----------------------------------------------------------------------------
+def _split_lines(data: bytes) -> List[bytes]:
+    """Lines with their newline; a missing final newline makes that line differ."""
+    parts = data.split(b"\n")
+    lines = [p + b"\n" for p in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+def _edit_distance(a: List, b: List, limit: Optional[int] = None) -> Optional[int]:
+    """
+    Myers O(ND) shortest edit script length (insertions + deletions), O(N)
+    memory. None once it would exceed limit (the work grows with limit squared).
+    """
+    n, m = len(a), len(b)
+    max_d = n + m if limit is None else min(n + m, limit)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    for d in range(max_d + 1):
+        # pure Python, so nothing to kill: stop cooperatively at the deadline
+        check_deadline()
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return d
+    return None if max_d < n + m else max_d
+
+
+def count_line_changes(old: bytes, new: bytes) -> Tuple[int, int]:
+    """
+    (insertions, deletions) between two blobs, like `git diff --numstat`;
+    binary is (0, 0). A change bigger than MAX_DIFF_LINES lines or
+    MAX_EDIT_DISTANCE edits is counted as a rewrite of the changed region.
+    """
+    if b"\0" in old[:_BINARY_SNIFF] or b"\0" in new[:_BINARY_SNIFF]:
+        return 0, 0
+    a, b = _split_lines(old), _split_lines(new)
+
+    # trim the common head/tail, then diff line ids instead of line bytes
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    if start == end_a or start == end_b or (end_a - start) + (end_b - start) > MAX_DIFF_LINES:
+        return end_b - start, end_a - start
+    ids = {}
+    a = [ids.setdefault(line, len(ids)) for line in a[start:end_a]]
+    b = [ids.setdefault(line, len(ids)) for line in b[start:end_b]]
+
+    d = _edit_distance(a, b, MAX_EDIT_DISTANCE)
+    if d is None:
+        return len(b), len(a)
+    insertions = (d + len(b) - len(a)) // 2
+    return insertions, d - insertions
+
+
+# ----------------------------------------------------------------------------
+# Repository
+# ----------------------------------------------------------------------------
+def _person(value: str) -> Tuple[str, int]:
+    """('Name <email> 1700000000 +0100') -> (email, timestamp)."""
+    left, right = value.rfind("<"), value.rfind(">")
+    email = value[left + 1:right] if left != -1 and right > left else ""
+    try:
+        timestamp = int(value[right + 1:].split()[0])
+    except (IndexError, ValueError):
+        timestamp = 0
+    return email, timestamp
+
+
+class ArchiveRepository:
+    """
+    Git repository stored inside a zip archive under git_prefix
+    (the `.git/` directory member, e.g. "project/.git/").
+    Raises ArchiveGitError if there is no HEAD under that prefix.
+    """
+
+    def __init__(self, zip_path: str, git_prefix: str):
+        self.zip_path = zip_path
+        self.prefix = git_prefix.rstrip("/") + "/"
+        self._zip = zipfile.ZipFile(zip_path, "r")
+        self._members = {
+            name[len(self.prefix):]
+            for name in self._zip.namelist()
+            if name.startswith(self.prefix) and not name.endswith("/")
+        }
+        if "HEAD" not in self._members:
+            self._zip.close()
+            raise ArchiveGitError(f"No git repository at {git_prefix} in {zip_path}")
+        self._packs = None
+        self._cache = OrderedDict()
+        self._shallow = set(self._text("shallow").split()) if "shallow" in self._members else set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._cache.clear()
+        for pack in self._packs or ():
+            pack.close()
+        self._packs = None
+        self._zip.close()
+
+    def _read(self, member: str) -> bytes:
+        return self._zip.read(self.prefix + member)
+
+    def _text(self, member: str) -> str:
+        return self._read(member).decode("utf-8", errors="replace")
+
+    # -------------------------
+    # Refs
+    # -------------------------
+    def refs(self, prefix: str = "refs/") -> Dict[str, str]:
+        """{ref name: sha} from packed-refs and loose ref members (loose ones win)."""
+        found = {}
+        if "packed-refs" in self._members:
+            for line in self._text("packed-refs").splitlines():
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, name = line.strip().partition(" ")
+                if name.startswith(prefix):
+                    found[name] = sha
+        for member in sorted(self._members):
+            if member.startswith(prefix) and member.startswith("refs/"):
+                value = self._text(member).strip()
+                if value and not value.startswith("ref:"):
+                    found[member] = value
+        return found
+
+    def branches(self) -> List[str]:
+        """Local branch names (refs/heads/*), sorted."""
+        return sorted(name[len("refs/heads/"):] for name in self.refs("refs/heads/"))
+
+    def head(self) -> Optional[str]:
+        value = self._text("HEAD").strip()
+        if value.startswith("ref:"):
+            return self.refs().get(value[4:].strip())
+        return value or None
+
+    # -------------------------
+    # Objects
+    # -------------------------
+    def _load_packs(self) -> List[_Pack]:
+        if self._packs is None:
+            self._packs = []
+            for member in sorted(self._members):
+                if member.startswith("objects/pack/") and member.endswith(".idx"):
+                    pack_member = member[:-4] + ".pack"
+                    if pack_member in self._members:
+                        self._packs.append(self._open_pack(member, pack_member))
+        return self._packs
+
+    def _open_pack(self, idx_member: str, pack_member: str) -> _Pack:
+        maps, files = [], []
+        try:
+            for member in (idx_member, pack_member):
+                with self._zip.open(self.prefix + member) as f:
+                    data, spool = _spooled_map(f)
+                files.append(spool)
+                maps.append(data)
+            return _Pack(maps[0], maps[1], files)
+        except BaseException:
+            for data in maps:
+                if data is not None:
+                    data.close()
+            for f in files:
+                f.close()
+            raise
+
+    def _cached(self, key, value=None):
+        if value is None:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+        self._cache[key] = value
+        if len(self._cache) > _CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+        return value
+
+    def _pack_object(self, pack: _Pack, offset: int) -> Tuple[str, bytes]:
+        hit = self._cached((id(pack), offset))
+        if hit is not None:
+            return hit
+
+        data = pack.pack
+        pos = offset
+        c = data[pos]
+        pos += 1
+        kind = (c >> 4) & 7
+        while c & 0x80:  # skip the rest of the size varint (inflating tells us)
+            c = data[pos]
+            pos += 1
+
+        if kind == _OFS_DELTA:
+            c = data[pos]
+            pos += 1
+            back = c & 0x7F
+            while c & 0x80:
+                c = data[pos]
+                pos += 1
+                back = ((back + 1) << 7) | (c & 0x7F)
+            base_type, base = self._pack_object(pack, offset - back)
+            result = (base_type, _apply_delta(base, _inflate(data, pos)))
+        elif kind == _REF_DELTA:
+            base_type, base = self.read_object(data[pos:pos + 20].hex())
+            if base_type is None:
+                raise ArchiveGitError("delta base object missing")
+            result = (base_type, _apply_delta(base, _inflate(data, pos + 20)))
+        elif kind in _OBJ_TYPES:
+            result = (_OBJ_TYPES[kind], _inflate(data, pos))
+        else:
+            raise ArchiveGitError(f"unknown pack object type {kind}")
+
+        return self._cached((id(pack), offset), result)
+
+    def read_object(self, sha: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """(type, content) of an object, (None, None) if the archive does not have it."""
+        raw = bytes.fromhex(sha)
+        for pack in self._load_packs():
+            offset = pack.find(raw)
+            if offset is not None:
+                return self._pack_object(pack, offset)
+
+        member = f"objects/{sha[:2]}/{sha[2:]}"
+        if member in self._members:
+            data = zlib.decompress(self._read(member))
+            header, _, content = data.partition(b"\0")
+            return header.split(b" ")[0].decode("ascii"), content
+        return None, None
+
+    def _commit(self, sha: str) -> Optional[Dict]:
+        obj_type, data = self.read_object(sha)
+        while obj_type == "tag":  # annotated tags point at the commit
+            target = data.split(b"\n", 1)[0].split(b" ")[1].decode("ascii")
+            sha = target
+            obj_type, data = self.read_object(target)
+        if obj_type != "commit":
+            return None
+
+        commit = {"sha": sha, "tree": None, "parents": [], "author": ("", 0), "committer": ("", 0)}
+        for line in data.split(b"\n\n", 1)[0].decode("utf-8", errors="replace").split("\n"):
+            key, _, value = line.partition(" ")
+            if key == "tree":
+                commit["tree"] = value
+            elif key == "parent":
+                commit["parents"].append(value)
+            elif key in ("author", "committer"):
+                commit[key] = _person(value)
+        if sha in self._shallow:
+            commit["parents"] = []
+        return commit
+
+    def _tree(self, sha: Optional[str]) -> Dict[bytes, Tuple[bytes, str]]:
+        """{name: (mode, sha)} of a tree; {} for None (the empty tree)."""
+        if sha is None:
+            return {}
+        hit = self._cached(("tree", sha))
+        if hit is not None:
+            return hit
+        _, data = self.read_object(sha)
+        entries = {}
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            entries[data[space + 1:nul]] = (data[pos:space], data[nul + 1:nul + 21].hex())
+            pos = nul + 21
+        return self._cached(("tree", sha), entries)
+
+    def _blob(self, mode: bytes, sha: Optional[str]) -> bytes:
+        if sha is None:
+            return b""
+        if mode == _GITLINK_MODE:
+            return f"Subproject commit {sha}\n".encode("ascii")
+        _, data = self.read_object(sha)
+        return data or b""
+
+    # -------------------------
+    # Diffs / history
+    # -------------------------
+    def _diff_trees(self, old: Optional[str], new: Optional[str], path: bytes, files: Dict) -> None:
+        if old == new:
+            return
+        old_entries, new_entries = self._tree(old), self._tree(new)
+        for name in sorted(old_entries.keys() | new_entries.keys()):
+            old_mode, old_sha = old_entries.get(name, (None, None))
+            new_mode, new_sha = new_entries.get(name, (None, None))
+            if old_mode == new_mode and old_sha == new_sha:
+                continue
+            full = path + name
+            old_is_tree, new_is_tree = old_mode == _TREE_MODE, new_mode == _TREE_MODE
+            if old_is_tree or new_is_tree:
+                # a tree on either side; a file on the other side is a delete/add of that path
+                self._diff_trees(old_sha if old_is_tree else None, new_sha if new_is_tree else None, full + b"/", files)
+                if old_mode is not None and not old_is_tree:
+                    files[full.decode("utf-8", errors="replace")] = count_line_changes(self._blob(old_mode, old_sha), b"")
+                if new_mode is not None and not new_is_tree:
+                    files[full.decode("utf-8", errors="replace")] = count_line_changes(b"", self._blob(new_mode, new_sha))
+                continue
+            if old_sha == new_sha:
+                changes = (0, 0)  # mode-only change
+            else:
+                changes = count_line_changes(self._blob(old_mode, old_sha), self._blob(new_mode, new_sha))
+            files[full.decode("utf-8", errors="replace")] = changes
+
+    def _record(self, commit: Dict, with_stats: bool) -> Dict:
+        files = {}
+        if with_stats:
+            parent_tree = None
+            if commit["parents"]:
+                parent = self._commit(commit["parents"][0])
+                parent_tree = parent["tree"] if parent else None
+            self._diff_trees(parent_tree, commit["tree"], b"", files)
+        return {
+            "sha": commit["sha"],
+            "author_email": commit["author"][0],
+            "authored_date": commit["author"][1],
+            "committed_date": commit["committer"][1],
+            "parent_count": len(commit["parents"]),
+            "files": files,
+        }
+
+    def _walk(self) -> Iterator[Dict]:
+        """Commits reachable from HEAD and all refs, newest committer date first (git log's default order)."""
+        tips = list(self.refs().values())
+        head = self.head()
+        if head:
+            tips.insert(0, head)
+
+        seen = set()
+        heap = []
+        counter = 0
+        for sha in tips:
+            commit = self._commit(sha)
+            if commit and commit["sha"] not in seen:
+                seen.add(commit["sha"])
+                heapq.heappush(heap, (-commit["committer"][1], counter, commit))
+                counter += 1
+
+        while heap:
+            # pure Python, so nothing to kill: stop cooperatively at the deadline
+            check_deadline()
+            _, _, commit = heapq.heappop(heap)
+            yield commit
+            for parent_sha in commit["parents"]:
+                if parent_sha in seen:
+                    continue
+                seen.add(parent_sha)
+                parent = self._commit(parent_sha)
+                if parent is not None:
+                    heapq.heappush(heap, (-parent["committer"][1], counter, parent))
+                    counter += 1
+
+    def iter_history(self) -> Iterator[Dict]:
+        """Same records, in the same order, as git_history.iter_git_log on the extracted repo."""
+        for commit in self._walk():
+            yield self._record(commit, with_stats=True)
+
+    def iter_headers(self) -> Iterator[Dict]:
+        """Like iter_history without per-file stats (cheap: no tree diffs)."""
+        for commit in self._walk():
+            yield self._record(commit, with_stats=False)
+
+    def iter_commits(self, shas: Iterable[str]) -> Iterator[Dict]:
+        """Full records (with stats) for explicit SHAs, in the given order."""
+        for sha in shas:
+            commit = self._commit(sha)
+            if commit is not None:
+                yield self._record(commit, with_stats=True)
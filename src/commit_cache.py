@@ -0,0 +1,233 @@
+"""
+Persistent per-commit stats cache (SQLite), keyed by commit SHA.
+
+Commits are immutable, so once a commit's author, timestamps, parent count and
+numstat have been read they never need to be read again - no matter which
+repository, upload or clone the commit shows up in.
+
+On a scan only `git rev-list --all` runs for the full history; commits missing
+from the cache are fetched with one `git log --no-walk --stdin --numstat` and
+stored, then the whole history is served from the cache batch by batch.
+
+The same database also keeps line-ownership (blame) results per file version,
+see ownership.py.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+import db
+from git_history import iter_git_log, iter_rev_list
+
+DEFAULT_CACHE_FILENAME = "commit_cache.db"
+DEFAULT_CACHE_PATH = os.path.join(db.DB_DIR, DEFAULT_CACHE_FILENAME)
+
+# SQLite's default host parameter limit is 999; stay well below it
+_BATCH_SIZE = 500
+
+CREATE_COMMITS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS commits (
+    sha TEXT PRIMARY KEY,
+    author_email TEXT NOT NULL,
+    authored_date INTEGER NOT NULL,
+    committed_date INTEGER NOT NULL,
+    parent_count INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+
+CREATE_COMMIT_FILES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS commit_files (
+    sha TEXT NOT NULL,
+    path TEXT NOT NULL,
+    insertions INTEGER NOT NULL,
+    deletions INTEGER NOT NULL,
+    PRIMARY KEY (sha, path)
+) WITHOUT ROWID
+"""
+
+
+# Line ownership (git blame) per file version. Blame depends on the path's
+# history, so the key is (repository, path, blob); head records where it was computed.
+CREATE_OWNERSHIP_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS blame_ownership (
+    repo_key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    blob TEXT NOT NULL,
+    head TEXT NOT NULL,
+    owners TEXT NOT NULL,
+    PRIMARY KEY (repo_key, path, blob)
+) WITHOUT ROWID
+"""
+
+
+class CommitCache:
+    """
+    Thin wrapper around the cache database.
+    The connection is opened lazily so creating a cache object is free.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH):
+        self.db_path = db_path
+        self._conn = None
+
+    # -------------------------
+    # Connection handling
+    # -------------------------
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # generous timeout: several scans may share the cache file
+            self._conn = sqlite3.connect(self.db_path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(CREATE_COMMITS_TABLE_SQL)
+            self._conn.execute(CREATE_COMMIT_FILES_TABLE_SQL)
+            self._conn.execute(CREATE_OWNERSHIP_TABLE_SQL)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # -------------------------
+    # Reads / writes
+    # -------------------------
+    def get_many(self, shas: List[str]) -> Dict[str, Dict]:
+        """Returns {sha: commit record} for the SHAs that are cached."""
+        conn = self._connect()
+        found = {}
+        for i in range(0, len(shas), _BATCH_SIZE):
+            batch = shas[i:i + _BATCH_SIZE]
+            marks = ",".join("?" * len(batch))
+            for sha, email, authored, committed, parents in conn.execute(
+                f"SELECT sha, author_email, authored_date, committed_date, parent_count "
+                f"FROM commits WHERE sha IN ({marks})",
+                batch,
+            ):
+                found[sha] = {
+                    "sha": sha,
+                    "author_email": email,
+                    "authored_date": authored,
+                    "committed_date": committed,
+                    "parent_count": parents,
+                    "files": {},
+                }
+            for sha, path, insertions, deletions in conn.execute(
+                f"SELECT sha, path, insertions, deletions FROM commit_files WHERE sha IN ({marks})",
+                batch,
+            ):
+                found[sha]["files"][path] = (insertions, deletions)
+        return found
+
+    def put_many(self, records: List[Dict]) -> None:
+        """Stores commit records (as yielded by git_history) in one transaction."""
+        if not records:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?)",
+                [
+                    (r["sha"], r["author_email"], r["authored_date"], r["committed_date"], r["parent_count"])
+                    for r in records
+                ],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO commit_files VALUES (?, ?, ?, ?)",
+                [
+                    (r["sha"], path, ins, dels)
+                    for r in records
+                    for path, (ins, dels) in r["files"].items()
+                ],
+            )
+
+    def get_ownership(self, repo_key: str, files: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, int]]:
+        """{(path, blob): {email: surviving lines}} for the (path, blob) pairs already blamed."""
+        conn = self._connect()
+        wanted = set(files)
+        found = {}
+        paths = sorted({path for path, _ in files})
+        for i in range(0, len(paths), _BATCH_SIZE):
+            batch = paths[i:i + _BATCH_SIZE]
+            marks = ",".join("?" * len(batch))
+            for path, blob, owners in conn.execute(
+                f"SELECT path, blob, owners FROM blame_ownership WHERE repo_key = ? AND path IN ({marks})",
+                [repo_key, *batch],
+            ):
+                if (path, blob) in wanted:
+                    found[(path, blob)] = json.loads(owners)
+        return found
+
+    def put_ownership(self, repo_key: str, head: str, rows: List[Tuple[str, str, Dict[str, int]]]) -> None:
+        """Stores [(path, blob, {email: lines})] blamed at head."""
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO blame_ownership VALUES (?, ?, ?, ?, ?)",
+                [(repo_key, path, blob, head, json.dumps(owners)) for path, blob, owners in rows],
+            )
+
+    # -------------------------
+    # History
+    # -------------------------
+    def _known(self, shas: List[str]) -> set:
+        """Returns the subset of shas (one batch) that is already cached."""
+        marks = ",".join("?" * len(shas))
+        rows = self._connect().execute(f"SELECT sha FROM commits WHERE sha IN ({marks})", shas)
+        return {sha for (sha,) in rows}
+
+    def iter_history(self, repo_root: str, rev_args=("--all",)) -> Iterator[Dict]:
+        """
+        Yields the same records, in the same order, as git_history.iter_git_log(repo_root, rev_args),
+        walking only the commits that are not cached yet.
+        """
+        return self.iter_through(lambda: iter_rev_list(repo_root, rev_args), self._git_fetcher(repo_root))
+
+    def iter_commits(self, repo_root: str, shas: List[str]) -> Iterator[Dict]:
+        """Yields the records for an explicit list of SHAs (in that order), walking only uncached ones."""
+        return self.iter_through(lambda: iter(shas), self._git_fetcher(repo_root))
+
+    def iter_through(self, list_shas: Callable[[], Iterable[str]], fetch: Callable[[List[str]], Iterable[Dict]]) -> Iterator[Dict]:
+        """
+        Generic read-through: list_shas() streams the wanted SHAs in order (it is
+        called twice), fetch(missing) produces records for the uncached ones.
+
+        Memory stays bounded by one batch of records (plus the SHAs still missing
+        from the cache): the first pass finds the gaps, the second serves
+        everything from the database in order.
+        """
+        missing = []
+        for batch in _batched(list_shas()):
+            known = self._known(batch)
+            missing.extend(sha for sha in batch if sha not in known)
+
+        if missing:
+            for batch in _batched(fetch(missing)):
+                self.put_many(batch)
+
+        for batch in _batched(list_shas()):
+            found = self.get_many(batch)
+            for sha in batch:
+                yield found[sha]
+
+    @staticmethod
+    def _git_fetcher(repo_root: str):
+        """fetch() for iter_through: one git log over exactly the missing commits."""
+        return lambda missing: iter_git_log(repo_root, ("--no-walk=unsorted", "--stdin"), stdin_revs=missing)
+
+
+def _batched(items, size=_BATCH_SIZE):
+    """Groups an iterable into lists of at most size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -27,29 +27,40 @@ def get_contrib_pct(contrib_obj: Any) -> float:
         return 0.0
 
 
+def contributor_scores(score: float, per_contributor_pct: Dict[str, float]) -> Dict[str, float]:
+    """name -> adjusted score: the project score split by contribution %."""
+    return {key: score * (pct / 100.0) for key, pct in per_contributor_pct.items()}
+
+
 def apply_contributor_breakdown(
     *,
     proj_name: str,
-    score: float,
+    score: float | None,
     filters: Dict[str, Any],
     project_meta: Dict[str, Any] | None,
     contributor_profiles: MutableMapping[str, Dict[str, Any]],
     detect_activity: Callable[[str, str], str],
     skill_from_ext: Callable[[str], str | None],
-) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, Set[str]]]:
+) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, Set[str]], Dict[str, Dict[str, Any]]]:
     """
     Builds:
-      - per_contributor_scores: name -> adjusted score
-      - per_contributor_pct:    name -> contribution %
-      - per_contributor_skills: name -> {skills}
+      - per_contributor_scores:   name -> adjusted score
+      - per_contributor_pct:      name -> contribution %
+      - per_contributor_skills:   name -> {skills}
+      - per_contributor_activity: name -> weekly activity (metrics + compact series, see activity_series)
 
     Also updates contributor_profiles[name] with:
       - skills set
       - projects list (with stats)
+
+    score=None when the project is not scored yet (scores are computed for all
+    projects at once): per_contributor_scores and the project entries' "score"
+    are then left for the caller to fill in with contributor_scores().
     """
     per_contributor_scores: Dict[str, float] = {}
     per_contributor_pct: Dict[str, float] = {}
     per_contributor_skills: Dict[str, Set[str]] = defaultdict(set)
+    per_contributor_activity: Dict[str, Dict[str, Any]] = {}
 
     contributors_raw = project_meta.get("contributors", []) if project_meta else []
 
@@ -65,7 +76,10 @@ def apply_contributor_breakdown(
 
             pct = get_contrib_pct(c)
             per_contributor_pct[key] = pct
-            per_contributor_scores[key] = score * (pct / 100.0)
+            if score is not None:
+                per_contributor_scores[key] = score * (pct / 100.0)
+            if c.get("activity"):
+                per_contributor_activity[key] = c["activity"]
 
             # skills from loc_by_type
             loc_map = c.get("loc_by_type", {}) or {}
@@ -98,7 +112,7 @@ def apply_contributor_breakdown(
                 {
                     "name": proj_name,
                     "pct": pct,
-                    "score": score * (pct / 100.0),
+                    "score": score * (pct / 100.0) if score is not None else None,
                     "files_worked": len(files_edited),
                     "files_list": files_edited,
                     "user_code_files": user_code,
@@ -108,6 +122,7 @@ def apply_contributor_breakdown(
                     "insertions": c.get("insertions", 0),
                     "deletions": c.get("deletions", 0),
                     "commit_count": c.get("commit_count", 0),
+                    "activity": c.get("activity"),
                 }
             )
 
@@ -116,6 +131,7 @@ def apply_contributor_breakdown(
             key = normalize_name(str(c))
             if key:
                 per_contributor_pct[key] = 0.0
-                per_contributor_scores[key] = 0.0
+                if score is not None:
+                    per_contributor_scores[key] = 0.0
 
-    return per_contributor_scores, per_contributor_pct, per_contributor_skills
+    return per_contributor_scores, per_contributor_pct, per_contributor_skills, per_contributor_activity
@@ -2,7 +2,7 @@ import sqlite3
 import json
 import os
 from datetime import datetime
-from typing import Any, Mapping
+from typing import Any, Callable, Iterable, List, Mapping, Optional
 
 # Default DB file name
 DEFAULT_DB_FILENAME = "skillscope.db"
@@ -117,6 +117,7 @@ def save_full_scan(
         "skills_chronological": analysis_results.get("skills_chronological", []),
         "projects_chronological": analysis_results.get("projects_chronological", []),
         "contributor_profiles": analysis_results.get("contributor_profiles", {}),
+        "scoring": analysis_results.get("scoring"),
         "analysis_mode": analysis_mode,
         "user_consent": "Yes" if user_consent else "No",
         "timestamp": datetime.now().isoformat()
@@ -163,6 +164,44 @@ def get_full_scan_by_id(summary_id, db_path=DB_NAME):
             }
         return None
     
+def rewrite_full_scans(
+    transform: Callable[[dict], Optional[dict]],
+    summary_ids: Optional[Iterable[int]] = None,
+    db_path: str = DB_NAME,
+) -> List[int]:
+    """
+    Replace the JSON data of the given scans (all scans when None) with
+    transform(scan_data), in one transaction. Scans for which transform
+    returns None are left as they are. Returns the IDs that were rewritten.
+    """
+    with sqlite3.connect(db_path) as conn:
+        ensure_db_initialized(conn)
+        if summary_ids is None:
+            rows = conn.execute(
+                "SELECT summary_id, project_summaries_json FROM full_scan_summaries ORDER BY summary_id"
+            ).fetchall()
+        else:
+            ids = list(summary_ids)
+            rows = conn.execute(
+                f"SELECT summary_id, project_summaries_json FROM full_scan_summaries "
+                f"WHERE summary_id IN ({', '.join('?' * len(ids))}) ORDER BY summary_id",
+                ids,
+            ).fetchall() if ids else []
+
+        updates = []
+        for summary_id, raw in rows:
+            scan_data = transform(json.loads(raw) if raw else {})
+            if scan_data is not None:
+                updates.append((json.dumps(scan_data, ensure_ascii=False, default=str), summary_id))
+
+        conn.executemany(
+            "UPDATE full_scan_summaries SET project_summaries_json = ? WHERE summary_id = ?",
+            updates,
+        )
+        conn.commit()
+    return [summary_id for _, summary_id in updates]
+
+
 def delete_full_scan_by_id(summary_id, db_path=DB_NAME):
     """Permanently delete a scan record by its ID."""
     with sqlite3.connect(db_path) as conn:
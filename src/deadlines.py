@@ -0,0 +1,255 @@
+"""
+Deadlines and resource limits for repository analysis.
+
+A corrupted or pathological .git can make git spin or balloon instead of
+failing, and `except Exception` never fires for a stall. Repository analysis
+therefore runs each stage (fingerprint, history, ownership) under a Deadline:
+
+  - every git subprocess is started through popen()/run(), which registers
+    it with the active deadline and gives it RLIMIT_AS / RLIMIT_CPU limits
+  - when a deadline passes (or is cancelled from another thread) its
+    subprocesses are killed, so blocked reads return immediately
+  - Python loops call check_deadline() between commits (cooperative
+    cancellation); it raises AnalysisTimeout once the deadline is gone
+
+The caller catches AnalysisTimeout and records the repo as partial with
+whatever was aggregated so far, so one bad repo cannot hold up the scan.
+
+The active deadline is per context (a contextvar): concurrent scans in one
+process (API requests are handled in threads) each see only their own.
+Worker threads do not inherit it; code that fans out to a thread pool hands
+the deadline on explicitly with `active(deadline)` (see ownership).
+
+Unlike the budget's max_seconds (see repo_budget), which switches a slow
+repo to sampling, a deadline is a hard stop.
+"""
+
+from __future__ import annotations
+
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits
+    resource = None
+
+# Seconds per analysis stage; a value <= 0 (or None) disables that deadline
+DEFAULT_DEADLINES = {"fingerprint": 60, "history": 600, "ownership": 300}
+
+# Per git process. Address space is generous because git mmaps pack windows
+# (and releases them when an mmap fails), CPU is cumulative CPU seconds.
+GIT_MAX_MEMORY_BYTES = 4 * 1024 ** 3
+GIT_MAX_CPU_SECONDS = 900
+
+# Signal a process gets when it reaches its soft CPU limit
+_CPU_SIGNAL = getattr(signal, "SIGXCPU", None)
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("deadline", default=None)  # innermost active Deadline
+
+
+class AnalysisTimeout(Exception):
+    """Raised when the active deadline has passed or was cancelled."""
+
+
+def deadlines_from_options(options) -> Dict[str, Optional[float]]:
+    """
+    Stage deadlines from the advanced options (`<stage>_deadline` seconds),
+    falling back to DEFAULT_DEADLINES; <= 0 turns a stage's deadline off.
+    Raises ValueError for non-numeric values.
+    """
+    deadlines = dict(DEFAULT_DEADLINES)
+    for stage in DEFAULT_DEADLINES:
+        key = f"{stage}_deadline"
+        value = (options or {}).get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{key} must be a number of seconds, got {value!r}")
+        deadlines[stage] = value if value > 0 else None
+    return deadlines
+
+
+class Deadline:
+    """
+    A stage deadline, used as a context manager. Nested deadlines never
+    outlive the one they are nested in. seconds=None means no time limit
+    (but cancel() still works).
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.parent = None
+        self.expires_at = None
+        self._cancelled = threading.Event()
+        self._procs = set()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._token = None
+
+    def __enter__(self):
+        self.parent = _current.get()
+        if self.seconds is not None:
+            self.expires_at = time.monotonic() + self.seconds
+        if self.parent is not None and self.parent.expires_at is not None:
+            self.expires_at = min(self.expires_at or self.parent.expires_at, self.parent.expires_at)
+        if self.expires_at is not None:
+            self._timer = threading.Timer(max(self.expires_at - time.monotonic(), 0), self.cancel)
+            self._timer.daemon = True
+            self._timer.start()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        if self._timer is not None:
+            self._timer.cancel()
+        _current.reset(self._token)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (0 once expired), None without a time limit."""
+        if self.expired():
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        if self._cancelled.is_set():
+            return True
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            return True
+        return self.parent is not None and self.parent.expired()
+
+    def cancel(self) -> None:
+        """Expires the deadline now and kills its subprocesses (safe from any thread)."""
+        self._cancelled.set()
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+    def check(self) -> None:
+        if self.expired():
+            raise AnalysisTimeout(f"analysis deadline of {self.seconds}s exceeded")
+
+    # Processes are tracked on the whole chain, so cancelling an outer
+    # deadline also kills what an inner stage started
+    def _track(self, proc) -> None:
+        deadline = self
+        while deadline is not None:
+            with deadline._lock:
+                deadline._procs.add(proc)
+            deadline = deadline.parent
+
+    def _untrack(self, proc) -> None:
+        deadline = self
+        while deadline is not None:
+            with deadline._lock:
+                deadline._procs.discard(proc)
+            deadline = deadline.parent
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def active(deadline: Optional[Deadline]) -> Iterator[None]:
+    """
+    Makes `deadline` (from current_deadline() in the submitting thread) the
+    active one in a worker thread, which does not inherit it.
+    """
+    token = _current.set(deadline)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def check_deadline() -> None:
+    """Cooperative cancellation point: raises AnalysisTimeout if the active deadline is gone."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def _limit_resources(pid: int) -> None:
+    """Applies the git memory / CPU limits to a started process (Linux prlimit)."""
+    cpu = (GIT_MAX_CPU_SECONDS, GIT_MAX_CPU_SECONDS + 5)  # SIGXCPU first, SIGKILL after
+    try:
+        resource.prlimit(pid, resource.RLIMIT_AS, (GIT_MAX_MEMORY_BYTES, GIT_MAX_MEMORY_BYTES))
+        resource.prlimit(pid, resource.RLIMIT_CPU, cpu)
+    except (OSError, ValueError):
+        pass  # the process already exited, or limits cannot be lowered here
+
+
+def _limit_self() -> None:
+    """preexec_fn variant for platforms without prlimit (runs in the child before exec)."""
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (GIT_MAX_MEMORY_BYTES, GIT_MAX_MEMORY_BYTES))
+        resource.setrlimit(resource.RLIMIT_CPU, (GIT_MAX_CPU_SECONDS, GIT_MAX_CPU_SECONDS + 5))
+    except (OSError, ValueError):
+        pass
+
+
+def popen(cmd, **kwargs) -> subprocess.Popen:
+    """
+    subprocess.Popen for git: resource-limited and killed when the active
+    deadline expires. Raises AnalysisTimeout if it already has.
+    Call release(proc) once the process has been waited for, and
+    check_stalled(proc) if it failed.
+    """
+    check_deadline()
+    use_prlimit = resource is not None and hasattr(resource, "prlimit")
+    if resource is not None and not use_prlimit:
+        kwargs.setdefault("preexec_fn", _limit_self)
+    proc = subprocess.Popen(cmd, **kwargs)
+    if use_prlimit:
+        _limit_resources(proc.pid)
+    deadline = _current.get()
+    if deadline is not None:
+        deadline._track(proc)
+        proc._deadline = deadline
+    return proc
+
+
+def release(proc) -> None:
+    """Stops tracking a process once it has been waited for."""
+    deadline = getattr(proc, "_deadline", None)
+    if deadline is not None:
+        deadline._untrack(proc)
+
+
+def check_stalled(proc) -> None:
+    """
+    For a process that failed: raises AnalysisTimeout if it was killed by the
+    deadline or by its CPU limit (a stall, not a git error).
+    """
+    deadline = getattr(proc, "_deadline", None)
+    if deadline is not None:
+        deadline.check()
+    if _CPU_SIGNAL is not None and proc.returncode == -_CPU_SIGNAL:
+        raise AnalysisTimeout("git exceeded its CPU time limit")
+
+
+def run(cmd, **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run counterpart of popen(): output is captured, stalls raise AnalysisTimeout."""
+    proc = popen(cmd, **kwargs)
+    try:
+        stdout, stderr = proc.communicate()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        release(proc)
+    if proc.returncode != 0:
+        check_stalled(proc)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
@@ -0,0 +1,132 @@
+"""
+Directory tree index for a scan
+
+- Built once per scan from the file records (archive-relative logical_path
+  when the parser recorded it, else filename)
+- Every directory node carries aggregates of its whole subtree: byte size,
+  file count, files per category / language, first / last modification
+  (epoch seconds, None when unknown), computed bottom-up in one pass
+- Lookups ("what's under services/") are dict lookups, and the size ranking
+  is computed once, so largest() is a slice
+
+Node aggregates are plain dicts, so the tree serializes like the rest of the
+scan results.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from analysis_utils import record_epoch
+
+ROOT = ""  # path of the root node
+
+
+def normalize_dir(path: str) -> str:
+    """"./services/", "/services" and "services" all name the same node."""
+    parts = [p for p in (path or "").replace("\\", "/").split("/") if p and p != "."]
+    return "/".join(parts)
+
+
+def _new_node(path: str) -> Dict[str, Any]:
+    return {
+        "path": path,
+        "size": 0,
+        "files": 0,
+        "categories": {},
+        "languages": {},
+        "first_ts": None,
+        "last_ts": None,
+        "children": [],
+    }
+
+
+def _fold(into: Dict[str, Any], size: int, files: int, categories: Dict[str, int],
+          languages: Dict[str, int], first_ts: Optional[int], last_ts: Optional[int]) -> None:
+    into["size"] += size
+    into["files"] += files
+    for key, n in categories.items():
+        into["categories"][key] = into["categories"].get(key, 0) + n
+    for key, n in languages.items():
+        into["languages"][key] = into["languages"].get(key, 0) + n
+    if first_ts is not None and (into["first_ts"] is None or first_ts < into["first_ts"]):
+        into["first_ts"] = first_ts
+    if last_ts is not None and (into["last_ts"] is None or last_ts > into["last_ts"]):
+        into["last_ts"] = last_ts
+
+
+class DirTree(Mapping):
+    """directory path -> aggregates of everything under it (see module docstring)."""
+
+    def __init__(self, nodes: Dict[str, Dict[str, Any]]):
+        self._nodes = nodes
+        # directories by subtree size, biggest first (ties by path)
+        self._by_size = sorted(nodes, key=lambda p: (-nodes[p]["size"], p))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "DirTree":
+        nodes = {ROOT: _new_node(ROOT)}
+
+        def _dir(path: str) -> Dict[str, Any]:
+            node = nodes.get(path)
+            if node is None:
+                parent_path = path.rpartition("/")[0]
+                _dir(parent_path)["children"].append(path)
+                node = nodes[path] = _new_node(path)
+            return node
+
+        # 1) each file is counted in its own directory only
+        for f in records:
+            path = normalize_dir(f.get("logical_path") or f.get("filename"))
+            if not path:
+                continue
+            if not f.get("isFile", True):
+                _dir(path)
+                continue
+            ts = record_epoch(f)
+            _fold(
+                _dir(path.rpartition("/")[0]),
+                f.get("size") or 0,
+                1,
+                {f.get("category") or "uncategorized": 1},
+                {f["language"]: 1} if f.get("language") else {},
+                ts,
+                ts,
+            )
+
+        # 2) bottom-up: deepest directories first, each folded into its parent once
+        for path in sorted(nodes, key=lambda p: p.count("/") + bool(p), reverse=True):
+            if path == ROOT:
+                continue
+            node = nodes[path]
+            node["children"].sort()
+            _fold(nodes[path.rpartition("/")[0]], node["size"], node["files"], node["categories"],
+                  node["languages"], node["first_ts"], node["last_ts"])
+        nodes[ROOT]["children"].sort()
+        return cls(nodes)
+
+    def __getitem__(self, path: str) -> Dict[str, Any]:
+        return self._nodes[normalize_dir(path)]
+
+    def __contains__(self, path) -> bool:
+        return isinstance(path, str) and normalize_dir(path) in self._nodes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __repr__(self) -> str:
+        return f"DirTree({self._nodes!r})"
+
+    def largest(self, n: int = 10, include_root: bool = False) -> List[Dict[str, Any]]:
+        """The n directories with the most bytes under them."""
+        paths = self._by_size if include_root else (p for p in self._by_size if p != ROOT)
+        out = []
+        for path in paths:
+            if len(out) >= n:
+                break
+            out.append(self._nodes[path])
+        return out
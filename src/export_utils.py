@@ -0,0 +1,263 @@
+"""
+Export stage for scan results (replaces the fixed project CSV of analyze_projects)
+
+- Tables (projects, contributors, files, skills, directories) are generators of rows, so
+  the per-file table of a huge scan is written at constant memory
+- Formats are pluggable writers (csv, ndjson) in EXPORT_WRITERS
+- Every scan gets its own file names (<scan_name>_<table>.<format>), written
+  to a temp file and moved into place, so an open file is never half-written
+- Nothing here prompts: a file that cannot be written is reported and skipped
+
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from analysis_utils import center_text, epoch_to_datetime, record_epoch
+
+# columns of each table, in output order
+PROJECT_COLUMNS = [
+    "project",
+    "total_files",
+    "duration_days",
+    "code_files",
+    "test_files",
+    "doc_files",
+    "design_files",
+    "languages",
+    "language_shares",
+    "frameworks",
+    "skills",
+    "is_collaborative",
+    "repo_name",
+    "repo_root",
+    "authors",
+    "contributors",
+    "branch_count",
+    "has_merges",
+    "project_type",
+    "repo_duration_days",
+    "commit_frequency",
+    "commits_per_week",
+    "activity",
+    "first_modified",
+    "last_modified",
+    "score",
+    "per_contributor_scores",
+    "per_contributor_pct",
+    "per_contributor_skills",
+    "per_contributor_activity",
+]
+
+CONTRIBUTOR_COLUMNS = [
+    "contributor",
+    "project",
+    "pct",
+    "score",
+    "files_worked",
+    "user_code_files",
+    "user_test_files",
+    "user_doc_files",
+    "user_design_files",
+    "insertions",
+    "deletions",
+    "commit_count",
+    "activity",
+    "skills",
+]
+
+FILE_COLUMNS = ["project", "filename", "extension", "category", "language", "size", "is_file", "last_modified"]
+
+SKILL_COLUMNS = ["skill", "first_used", "last_used"]
+
+DIRECTORY_COLUMNS = ["path", "size", "files", "categories", "languages", "first_modified", "last_modified"]
+
+
+# --------------------------------------------------------
+# Tables (generators of row dicts)
+# --------------------------------------------------------
+
+def project_rows(results: Mapping[str, Any], files=None) -> Iterator[Dict[str, Any]]:
+    for p in results.get("project_summaries") or []:
+        yield {k: p.get(k) for k in PROJECT_COLUMNS}
+
+
+def contributor_rows(results: Mapping[str, Any], files=None) -> Iterator[Dict[str, Any]]:
+    """One row per contributor and project they worked on."""
+    for name, profile in (results.get("contributor_profiles") or {}).items():
+        skills = ", ".join(profile.get("skills") or [])
+        for entry in profile.get("projects") or []:
+            row = {k: entry.get(k) for k in CONTRIBUTOR_COLUMNS}
+            row.update(contributor=name, project=entry.get("name"), skills=skills)
+            yield row
+
+
+def file_rows(results: Mapping[str, Any], files=None) -> Iterator[Dict[str, Any]]:
+    """One row per file; `files` is an iterable of (project name, file record) pairs."""
+    for project, f in files or ():
+        yield {
+            "project": project,
+            "filename": f.get("filename"),
+            "extension": f.get("extension", ""),
+            "category": f.get("category", ""),
+            "language": f.get("language", ""),
+            "size": f.get("size"),
+            "is_file": f.get("isFile", True),
+            "last_modified": epoch_to_datetime(record_epoch(f)),
+        }
+
+
+def skill_rows(results: Mapping[str, Any], files=None) -> Iterator[Dict[str, Any]]:
+    for row in results.get("skills_chronological") or []:
+        yield {k: row.get(k) for k in SKILL_COLUMNS}
+
+
+def directory_rows(results: Mapping[str, Any], files=None) -> Iterator[Dict[str, Any]]:
+    """One row per directory of the scan's directory tree, with its subtree totals."""
+    for path, node in (results.get("directory_tree") or {}).items():
+        row = {k: node.get(k) for k in DIRECTORY_COLUMNS}
+        row.update(
+            path=path,
+            first_modified=epoch_to_datetime(node.get("first_ts")),
+            last_modified=epoch_to_datetime(node.get("last_ts")),
+        )
+        yield row
+
+
+# table name -> (columns, row generator(results, files))
+EXPORT_TABLES: Dict[str, Tuple[List[str], Callable[..., Iterable[Dict[str, Any]]]]] = {
+    "projects": (PROJECT_COLUMNS, project_rows),
+    "contributors": (CONTRIBUTOR_COLUMNS, contributor_rows),
+    "files": (FILE_COLUMNS, file_rows),
+    "skills": (SKILL_COLUMNS, skill_rows),
+    "directories": (DIRECTORY_COLUMNS, directory_rows),
+}
+
+
+# --------------------------------------------------------
+# Writers
+# --------------------------------------------------------
+
+def _plain(value: Any) -> Any:
+    """JSON-compatible value: datetimes as ISO strings, sets as sorted lists."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return value
+
+
+def _write_csv(out, columns: Sequence[str], rows: Iterable[Dict[str, Any]]) -> int:
+    """Nested values (dicts / lists) are written as JSON."""
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        values = []
+        for k in columns:
+            v = _plain(row.get(k))
+            if isinstance(v, (dict, list)):
+                v = json.dumps(v, ensure_ascii=False, default=str)
+            values.append("" if v is None else v)
+        writer.writerow(values)
+        count += 1
+    return count
+
+
+def _write_ndjson(out, columns: Sequence[str], rows: Iterable[Dict[str, Any]]) -> int:
+    count = 0
+    for row in rows:
+        out.write(json.dumps({k: _plain(row.get(k)) for k in columns}, ensure_ascii=False, default=str))
+        out.write("\n")
+        count += 1
+    return count
+
+
+# format -> writer(text stream, columns, rows) -> rows written
+EXPORT_WRITERS: Dict[str, Callable[..., int]] = {
+    "csv": _write_csv,
+    "ndjson": _write_ndjson,
+}
+
+
+def export_options(options: Optional[Mapping[str, Any]]) -> Tuple[List[str], List[str]]:
+    """
+    (formats, tables) from the advanced options `export_formats` /
+    `export_tables` (lists or comma separated strings). Defaults: csv, all tables.
+    Raises ValueError for unknown names.
+    """
+    def _names(value, default, known):
+        if value is None:
+            return list(default)
+        if isinstance(value, str):
+            value = [v for v in (part.strip().lower() for part in value.split(",")) if v]
+        names = list(dict.fromkeys(value))
+        unknown = [n for n in names if n not in known]
+        if unknown:
+            raise ValueError(f"Unknown export option(s): {', '.join(map(str, unknown))}")
+        return names
+
+    options = options or {}
+    return (
+        _names(options.get("export_formats"), ["csv"], EXPORT_WRITERS),
+        _names(options.get("export_tables"), EXPORT_TABLES, EXPORT_TABLES),
+    )
+
+
+def default_scan_name() -> str:
+    return datetime.now().strftime("scan_%Y%m%d-%H%M%S")
+
+
+def _unique_path(out_dir: str, scan_name: str, table: str, fmt: str) -> str:
+    path = os.path.join(out_dir, f"{scan_name}_{table}.{fmt}")
+    n = 2
+    while os.path.exists(path):
+        path = os.path.join(out_dir, f"{scan_name}-{n}_{table}.{fmt}")
+        n += 1
+    return path
+
+
+def export_scan(
+    results: Mapping[str, Any],
+    files: Optional[Callable[[], Iterable[Tuple[str, Mapping[str, Any]]]]] = None,
+    formats: Sequence[str] = ("csv",),
+    tables: Optional[Sequence[str]] = None,
+    out_dir: Optional[str] = None,
+    scan_name: Optional[str] = None,
+) -> List[str]:
+    """
+    Streams the scan's tables to <out_dir>/<scan_name>_<table>.<format> and
+    returns the written paths. `files` is a callable returning a fresh
+    iterable of (project name, file record) pairs (called once per format).
+    Files that cannot be written are reported and skipped; never prompts.
+    """
+    if out_dir is None:
+        from file_parser import OUTPUT_DIR
+        out_dir = OUTPUT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    scan_name = scan_name or default_scan_name()
+
+    written = []
+    for table in tables if tables is not None else EXPORT_TABLES:
+        columns, make_rows = EXPORT_TABLES[table]
+        for fmt in formats:
+            write = EXPORT_WRITERS[fmt]
+            path = _unique_path(out_dir, scan_name, table, fmt)
+            tmp_path = None
+            try:
+                fd, tmp_path = tempfile.mkstemp(prefix=f".{scan_name}_{table}.", suffix=".tmp", dir=out_dir)
+                with os.fdopen(fd, "w", newline="", encoding="utf-8") as out:
+                    write(out, columns, make_rows(results, files() if files else None))
+                os.replace(tmp_path, path)
+                written.append(path)
+            except OSError as e:
+                print(center_text(f"[WARN] Could not export {table} ({fmt}) to '{path}': {e}"))
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    return written
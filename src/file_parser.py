@@ -113,19 +113,27 @@ def check_file_validity(zip_path):
                 print(_center_text("Zip file is valid, but empty."))
                 return None
 
-            # Extract once, using the already-open zip_ref
-            temp_dir = extract_zip_to_temp(zip_path, zip_ref=zip_ref)
+            # Extract once, using the already-open zip_ref. Git object stores
+            # stay in the archive: repo analysis reads them from there.
+            members = [info for info in infos if not _in_git_dir(info.filename)]
+            temp_dir = extract_zip_to_temp(zip_path, zip_ref=zip_ref, members=members)
 
             # Build file tree with directories included
             file_tree = []
             for info in infos:
                 full_path = os.path.join(temp_dir, info.filename)
-                file_tree.append({
+                entry = {
                     "filename": full_path,
                     "size": info.file_size,
                     "last_modified": info.date_time,
-                    "isFile": not info.is_dir()
-                })
+                    "isFile": not info.is_dir(),
+                    "logical_path": info.filename,  # path inside the zip (project grouping, directory tree)
+                }
+                if _is_git_dir(info.filename) or _is_git_file(info.filename):
+                    # Lets repo analysis find the (unextracted) .git in the archive
+                    entry["archive_path"] = zip_path
+                    entry["archive_member"] = info.filename
+                file_tree.append(entry)
 
         return file_tree
 
@@ -140,21 +148,38 @@ def check_file_validity(zip_path):
         return None
 
 
-def extract_zip_to_temp(zip_path, zip_ref=None):
+def _is_git_dir(member_name):
+    """True for the `.git/` directory member of a repository (e.g. "project/.git/")."""
+    return member_name.endswith("/") and member_name.rstrip("/").split("/")[-1] == ".git"
+
+
+def _is_git_file(member_name):
+    """True for a `.git` *file* (gitdir pointer of a submodule or worktree)."""
+    return not member_name.endswith("/") and member_name.split("/")[-1] == ".git"
+
+
+def _in_git_dir(member_name):
+    """True for a `.git/` directory member or anything inside one."""
+    parts = member_name.rstrip("/").split("/")
+    return ".git" in parts[:-1] or _is_git_dir(member_name)
+
+
+def extract_zip_to_temp(zip_path, zip_ref=None, members=None):
     """
     Extracts a zip file into a temporary directory and returns the path.
 
     For performance, if an already-open ZipFile object is provided via
     zip_ref, it will be used instead of reopening the archive.
+    members (optional) limits extraction to those ZipInfo entries / names.
     """
     temp_dir = tempfile.mkdtemp()
 
     if zip_ref is not None:
         # Use the existing open handle (no extra open or central directory read)
-        zip_ref.extractall(temp_dir)
+        zip_ref.extractall(temp_dir, members=members)
     else:
         # Backward-compatible usage if called elsewhere with only zip_path
         with zipfile.ZipFile(zip_path, 'r') as z:
-            z.extractall(temp_dir)
+            z.extractall(temp_dir, members=members)
 
     return temp_dir
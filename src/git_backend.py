@@ -0,0 +1,245 @@
+"""
+Long-lived `git cat-file` processes for object and ref access.
+
+GitPython resolves branches and objects with a fresh git call (or a pure
+Python walk of the object store) per lookup, which is slow on large repos.
+A GitBackend keeps one `git cat-file --batch-check` and one
+`git cat-file --batch` process per repository, started on first use, and
+pipelines lookups through them: a whole list of object names is written
+while the answers are read back. Subprocess creation is O(1) per repo no
+matter how many objects are looked up.
+
+Refs (branches) are read straight from the git directory (loose refs plus
+packed-refs), which needs no process at all.
+
+One backend serves a repository's whole analysis: branch and tag enumeration
+for the history, then the tree and blob reads of the ownership stage.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import deadlines
+
+
+class InvalidRepositoryError(Exception):
+    """Raised when a directory is not (the work tree of) a git repository."""
+
+
+def find_git_dir(repo_root: str) -> str:
+    """
+    Returns the git directory of repo_root: `.git/` itself, the directory a
+    `.git` file points at (`gitdir: ...`, used by submodules and worktrees),
+    or repo_root itself when it is a bare repository.
+    """
+    path = os.path.join(repo_root, ".git")
+    if not os.path.exists(path) and os.path.isdir(os.path.join(repo_root, "objects")):
+        path = repo_root
+    elif os.path.isfile(path):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            line = f.readline().strip()
+        if line.startswith("gitdir:"):
+            path = os.path.join(repo_root, line[len("gitdir:"):].strip())
+    if not os.path.isfile(os.path.join(path, "HEAD")):
+        raise InvalidRepositoryError(f"Not a git repository: {repo_root}")
+    return os.path.normpath(path)
+
+
+class GitBackend:
+    """
+    Object/ref reader for one repository. Use as a context manager (or call
+    close()) so the cat-file processes are shut down.
+    Raises InvalidRepositoryError if repo_root is not a git repository.
+    """
+
+    def __init__(self, repo_root: str):
+        self.repo_root = repo_root
+        self.git_dir = find_git_dir(repo_root)
+        self._procs = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------
+    # Processes
+    # -------------------------
+    def _process(self, mode: str) -> subprocess.Popen:
+        proc = self._procs.get(mode)
+        if proc is None or proc.poll() is not None:
+            # resource-limited and killed with the active deadline (see deadlines)
+            proc = deadlines.popen(
+                ["git", "-C", self.repo_root, "cat-file", f"--{mode}"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._procs[mode] = proc
+        return proc
+
+    def close(self) -> None:
+        for proc in self._procs.values():
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            proc.stdout.close()
+            proc.wait()
+            deadlines.release(proc)
+        self._procs = {}
+
+    def _pipeline(self, mode: str, names: List[str], with_data: bool) -> Iterator[Tuple]:
+        """
+        Writes all names from a helper thread while reading the answers here,
+        so neither side can block on a full pipe.
+        """
+        proc = self._process(mode)
+        payload = b"".join(name.encode("utf-8") + b"\n" for name in names)
+
+        def write():
+            try:
+                proc.stdin.write(payload)
+                proc.stdin.flush()
+            except OSError:
+                pass  # the process died; the reader below reports it
+
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        try:
+            for name in names:
+                header = proc.stdout.readline()
+                if not header:
+                    proc.poll()
+                    deadlines.check_stalled(proc)
+                    raise RuntimeError(f"git cat-file --{mode} exited unexpectedly")
+                parts = header.split()
+                if len(parts) != 3:
+                    # "<name> missing" / "<name> ambiguous"
+                    yield (name, None, None, None) if with_data else (name, None, None)
+                    continue
+                oid, obj_type, size = parts[0].decode("ascii"), parts[1].decode("ascii"), int(parts[2])
+                if with_data:
+                    data = proc.stdout.read(size + 1)[:-1]  # content + trailing LF
+                    yield (name, oid, obj_type, data)
+                else:
+                    yield (name, oid, obj_type, size)
+        finally:
+            writer.join()
+
+    # -------------------------
+    # Objects
+    # -------------------------
+    def info_many(self, names: Iterable[str]) -> List[Tuple[str, Optional[str], Optional[str], Optional[int]]]:
+        """[(name, oid, type, size)] in input order; oid/type/size are None for missing objects."""
+        with self._lock:
+            return list(self._pipeline("batch-check", list(names), with_data=False))
+
+    def read_many(self, names: Iterable[str]) -> List[Tuple[str, Optional[str], Optional[str], Optional[bytes]]]:
+        """[(name, oid, type, content)] in input order; oid/type/content are None for missing objects."""
+        with self._lock:
+            return list(self._pipeline("batch", list(names), with_data=True))
+
+    def read(self, name: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """(type, content) of one object, (None, None) if it does not exist."""
+        _, _, obj_type, data = self.read_many([name])[0]
+        return obj_type, data
+
+    def read_commits(self, names: Iterable[str]) -> List[Optional[Dict]]:
+        """Parsed commit headers: {"sha", "tree", "parents", "author", "committer"} (None if missing)."""
+        commits = []
+        for _, oid, obj_type, data in self.read_many(names):
+            if obj_type != "commit":
+                commits.append(None)
+                continue
+            header = data.split(b"\n\n", 1)[0].decode("utf-8", errors="replace")
+            commit = {"sha": oid, "tree": None, "parents": [], "author": None, "committer": None}
+            for line in header.split("\n"):
+                key, _, value = line.partition(" ")
+                if key == "parent":
+                    commit["parents"].append(value)
+                elif key in ("tree", "author", "committer"):
+                    commit[key] = value
+            commits.append(commit)
+        return commits
+
+    def ls_tree(self, rev: str = "HEAD") -> List[Tuple[str, str, int]]:
+        """
+        [(path, blob sha, size)] of every regular file in rev's tree, read
+        level by level through the batch processes (no per-directory git call).
+        Symlinks and submodule gitlinks are skipped.
+        """
+        commit = self.read_commits([rev])[0]
+        if commit is None:
+            return []
+        files = []
+        level = [("", commit["tree"])]
+        while level:
+            next_level = []
+            blobs = []
+            for (prefix, _), (_, _, _, data) in zip(level, self.read_many([sha for _, sha in level])):
+                pos = 0
+                while data and pos < len(data):
+                    space = data.index(b" ", pos)
+                    nul = data.index(b"\0", space)
+                    mode = data[pos:space]
+                    name = data[space + 1:nul].decode("utf-8", errors="replace")
+                    sha = data[nul + 1:nul + 21].hex()
+                    pos = nul + 21
+                    if mode == b"40000":
+                        next_level.append((prefix + name + "/", sha))
+                    elif mode in (b"100644", b"100755", b"100664"):
+                        blobs.append((prefix + name, sha))
+            for (path, sha), (_, _, _, size) in zip(blobs, self.info_many([sha for _, sha in blobs])):
+                files.append((path, sha, size or 0))
+            level = next_level
+        return sorted(files)
+
+    # -------------------------
+    # Refs
+    # -------------------------
+    def refs(self, prefix: str = "refs/") -> Dict[str, str]:
+        """{ref name: sha} from packed-refs and loose ref files (loose ones win)."""
+        found = {}
+
+        packed = os.path.join(self.git_dir, "packed-refs")
+        if os.path.isfile(packed):
+            with open(packed, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    # "# pack-refs with: ..." header and "^<sha>" peeled tag lines
+                    if line.startswith(("#", "^")):
+                        continue
+                    sha, _, name = line.strip().partition(" ")
+                    if name.startswith(prefix):
+                        found[name] = sha
+
+        refs_dir = os.path.join(self.git_dir, "refs")
+        for dirpath, _, filenames in os.walk(refs_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, self.git_dir).replace(os.sep, "/")
+                if not name.startswith(prefix):
+                    continue
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    value = f.read().strip()
+                if value and not value.startswith("ref:"):
+                    found[name] = value
+        return found
+
+    def head(self) -> Optional[str]:
+        """SHA that HEAD points at (following one symbolic ref), or None on an unborn branch."""
+        with open(os.path.join(self.git_dir, "HEAD"), "r", encoding="utf-8", errors="replace") as f:
+            value = f.read().strip()
+        if value.startswith("ref:"):
+            return self.refs().get(value[4:].strip())
+        return value or None
+
+    def branches(self) -> List[str]:
+        """Local branch names (refs/heads/*), sorted."""
+        return sorted(name[len("refs/heads/"):] for name in self.refs("refs/heads/"))
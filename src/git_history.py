@@ -0,0 +1,162 @@
+"""
+Streams commit history out of a single `git log` process.
+
+GitPython's Commit.stats spawns one `git diff --numstat` per commit, so a
+20k-commit repo costs 20k subprocesses. Here the whole history (metadata +
+per-file numstat) comes from ONE `git log --all --numstat` invocation that is
+parsed incrementally as it is read.
+
+Each commit is yielded as a plain dict:
+    {
+        "sha": str,
+        "author_email": str,
+        "authored_date": int,         # unix seconds
+        "committed_date": int,        # unix seconds
+        "parent_count": int,
+        "files": {path: (insertions, deletions)},
+    }
+
+Numstat matches GitPython's Commit.stats: merges are diffed against their
+first parent, renames are not detected and binary files count as 0/0.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from typing import Dict, Iterable, Iterator
+
+import deadlines
+
+# Record separator (\x1e) starts each commit, unit separator (\x1f) splits the header fields
+LOG_FORMAT = "%x1e%H%x1f%ae%x1f%at%x1f%ct%x1f%P"
+
+LOG_ARGS = (
+    "--numstat",
+    "-z",                               # NUL-terminated, unquoted paths
+    "--no-renames",
+    "--diff-merges=first-parent",
+    f"--format={LOG_FORMAT}",
+)
+
+# Metadata only (no numstat): a fraction of the cost of a full LOG_ARGS walk
+HEADER_ARGS = (
+    "-z",
+    f"--format={LOG_FORMAT}",
+)
+
+_READ_SIZE = 64 * 1024
+
+
+def _parse_record(record: bytes) -> Dict:
+    """Parses one \\x1e-delimited chunk: header NUL [\\n] numstat entries (NUL separated)."""
+    header, _, body = record.partition(b"\0")
+    sha, email, authored, committed, parents = header.decode("utf-8", errors="replace").split("\x1f")
+
+    files = {}
+    for entry in body.lstrip(b"\n").split(b"\0"):
+        if not entry:
+            continue
+        ins, dels, path = entry.split(b"\t", 2)
+        files[path.decode("utf-8", errors="replace")] = (
+            int(ins) if ins != b"-" else 0,
+            int(dels) if dels != b"-" else 0,
+        )
+
+    return {
+        "sha": sha,
+        "author_email": email,
+        "authored_date": int(authored),
+        "committed_date": int(committed),
+        "parent_count": len(parents.split()),
+        "files": files,
+    }
+
+
+def parse_git_log(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    """
+    Incrementally parses raw `git log` output (in arbitrary chunk sizes)
+    produced with LOG_ARGS. Only one commit's worth of text is buffered.
+    """
+    pending = []  # pieces of the commit currently being read
+    for chunk in chunks:
+        head, *rest = chunk.split(b"\x1e")
+        pending.append(head)
+        if not rest:
+            continue
+        # a separator was seen: the pending pieces form one complete record
+        *complete, tail = rest
+        for record in [b"".join(pending), *complete]:
+            if record:
+                yield _parse_record(record)
+        pending = [tail]
+
+    record = b"".join(pending)
+    if record:
+        yield _parse_record(record)
+
+
+def _stream_git(repo_root: str, args, stdin_lines=None) -> Iterator[bytes]:
+    """
+    Runs `git -C repo_root <args>` and yields stdout in chunks.
+    stdin_lines (if given) are written first; git reads all of --stdin before
+    producing output, so this cannot deadlock.
+    Raises RuntimeError if git exits with an error, AnalysisTimeout if it was
+    stopped by the analysis deadline.
+    """
+    cmd = ["git", "-C", repo_root, *args]
+
+    # stderr goes to a temp file so a chatty git can never block on a full pipe
+    with tempfile.TemporaryFile() as err:
+        # resource-limited and killed with the active deadline (see deadlines)
+        proc = deadlines.popen(
+            cmd,
+            stdin=subprocess.PIPE if stdin_lines is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=err,
+        )
+        try:
+            if stdin_lines is not None:
+                for line in stdin_lines:
+                    proc.stdin.write(line.encode("utf-8") + b"\n")
+                proc.stdin.close()
+            yield from iter(lambda: proc.stdout.read(_READ_SIZE), b"")
+        finally:
+            proc.stdout.close()
+            returncode = proc.wait()
+            deadlines.release(proc)
+
+        if returncode != 0:
+            deadlines.check_stalled(proc)
+            err.seek(0)
+            message = err.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"git {args[0]} failed ({returncode}): {message}")
+
+
+def iter_git_log(repo_root: str, rev_args=("--all",), stdin_revs=None) -> Iterator[Dict]:
+    """
+    Runs one `git log` over rev_args and yields commit records as they stream in.
+    stdin_revs feeds explicit revisions (use with rev_args=("--no-walk=unsorted", "--stdin")).
+    Raises RuntimeError if git exits with an error.
+    """
+    yield from parse_git_log(_stream_git(repo_root, ["log", *rev_args, *LOG_ARGS], stdin_revs))
+
+
+def iter_commit_headers(repo_root: str, rev_args=("--all",)) -> Iterator[Dict]:
+    """
+    Like iter_git_log but without per-file stats: records carry an empty "files"
+    dict. Used to size up a history cheaply before deciding how to analyze it.
+    """
+    yield from parse_git_log(_stream_git(repo_root, ["log", *rev_args, *HEADER_ARGS]))
+
+
+def iter_rev_list(repo_root: str, rev_args=("--all",)) -> Iterator[str]:
+    """Streams commit SHAs from `git rev-list` in the same order `git log` walks them."""
+    pending = b""
+    for chunk in _stream_git(repo_root, ["rev-list", *rev_args]):
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            if line:
+                yield line.decode("ascii")
+    if pending:
+        yield pending.decode("ascii")
@@ -0,0 +1,93 @@
+"""
+Time-window and author filters for repository analysis.
+
+A scan can be limited to part of every repo's history:
+
+    since    - only commits committed at or after this moment
+    until    - only commits committed at or before this moment
+    authors  - only commits by these author emails (case-insensitive)
+
+since/until accept unix seconds, datetimes or ISO strings ("2024-01-31",
+"2024-01-31T12:00"); a date-only `until` includes that whole day. Naive
+values are local time, like the datetimes the repo analysis reports.
+
+The filter is pushed down into the history query itself (git log
+`--since`/`--until`/`--author`), so a filtered scan only reads and diffs the
+commits that match. Sources that cannot filter in git (the archive reader,
+the commit cache's SHA list) use `matches` on the cheap header records before
+any per-file stats are computed.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+HISTORY_FILTER_KEYS = ("since", "until", "authors")
+
+
+def _timestamp(value, end_of_day=False) -> int:
+    """Unix seconds of an int/float, datetime or ISO date(time) string."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    text = str(value).strip()
+    moment = datetime.fromisoformat(text)
+    if end_of_day and len(text) == 10:  # "YYYY-MM-DD"
+        moment += timedelta(days=1, seconds=-1)
+    return int(moment.timestamp())
+
+
+def history_filter_from_options(options) -> Optional[Dict]:
+    """
+    Picks the filter keys out of the advanced options:
+        {"since": int, "until": int, "authors": [lowercased emails]} (only the keys set)
+    None when no filter is set. Raises ValueError on an unparsable date.
+    """
+    if not options:
+        return None
+    history_filter = {}
+    if options.get("since") not in (None, ""):
+        history_filter["since"] = _timestamp(options["since"])
+    if options.get("until") not in (None, ""):
+        history_filter["until"] = _timestamp(options["until"], end_of_day=True)
+    authors = options.get("authors")
+    if isinstance(authors, str):
+        authors = authors.split(",")
+    authors = sorted({a.strip().lower() for a in authors or () if a and a.strip()})
+    if authors:
+        history_filter["authors"] = authors
+    return history_filter or None
+
+
+def git_filter_args(history_filter: Optional[Dict]) -> List[str]:
+    """`git log`/`git rev-list` arguments that apply the filter."""
+    if not history_filter:
+        return []
+    args = []
+    if "since" in history_filter:
+        args.append(f"--since=@{history_filter['since']}")
+    if "until" in history_filter:
+        args.append(f"--until=@{history_filter['until']}")
+    if history_filter.get("authors"):
+        # --author matches "Name <email>"; several --author options are OR'ed.
+        # Fixed-string "<email>" keeps a@x.com from also matching ba@x.com.
+        args += ["--fixed-strings", "--regexp-ignore-case"]
+        args += [f"--author=<{email}>" for email in history_filter["authors"]]
+    return args
+
+
+def matches(history_filter: Optional[Dict], commit: Dict) -> bool:
+    """Same decision as git_filter_args, for a commit record (see git_history)."""
+    if not history_filter:
+        return True
+    date = commit["committed_date"]
+    if "since" in history_filter and date < history_filter["since"]:
+        return False
+    if "until" in history_filter and date > history_filter["until"]:
+        return False
+    authors = history_filter.get("authors")
+    if authors and commit["author_email"].lower() not in authors:
+        return False
+    return True
@@ -1,150 +1,216 @@
 import re
 
+# Engines selectable through advanced_options["language_engine"]
+REGEX_ENGINE = "regex"
+MODEL_ENGINE = "model"
+LANGUAGE_ENGINES = (REGEX_ENGINE, MODEL_ENGINE)
+
+# -------------------------------------------------------------------------
+# Compiled bytes patterns
+# -------------------------------------------------------------------------
+# Every signal we look for is ASCII, so detection runs directly on the raw
+# bytes read from disk (bytes / bytearray / memoryview). No decoding needed.
+
+# Matches function/class definitions or import statements
+# Added [:(\] requirement to def/class to avoid matching text like "class Summary"
+_PYTHON_RE = re.compile(rb'^\s*(def|class)\s+\w+\s*[:\(]|^\s*import\s+\w+|^\s*from\s+\w+\s+import', re.MULTILINE)
+# Matches package declarations or public class definitions
+_JAVA_RE = re.compile(rb'^\s*package\s+[\w.]+;|^\s*public\s+class\s+\w+', re.MULTILINE)
+# Matches HTML5 doctype or html tag
+_HTML_RE = re.compile(rb'^\s*<!DOCTYPE\s+html>|^\s*<html', re.IGNORECASE | re.MULTILINE)
+# Matches ES6 imports, variable declarations, or function definitions
+_JS_RE = re.compile(rb'^\s*(import\s+.*\s+from\s+[\'"]|const\s+\w+\s*=|let\s+\w+\s*=|var\s+\w+\s*=|function\s+\w+\s*\(|console\.log\()', re.MULTILINE)
+# Type annotations or interfaces distinguish TypeScript from JavaScript
+_TS_HINT_RE = re.compile(rb':\s*(string|number|boolean|any|void)\b|interface\s+\w+')
+# Matches #include directives common in C/C++
+_INCLUDE_RE = re.compile(rb'^\s*#include\s+[<"]', re.MULTILINE)
+# Distinguishes C++ by looking for class, template, namespace, or std:: usage
+_CPP_HINT_RE = re.compile(rb'\b(class|template|namespace|std::|cout|cin)\b')
+# Matches C# specific 'using System;' directive
+_CSHARP_RE = re.compile(rb'^\s*using\s+System;', re.MULTILINE)
+# Matches CSS rules: selector { property: value }
+_CSS_RE = re.compile(rb'^\s*[.#a-zA-Z0-9_-]+\s*\{\s*[\w-]+\s*:', re.MULTILINE)
+# Stricter check: Requires context like 'SELECT * FROM' or 'INSERT INTO'
+_SQL_RE = re.compile(rb'\bSELECT\b[\s\S]+?\bFROM\b|\bINSERT\s+INTO\b|\bCREATE\s+TABLE\b|\bUPDATE\b[\s\S]+?\bSET\b', re.IGNORECASE)
+# Matches def, class, module keywords or require statements
+_RUBY_RE = re.compile(rb'^\s*(?:class|module)\s+[A-Z]\w*(?:\s*<|\s*$)|^\s*def\s+\w+|^\s*require\s+[\'"]', re.MULTILINE)
+# Matches 'package main' or function definitions
+_GO_RE = re.compile(rb'^\s*package\s+main|^\s*func\s+\w+', re.MULTILINE)
+# Matches standard PHP opening tag or short echo tag
+_PHP_TAG_RE = re.compile(rb'<\?(php|=)', re.IGNORECASE)
+_PHP_STRICT_RE = re.compile(rb'<\?php')
+# Matches standard XML declaration at start of file
+_XML_RE = re.compile(rb'^\s*<\?xml')
+_FIRST_LINE_RE = re.compile(rb'[^\n]*')
+
+
+def as_bytes(content):
+    """
+    Returns a buffer the bytes patterns can scan.
+    bytes-like input is used as-is; only str callers pay for an encode.
+    """
+    if isinstance(content, str):
+        return content.encode("utf-8", errors="ignore")
+    return content
+
+
+def shebang_language(content):
+    """
+    Returns the language named by an interpreter directive on the first line
+    (e.g. #!/bin/bash), or None if there is no recognised shebang.
+    """
+    first_line = _FIRST_LINE_RE.match(as_bytes(content)).group()
+    if first_line.startswith(b"#!"):
+        if b"python" in first_line: return "Python"
+        if b"node" in first_line: return "JavaScript"
+        if b"bash" in first_line or b"sh" in first_line: return "Shell"
+        if b"perl" in first_line: return "Perl"
+        if b"ruby" in first_line: return "Ruby"
+        if b"php" in first_line: return "PHP"
+    return None
+
+
+def get_language_detector(engine=REGEX_ENGINE):
+    """
+    Returns the detector function for the requested engine.
+    Every engine has the same signature as detect_language_from_snippet(content, ext).
+    Unknown engine names fall back to the regex heuristics.
+    """
+    if engine == MODEL_ENGINE:
+        from language_model import detect_language_from_model
+        return detect_language_from_model
+    return detect_language_from_snippet
+
+
 def detect_language_from_snippet(content, ext):
     """
-    Analyzes a text snippet (content) and file extension to identify the programming language.
+    Analyzes a snippet (content) and file extension to identify the programming language.
+    content may be str or any bytes-like buffer (bytes, bytearray, memoryview).
     
     Logic Flow:
     1. Shebang Check: Looks for #!/bin/... at the start.
     2. Priority Verification: If extension matches a known language, checks that language's regex first.
     3. General Heuristics: Scans for all language patterns (the "backup" / fallthrough).
     """
+    content = as_bytes(content)
+    ext = ext.lower()
     
     # 1. Check Shebangs (Scripts)
     # Looks for interpreter directives on the first line (e.g., #!/bin/bash)
-    first_line = content.split('\n')[0]
-    if first_line.startswith("#!"):
-        if "python" in first_line: return "Python"
-        if "node" in first_line: return "JavaScript"
-        if "bash" in first_line or "sh" in first_line: return "Shell"
-        if "perl" in first_line: return "Perl"
-        if "ruby" in first_line: return "Ruby"
-        if "php" in first_line: return "PHP"
+    shebang = shebang_language(content)
+    if shebang:
+        return shebang
 
     # 2. Priority Verification (Extension Trust)
     # If the file extension strongly suggests a language, check that SPECIFIC pattern first.
     # This prevents "Polyglot" confusion (e.g., a Python file with C comments being detected as C).
     
     # Python
-    if ext.lower() == ".py":
-        # Matches function/class definitions or import statements
-        # Added [:(\] requirement to def/class to avoid matching text like "class Summary"
-        if re.search(r'^\s*(def|class)\s+\w+\s*[:\(]|^\s*import\s+\w+|^\s*from\s+\w+\s+import', content, re.MULTILINE):
+    if ext == ".py":
+        if _PYTHON_RE.search(content):
             return "Python"
 
     # Java
-    if ext.lower() == ".java":
-        # Matches package declarations or public class definitions
-        if re.search(r'^\s*package\s+[\w.]+;|^\s*public\s+class\s+\w+', content, re.MULTILINE):
+    if ext == ".java":
+        if _JAVA_RE.search(content):
             return "Java"
 
     # HTML
-    if ext.lower() in (".html", ".htm"):
-        # Matches HTML5 doctype or html tag
-        if re.search(r'^\s*<!DOCTYPE\s+html>|^\s*<html', content, re.IGNORECASE | re.MULTILINE):
+    if ext in (".html", ".htm"):
+        if _HTML_RE.search(content):
             return "HTML"
 
     # JavaScript / TypeScript
-    if ext.lower() in (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"):
-        # Matches ES6 imports, variable declarations, or function definitions
-        if re.search(r'^\s*(import\s+.*\s+from\s+[\'"]|const\s+\w+\s*=|let\s+\w+\s*=|var\s+\w+\s*=|function\s+\w+\s*\(|console\.log\()', content, re.MULTILINE):
+    if ext in (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"):
+        if _JS_RE.search(content):
             # Simple heuristic to distinguish TS: Looks for type annotations or interfaces
-            if ext.lower() in (".ts", ".tsx"):
+            if ext in (".ts", ".tsx"):
                 return "TypeScript"
             return "JavaScript"
 
     # C / C++
-    if ext.lower() in (".c", ".cpp", ".h", ".hpp", ".cc", ".cxx"):
-        # Matches #include directives common in C/C++
-        if re.search(r'^\s*#include\s+[<"]', content, re.MULTILINE):
-            # Distinguishes C++ by looking for class, template, namespace, or std:: usage
-            if re.search(r'\b(class|template|namespace|std::|cout|cin)\b', content):
+    if ext in (".c", ".cpp", ".h", ".hpp", ".cc", ".cxx"):
+        if _INCLUDE_RE.search(content):
+            if _CPP_HINT_RE.search(content):
                 return "C++"
-            if ext.lower() in (".cpp", ".hpp", ".cc", ".cxx"):
+            if ext in (".cpp", ".hpp", ".cc", ".cxx"):
                 return "C++"
             return "C"
 
     # C#
-    if ext.lower() == ".cs":
-        # Matches C# specific 'using System;' directive
-        if re.search(r'^\s*using\s+System;', content, re.MULTILINE):
+    if ext == ".cs":
+        if _CSHARP_RE.search(content):
             return "C#"
 
     # CSS
-    if ext.lower() == ".css":
-        # Matches CSS rules: selector { property: value }
-        if re.search(r'^\s*[.#a-zA-Z0-9_-]+\s*\{\s*[\w-]+\s*:', content, re.MULTILINE):
+    if ext == ".css":
+        if _CSS_RE.search(content):
             return "CSS"
 
     # SQL
-    if ext.lower() == ".sql":
-        # Stricter check: Requires context like 'SELECT * FROM' or 'INSERT INTO'
-        if re.search(r'\bSELECT\b[\s\S]+?\bFROM\b|\bINSERT\s+INTO\b|\bCREATE\s+TABLE\b|\bUPDATE\b[\s\S]+?\bSET\b', content, re.IGNORECASE):
+    if ext == ".sql":
+        if _SQL_RE.search(content):
             return "SQL"
 
     # Ruby
-    if ext.lower() == ".rb":
-        # Matches def, class, module keywords or require statements
-        if re.search(r'^\s*(?:class|module)\s+[A-Z]\w*(?:\s*<|\s*$)|^\s*def\s+\w+|^\s*require\s+[\'"]', content, re.MULTILINE):
+    if ext == ".rb":
+        if _RUBY_RE.search(content):
             return "Ruby"
 
     # Go
-    if ext.lower() == ".go":
-        # Matches 'package main' or function definitions
-        if re.search(r'^\s*package\s+main|^\s*func\s+\w+', content, re.MULTILINE):
+    if ext == ".go":
+        if _GO_RE.search(content):
             return "Go"
 
     # PHP
-    if ext.lower() == ".php":
-        # Matches standard PHP opening tag or short echo tag
-        if re.search(r'<\?(php|=)', content, re.IGNORECASE):
+    if ext == ".php":
+        if _PHP_TAG_RE.search(content):
             return "PHP"
 
     # XML
-    if ext.lower() == ".xml":
-        # Matches standard XML declaration at start of file
-        if re.search(r'^\s*<\?xml', content):
+    if ext == ".xml":
+        if _XML_RE.search(content):
             return "XML"
 
     # 3. Regex Heuristics (The "Backup" / Fallthrough)
     # If priority verification failed (e.g. spoofed file) or extension was unknown, check everything.
     
     # XML
-    if re.search(r'^\s*<\?xml', content): return "XML"
+    if _XML_RE.search(content): return "XML"
     
     # C / C++ / C#
-    if re.search(r'^\s*#include\s+[<"]', content, re.MULTILINE):
-        if re.search(r'\b(class|template|namespace|std::|cout|cin)\b', content): return "C++"
+    if _INCLUDE_RE.search(content):
+        if _CPP_HINT_RE.search(content): return "C++"
         return "C"
-    if re.search(r'^\s*using\s+System;', content, re.MULTILINE): return "C#"
+    if _CSHARP_RE.search(content): return "C#"
     
     # JS / TS (Moved up to prevent Python import confusion)
-    if re.search(r'^\s*(import\s+.*\s+from\s+[\'"]|const\s+\w+\s*=|let\s+\w+\s*=|var\s+\w+\s*=|function\s+\w+\s*\(|console\.log\()', content, re.MULTILINE):
-        if re.search(r':\s*(string|number|boolean|any|void)\b|interface\s+\w+', content): return "TypeScript"
+    if _JS_RE.search(content):
+        if _TS_HINT_RE.search(content): return "TypeScript"
         return "JavaScript"
 
     # Python
-    if re.search(r'^\s*(def|class)\s+\w+\s*[:\(]|^\s*import\s+\w+|^\s*from\s+\w+\s+import', content, re.MULTILINE): return "Python"
+    if _PYTHON_RE.search(content): return "Python"
     
     # Java
-    if re.search(r'^\s*package\s+[\w.]+;|^\s*public\s+class\s+\w+', content, re.MULTILINE): return "Java"
+    if _JAVA_RE.search(content): return "Java"
     
     # Go
-    if re.search(r'^\s*package\s+main|^\s*func\s+\w+', content, re.MULTILINE): return "Go"
+    if _GO_RE.search(content): return "Go"
     
     # Ruby
-    if re.search(r'^\s*(?:class|module)\s+[A-Z]\w*(?:\s*<|\s*$)|^\s*def\s+\w+|^\s*require\s+[\'"]', content, re.MULTILINE): return "Ruby"
+    if _RUBY_RE.search(content): return "Ruby"
     
     # PHP
-    if re.search(r'<\?php', content): return "PHP"
+    if _PHP_STRICT_RE.search(content): return "PHP"
     
     # HTML
-    if re.search(r'^\s*<!DOCTYPE\s+html>|^\s*<html', content, re.IGNORECASE | re.MULTILINE): return "HTML"
+    if _HTML_RE.search(content): return "HTML"
     
     # CSS
-    if re.search(r'^\s*[.#a-zA-Z0-9_-]+\s*\{\s*[\w-]+\s*:', content, re.MULTILINE): return "CSS"
+    if _CSS_RE.search(content): return "CSS"
     
     # SQL
-    if re.search(r'\bSELECT\b[\s\S]+?\bFROM\b|\bINSERT\s+INTO\b|\bCREATE\s+TABLE\b|\bUPDATE\b[\s\S]+?\bSET\b', content, re.IGNORECASE): return "SQL"
+    if _SQL_RE.search(content): return "SQL"
 
     return None
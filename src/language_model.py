@@ -0,0 +1,255 @@
+"""
+Statistical (naive Bayes) language detector.
+
+Alternative engine to the regex heuristics in language_detector.py. The model
+is trained offline from a folder of labelled snippets and shipped as a small
+array-backed file (language_model.bin) next to this module.
+
+Features are extracted from raw bytes (every signal is ASCII), so callers can
+pass the bytes / memoryview they read from disk without decoding it.
+
+File layout:
+    MAGIC line, one JSON header line (labels, latin-1 vocabulary),
+    then float32 arrays: priors [L], log-likelihood table [L x V].
+
+At load time the table is turned into a hashed index feature -> row, where a
+row holds the feature's log-likelihood under every label as fixed-point lanes
+of one integer. Adding rows adds every label's score at once, so scoring a
+snippet is one tokenization pass, one C-level dict lookup per feature and one
+C-level sum(); no Python loop runs per feature or per label.
+
+Only the first MAX_SNIPPET_BYTES are tokenized, so the cost per file is
+bounded. Even so the model is the more accurate engine, not the faster one:
+tokenizing costs more than the regex engine's first-match searches (see
+utils/bench_language_engines.py).
+
+Retrain with:
+    python src/language_model.py train utils/language_corpus
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import sys
+from array import array
+from collections import Counter
+from itertools import chain, repeat
+from operator import mul
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from language_detector import as_bytes, shebang_language
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "language_model.bin")
+
+_MAGIC = b"SKILLSCOPE-LM 2\n"
+
+# Corpus folder holding prose / config samples. Winning this label means "no language".
+NONE_LABEL = "_none"
+
+# identifiers/keywords, or short runs of punctuation ("#", "::", "=>", "<?")
+_TOKEN_RE = re.compile(rb"[A-Za-z_][A-Za-z0-9_]*|[^\sA-Za-z0-9_]{1,3}")
+
+# The extension counts as a few tokens so it tips close calls
+# without overriding clear content evidence (spoofed extensions).
+EXT_WEIGHT = 2
+
+# Below these the model answers None, mirroring the regex engine's strictness.
+MIN_KNOWN_FEATURES = 3
+MIN_CONFIDENCE = 0.6
+
+# Only the head of a file is tokenized; it carries the imports / declarations.
+MAX_SNIPPET_BYTES = 2048
+
+# Row lanes: -log-likelihood in fixed point (ROW_SCALE units), ROW_LANE_BITS per
+# label, wide enough that no lane can carry into the next one.
+ROW_SCALE = 1 << 20
+ROW_LANE_BITS = 64
+_LANE_MASK = (1 << ROW_LANE_BITS) - 1
+
+_cached_model = None
+
+
+def iter_features(content, ext: str = "") -> Iterator[bytes]:
+    """
+    Every feature occurrence of a snippet (str or bytes-like): unigrams, then
+    adjacent bigrams, then the extension EXT_WEIGHT times. Tokens are
+    lowercased so SQL / HTML keyword case does not matter.
+    """
+    tokens = _TOKEN_RE.findall(bytes(as_bytes(content)[:MAX_SNIPPET_BYTES]).lower())
+    features = chain(tokens, map(b" ".join, zip(tokens, tokens[1:])))
+    if ext:
+        features = chain(features, repeat(b"ext:" + ext.lower().encode("utf-8", errors="ignore"), EXT_WEIGHT))
+    return features
+
+
+def extract_features(content, ext: str = "") -> Counter:
+    """Feature counts of a snippet (see iter_features), keyed by bytes."""
+    return Counter(iter_features(content, ext))
+
+
+class LanguageModel:
+    """Multinomial naive Bayes model backed by flat float32 arrays."""
+
+    def __init__(self, labels: List[str], vocab: List[bytes], priors: array, table: array):
+        self.labels = labels
+        self.vocab = vocab
+        self.priors = priors
+        self.table = table
+        # feature -> its log-likelihoods under every label, packed one lane per label
+        n = len(vocab)
+        columns = [table[j * n:(j + 1) * n].tolist() for j in range(len(labels))]
+        self.rows = {
+            feat: sum(round(-column[i] * ROW_SCALE) << (ROW_LANE_BITS * j) for j, column in enumerate(columns))
+            for i, feat in enumerate(vocab)
+        }
+
+    # -------------------------
+    # Training / persistence
+    # -------------------------
+    @classmethod
+    def train(cls, corpus_dir: str, max_features: int = 2000, alpha: float = 0.5) -> "LanguageModel":
+        """
+        Trains from corpus_dir/<Label>/<files>. Folder names are the labels
+        returned by detection (NONE_LABEL is mapped to None).
+        """
+        label_counts: Dict[str, Counter] = {}
+        doc_counts: Counter = Counter()
+
+        for label in sorted(os.listdir(corpus_dir)):
+            label_dir = os.path.join(corpus_dir, label)
+            if not os.path.isdir(label_dir):
+                continue
+            counts = Counter()
+            for name in sorted(os.listdir(label_dir)):
+                path = os.path.join(label_dir, name)
+                if not os.path.isfile(path):
+                    continue
+                with open(path, "rb") as f:
+                    content = f.read()
+                _, ext = os.path.splitext(name)
+                counts.update(extract_features(content, ext))
+                doc_counts[label] += 1
+            if counts:
+                label_counts[label] = counts
+
+        if not label_counts:
+            raise ValueError(f"No training samples found in {corpus_dir}")
+
+        labels = sorted(label_counts)
+
+        # keep the most frequent features overall
+        overall = Counter()
+        for counts in label_counts.values():
+            overall.update(counts)
+        vocab = sorted(feat for feat, _ in overall.most_common(max_features))
+
+        total_docs = sum(doc_counts.values())
+        priors = array("f", (math.log(doc_counts[l] / total_docs) for l in labels))
+
+        table = array("f")
+        for label in labels:
+            counts = label_counts[label]
+            denom = sum(counts[feat] for feat in vocab) + alpha * len(vocab)
+            table.extend(math.log((counts[feat] + alpha) / denom) for feat in vocab)
+
+        return cls(labels, vocab, priors, table)
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        vocab = [feat.decode("latin-1") for feat in self.vocab]
+        header = json.dumps({"labels": self.labels, "vocab": vocab}, ensure_ascii=False)
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(header.encode("utf-8") + b"\n")
+            self.priors.tofile(f)
+            self.table.tofile(f)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "LanguageModel":
+        with open(path, "rb") as f:
+            if f.readline() != _MAGIC:
+                raise ValueError(f"{path} is not a language model file")
+            header = json.loads(f.readline().decode("utf-8"))
+            labels = header["labels"]
+            vocab = [feat.encode("latin-1") for feat in header["vocab"]]
+            priors = array("f")
+            priors.fromfile(f, len(labels))
+            table = array("f")
+            table.fromfile(f, len(labels) * len(vocab))
+        return cls(labels, vocab, priors, table)
+
+    # -------------------------
+    # Scoring
+    # -------------------------
+    def _unpack(self, total: int) -> List[float]:
+        return [
+            prior - ((total >> (ROW_LANE_BITS * j)) & _LANE_MASK) / ROW_SCALE
+            for j, prior in enumerate(self.priors)
+        ]
+
+    def score_features(self, features: Iterable[bytes]):
+        """(log-score per label, known feature occurrences) for a stream of feature occurrences."""
+        rows = list(filter(None, map(self.rows.get, features)))
+        return self._unpack(sum(rows)), len(rows)
+
+    def scores(self, features: Counter):
+        """Returns (log-score per label, number of known feature occurrences)."""
+        rows = self.rows
+        known = [(rows[feat], n) for feat, n in features.items() if feat in rows]
+        return self._unpack(sum(map(mul, *zip(*known))) if known else 0), sum(n for _, n in known)
+
+    def predict(self, content, ext: str = "") -> Optional[str]:
+        totals, known = self.score_features(iter_features(content, ext))
+        if known < MIN_KNOWN_FEATURES:
+            return None
+
+        best = max(range(len(totals)), key=totals.__getitem__)
+        # softmax probability of the winner
+        top = totals[best]
+        confidence = 1.0 / sum(math.exp(t - top) for t in totals)
+        if confidence < MIN_CONFIDENCE:
+            return None
+
+        label = self.labels[best]
+        return None if label == NONE_LABEL else label
+
+
+def get_model(path: str = MODEL_PATH) -> Optional[LanguageModel]:
+    """Loads the shipped model once per process. Returns None if it is missing or unreadable."""
+    global _cached_model
+    if _cached_model is None:
+        try:
+            _cached_model = LanguageModel.load(path)
+        except Exception as e:
+            print(f"[language_model] Could not load model {path}: {e}")
+            _cached_model = False
+    return _cached_model or None
+
+
+def detect_language_from_model(content, ext):
+    """
+    Same contract as language_detector.detect_language_from_snippet:
+    returns a language name or None.
+    Falls back to the regex engine if the model file is unavailable.
+    """
+    shebang = shebang_language(content)
+    if shebang:
+        return shebang
+
+    model = get_model()
+    if model is None:
+        from language_detector import detect_language_from_snippet
+        return detect_language_from_snippet(content, ext)
+    return model.predict(content, ext)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "train":
+        out = sys.argv[3] if len(sys.argv) > 3 else MODEL_PATH
+        model = LanguageModel.train(sys.argv[2])
+        model.save(out)
+        print(f"Saved model ({len(model.labels)} labels, {len(model.vocab)} features) to {out}")
+    else:
+        print("usage: python language_model.py train <corpus_dir> [out_path]")
@@ -11,6 +11,7 @@ from permission_manager import (
     get_advanced_options
 )
 from file_parser import get_input_file_path
+from print_utils import BufferedRenderer
 from services.scan_service import analyze_scan, save_scan
 from scan_manager import scan_manager
 
@@ -147,7 +148,9 @@ def orchestrator(config):
         return
 
     # Step 4: Run analysis on the extracted metadata and save data to DB
-    analysis_results = analyze_scan(file_list, analysis_mode, advanced_options)
+    analysis_results = analyze_scan(
+        file_list, analysis_mode, advanced_options, renderer=BufferedRenderer(), export=True
+    )
 
     try:
         save_scan(analysis_results, analysis_mode, config.consent)
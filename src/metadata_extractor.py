@@ -1,52 +1,54 @@
+import copy
 import os
+import posixpath
 import json
 import toml  
 import yaml  
-import shutil
-from repository_extractor import analyze_repo_type
-from language_detector import detect_language_from_snippet
-
-
-def _center_text(text):
-    width = shutil.get_terminal_size(fallback=(80, 20)).columns
-    if len(text) >= width:
-        return text
-    padding = (width - len(text) + 1) // 2
-    return " " * padding + text
-
-
-def _print_banner(title, line_char="~", min_width=23):
-    line_width = max(len(title), min_width)
-    line = line_char * line_width
-    print()
-    print(_center_text(line))
-    print(_center_text(title))
-    print(_center_text(line))
-
-
-def _print_repo_skip(path):
-    _print_banner("REPO SKIPPED")
-    print(_center_text("Invalid or failed repo:"))
-    print(_center_text(path))
-
-
-def detect_language_by_content(file_path):
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from repository_extractor import analyze_repo_type, fingerprint_repo, repo_root_of
+from analysis_utils import to_epoch
+from commit_cache import CommitCache
+from deadlines import deadlines_from_options
+from history_filter import history_filter_from_options
+from repo_budget import budget_from_options
+from language_detector import REGEX_ENGINE, get_language_detector
+from print_utils import BufferedRenderer
+
+
+def detect_language_by_content(file_path, engine=REGEX_ENGINE):
     """
-    Attempts to detect language by reading the first 4KB and matching regex patterns.
+    Attempts to detect language by reading the first 4KB and matching regex patterns
+    (or scoring it with the statistical model when engine="model").
     Useful for files with missing or non-standard extensions.
+
+    The snippet stays raw bytes: every signal is ASCII, so there is no need
+    to decode (and allocate a str) just to sniff it.
     """
     try:
         # Read first 4KB to catch headers/imports that might be further down
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        with open(file_path, 'rb') as f:
             content = f.read(4096)
             
         _, ext = os.path.splitext(file_path)
-        return detect_language_from_snippet(content, ext)
+        return get_language_detector(engine)(content, ext)
 
     except Exception:
         pass
     return None
 
+def count_lines(file_path):
+    """Newline count of a file (a last line without newline counts too); None if it can't be read."""
+    lines = 0
+    last = b"\n"
+    try:
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+    except OSError:
+        return None
+    return lines + (last != b"\n")
+
 # We should do a shallow extraction regardless of the file type, and selectively deal with larger categorical extractions later
 
 
@@ -137,17 +139,23 @@ def base_extraction(file_list, filters):
                         language = languages.get(ext, "undefined")
                     
 
-            extracted_data.append(
-                {
-                    "filename": filename,
-                    "size": size,
-                    "last_modified": last_modified,
-                    "extension": ext,
-                    "category": category, 
-                    "isFile": is_file,
-                    "language": language
-                }
-            )
+            entry = {
+                "filename": filename,
+                "size": size,
+                "last_modified": last_modified,
+                "modified_ts": to_epoch(last_modified),  # normalized once here, None if unknown
+                "extension": ext,
+                "category": category, 
+                "isFile": is_file,
+                "language": language
+            }
+            if "logical_path" in f:
+                entry["logical_path"] = f["logical_path"]
+            # .git folders that were left inside the archive (see file_parser)
+            if "archive_path" in f:
+                entry["archive_path"] = f["archive_path"]
+                entry["archive_member"] = f["archive_member"]
+            extracted_data.append(entry)
 
 
     else:
@@ -235,8 +243,340 @@ def detect_frameworks(framework_file_entry):
     return dependencies
 
 
+def _analyze_repo_isolated(entry, use_cache=True, budget=None, ownership=False, history_filter=None,
+                           stage_deadlines=None, renderer=None):
+    """
+    Runs analyze_repo_type for one repo (in a worker process or inline).
+    Each call gets its own cache connection; errors are contained to this repo.
+    """
+    if renderer is None:
+        renderer = BufferedRenderer()
+    # Per-commit stats are cached across scans (commits are immutable)
+    commit_cache = CommitCache() if use_cache else None
+    try:
+        return analyze_repo_type(entry, commit_cache=commit_cache, budget=budget, ownership=ownership,
+                                 history_filter=history_filter, stage_deadlines=stage_deadlines, renderer=renderer)
+    except Exception as e:
+        renderer.repo_status("REPO ANALYSIS CRASHED", entry.get("filename", ""), str(e))
+        return None
+    finally:
+        if commit_cache is not None:
+            commit_cache.close()
+
+
+def _fingerprint_isolated(entry, stage_deadlines=None):
+    try:
+        return fingerprint_repo(entry, stage_deadlines)
+    except Exception:
+        return None
+
+
+def _group_clone_families(fingerprints):
+    """
+    Groups repo indexes into families: repos sharing any root commit are
+    copies or forks of one history. Unreadable repos stay on their own.
+    Only used to report relationships (_annotate_clones), not to batch work:
+    a class's forks of one template all share its root commit.
+    """
+    parent = list(range(len(fingerprints)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner_of_root = {}
+    for i, fp in enumerate(fingerprints):
+        for root in (fp["roots"] if fp else []):
+            if root in owner_of_root:
+                parent[find(i)] = find(owner_of_root[root])
+            else:
+                owner_of_root[root] = i
+
+    families = {}
+    for i in range(len(fingerprints)):
+        families.setdefault(find(i), []).append(i)
+    return list(families.values())
+
+
+def _group_identical_copies(repo_entries, fingerprints):
+    """
+    Groups repo indexes whose analysis is the same: identical histories (same
+    roots and tips) with the same nested-repo exclusions. Only the first of
+    each group is analyzed; forks and unreadable repos are groups of their own.
+    """
+    groups = {}
+    for i, (entry, fp) in enumerate(zip(repo_entries, fingerprints)):
+        key = (fp["id"], tuple(entry.get("excluded_paths", ()))) if fp else (None, i)
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+
+def _family_leaders(groups, families, use_cache):
+    """
+    Splits the analysis groups into those started right away and, per started
+    group (keyed by its first index), the forks that wait for it. A fork runs
+    after the first member of its family has filled the commit cache, so it
+    only walks the commits that member does not have. Without a cache there
+    is nothing to share and every group starts right away.
+    """
+    if not use_cache:
+        return list(groups), {}
+    family_of = {i: n for n, family in enumerate(families) for i in family}
+    leader_of_family = {}
+    start, waiting = [], {}
+    for group in groups:
+        family = family_of[group[0]]
+        if family in leader_of_family:
+            waiting.setdefault(leader_of_family[family], []).append(group)
+        else:
+            leader_of_family[family] = group[0]
+            start.append(group)
+    return start, waiting
+
+
+def _copy_result(result, entry):
+    """The analysis of an identical copy, relabelled for entry."""
+    if not result:
+        return result
+    result = copy.deepcopy(result)
+    result["repo_root"] = repo_root_of(entry)
+    result["repo_name"] = os.path.basename(result["repo_root"])
+    return result
+
+
+def _annotate_clones(families, fingerprints, results):
+    """
+    Records clone relationships on each analyzed repo:
+        fingerprint    - id of its roots + tips
+        clone_of       - repo_root of the first identical copy (None for the original)
+        related_repos  - repo_roots of forks (same root commits, different tips)
+    """
+    for family in families:
+        first_copy = {}
+        for i in family:
+            fp = fingerprints[i]
+            if fp and results[i]:
+                first_copy.setdefault(fp["id"], i)
+        for i in family:
+            if not results[i]:
+                continue
+            fp = fingerprints[i]
+            key = fp["id"] if fp else None
+            original = first_copy.get(key, i)
+            results[i]["fingerprint"] = key
+            results[i]["clone_of"] = results[original]["repo_root"] if original != i else None
+            results[i]["related_repos"] = [
+                results[j]["repo_root"]
+                for j in family
+                if j != i and results[j] and fingerprints[j] and fingerprints[j]["id"] != key
+            ]
+
+
+def analyze_repositories(repo_entries, use_cache=True, workers=None, budget=None, ownership=False,
+                         history_filter=None, stage_deadlines=None, renderer=None):
+    """
+    Analyzes every repository entry, fanning out to a process pool when there
+    is more than one repo. Results come back in the same order as repo_entries
+    (None for repos that failed), regardless of which worker finishes first.
+
+    Repos are fingerprinted first (root commits + ref tips): identical copies
+    are analyzed once (see _group_identical_copies), every other repo is its
+    own pool task. Unrelated repos start in parallel; the forks of one history
+    are submitted once the family's first member is done (see _family_leaders),
+    so the numstats of their common commits come from the persistent commit
+    cache instead of being walked by every fork at once.
+
+    workers: max worker processes (default: CPU count). 1 forces serial analysis.
+    budget: per-repo limits (see repo_budget); over-budget repos are sampled.
+    ownership: also compute blame-based ownership_percentage (see ownership.py).
+    history_filter: since/until/authors limits (see history_filter) applied to every repo.
+    stage_deadlines: per-repo stage deadlines (see deadlines); a repo that runs
+    out of time comes back partial instead of holding up the rest of the scan.
+    renderer: shows the per-repo progress banners (terminal by default; NullRenderer for none).
+    """
+    if not repo_entries:
+        return []
+    if renderer is None:
+        renderer = BufferedRenderer()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(repo_entries)))
+
+    results = [None] * len(repo_entries)
+    failed = []
+
+    if workers == 1:
+        fingerprints = [_fingerprint_isolated(entry, stage_deadlines) for entry in repo_entries]
+        groups = _group_identical_copies(repo_entries, fingerprints)
+        for group in groups:
+            results[group[0]] = _analyze_repo_isolated(
+                repo_entries[group[0]], use_cache, budget, ownership, history_filter, stage_deadlines, renderer,
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fingerprints = []
+            for future in [pool.submit(_fingerprint_isolated, entry, stage_deadlines) for entry in repo_entries]:
+                try:
+                    fingerprints.append(future.result())
+                except Exception:
+                    fingerprints.append(None)
+            groups = _group_identical_copies(repo_entries, fingerprints)
+            start, waiting = _family_leaders(groups, _group_clone_families(fingerprints), use_cache)
+
+            pending = {}
+
+            def _submit(group):
+                try:
+                    future = pool.submit(
+                        _analyze_repo_isolated, repo_entries[group[0]], use_cache, budget, ownership,
+                        history_filter, stage_deadlines, renderer,
+                    )
+                except Exception:
+                    # the pool is already broken: this group and its forks are retried below
+                    failed.append(group[0])
+                    for fork in waiting.pop(group[0], ()):
+                        _submit(fork)
+                    return
+                pending[future] = group
+
+            for group in start:
+                _submit(group)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    group = pending.pop(future)
+                    try:
+                        results[group[0]] = future.result()
+                    except Exception:
+                        # a worker died (e.g. killed for memory) - this breaks the whole pool
+                        failed.append(group[0])
+                    for fork in waiting.pop(group[0], ()):
+                        _submit(fork)
+
+    # Retry casualties one at a time in fresh single-worker pools, so the repo
+    # that actually crashed cannot take the others down with it again
+    for i in failed:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                results[i] = pool.submit(
+                    _analyze_repo_isolated, repo_entries[i], use_cache, budget, ownership, history_filter,
+                    stage_deadlines, renderer,
+                ).result()
+            except Exception as e:
+                renderer.repo_status("REPO ANALYSIS WORKER DIED", repo_entries[i].get("filename", ""), str(e))
+                results[i] = None
+
+    for group in groups:
+        for i in group[1:]:
+            results[i] = _copy_result(results[group[0]], repo_entries[i])
+    _annotate_clones(_group_clone_families(fingerprints), fingerprints, results)
+    return results
+
+
+def _read_gitfile(path):
+    """Target of a `.git` file ("gitdir: ../.git/modules/sub"), or None."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if line.startswith("gitdir:"):
+        return line[len("gitdir:"):].strip()
+    return None
+
+
+def _read_gitmodules(repo_root):
+    """Submodule paths declared in repo_root/.gitmodules (repo-relative, "/" separated)."""
+    paths = []
+    try:
+        with open(os.path.join(repo_root, ".gitmodules"), "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep and key.strip() == "path":
+                    paths.append(value.strip().strip("/"))
+    except OSError:
+        pass
+    return paths
+
+
+def _nearest_ancestor(path, roots):
+    """Deepest entry of roots that is path itself or one of its parent directories."""
+    current = path.rstrip("/")
+    while True:
+        if current in roots:
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def discover_repositories(extracted_data):
+    """
+    Finds every repository in the upload and how they nest:
+      - `.git/` folders (category "repository")
+      - `.git` files: submodules/worktrees whose git dir lives elsewhere
+        (e.g. the parent's .git/modules/<name>, possibly still in the archive)
+
+    Each returned repo entry gets:
+        parent_repo     repo_root of the enclosing repo (None at top level)
+        child_repos     repo_roots of repos nested directly inside it
+        submodule       True if the parent's .gitmodules declares it
+        excluded_paths  child repo paths relative to this repo, left out of its stats
+    """
+    repo_entries = []
+    for entry in extracted_data:
+        if entry["category"] == "repository":
+            repo_entries.append(dict(entry))
+        elif entry["isFile"] and os.path.basename(entry["filename"]) == ".git":
+            gitdir = _read_gitfile(entry["filename"])
+            if gitdir is None:
+                continue
+            repo_entry = {
+                "filename": entry["filename"] + "/",
+                "size": entry.get("size", 0),
+                "last_modified": entry.get("last_modified"),
+                "modified_ts": entry.get("modified_ts"),
+                "extension": ".git",
+                "category": "repository",
+                "isFile": False,
+                "language": "",
+            }
+            if entry.get("logical_path"):
+                repo_entry["logical_path"] = entry["logical_path"] + "/"
+            if entry.get("archive_path"):
+                member_dir = posixpath.dirname(entry["archive_member"])
+                repo_entry["archive_path"] = entry["archive_path"]
+                repo_entry["archive_member"] = posixpath.normpath(posixpath.join(member_dir, gitdir)) + "/"
+            repo_entries.append(repo_entry)
+
+    by_root = {repo_root_of(entry): entry for entry in repo_entries}
+    for root, entry in by_root.items():
+        entry["parent_repo"] = _nearest_ancestor(os.path.dirname(root), by_root)
+        entry["child_repos"] = []
+        entry["submodule"] = False
+        entry["excluded_paths"] = []
+
+    for root, entry in by_root.items():
+        parent_root = entry["parent_repo"]
+        if parent_root is None:
+            continue
+        parent = by_root[parent_root]
+        rel = os.path.relpath(root, parent_root).replace(os.sep, "/")
+        parent["child_repos"].append(root)
+        parent["excluded_paths"].append(rel)
+        entry["submodule"] = rel in _read_gitmodules(parent_root)
+
+    return list(by_root.values())
+
+
 # Handle detailed extractions. Loops through extracted data and handles it based on category
-def detailed_extraction(extracted_data, advanced_options, filters=None):
+def detailed_extraction(extracted_data, advanced_options, filters=None, renderer=None):
+    # per-repo progress goes to the terminal by default; the service layer passes a NullRenderer
+    if renderer is None:
+        renderer = BufferedRenderer()
     repositories = []
     if advanced_options is None:
     # default: everything ON
@@ -251,76 +591,110 @@ def detailed_extraction(extracted_data, advanced_options, filters=None):
     # PHASE 1: Content-Based Language Correction (The "Deep Scan")
     # -------------------------------------------------------------------------
     if advanced_options.get("programming_scan", True):
+        engine = advanced_options.get("language_engine", REGEX_ENGINE)
         for entry in extracted_data:
             # Only check files that are potential code or completely unknown
             if entry["category"] in ("source_code", "web_code", "uncategorized", "documentation"):
                 # Run content detection on ALL source files to verify extension accuracy
                 # (e.g. catching a .py file that actually contains C code)
-                detected = detect_language_by_content(entry["filename"])
+                detected = detect_language_by_content(entry["filename"], engine)
                 
                 if detected:
                     entry["language"] = detected
                     if entry["category"] in ("uncategorized", "documentation"):
                         entry["category"] = "source_code"
 
-      # Identify repo roots and gather repo metadata
-    for entry in extracted_data:
-        if entry["category"] == "repository":
-            repo_info = analyze_repo_type(entry)
-
-            if repo_info and repo_info.get("is_valid", False):
-                
-                # Enrich contributor stats with categories (e.g. .py -> source_code)
-                if filters and "contributors" in repo_info:
-                    ext_map = filters.get("extensions", {})
-                    for contrib in repo_info["contributors"]:
-                        loc_by_cat = {}
-                        for ext, stats in contrib.get("loc_by_type", {}).items():
-                            cat = ext_map.get(ext.lower(), "uncategorized")
-                            if cat not in loc_by_cat:
-                                loc_by_cat[cat] = {"insertions": 0, "deletions": 0}
-                            loc_by_cat[cat]["insertions"] += stats.get("insertions", 0)
-                            loc_by_cat[cat]["deletions"] += stats.get("deletions", 0)
-                        contrib["loc_by_category"] = loc_by_cat
-
-                # Create a new project object
-                repositories.append({
-                    "repo_name": repo_info["repo_name"],
-                    "repo_root": repo_info["repo_root"],
-                    "authors": repo_info["authors"],
-                    "contributors": repo_info["contributors"],
-                    "branch_count": repo_info["branch_count"],
-                    "has_merges": repo_info["has_merges"],
-                    "project_type": repo_info["project_type"],
-                    "duration_days": repo_info["duration_days"],
-                    "commit_frequency": repo_info["commit_frequency"],
-                    "files": []  # will fill in the next step
-                })
-
-            else:
-                _print_repo_skip(entry["filename"])
+            # language shares weighted by lines instead of bytes (see ProjectAccumulator.language_shares)
+            if advanced_options.get("language_weight") == "lines" and entry["isFile"] and entry.get("language"):
+                entry["line_count"] = count_lines(entry["filename"])
 
-    #Attach files to the correct project
+      # Identify repo roots (incl. submodules / nested repos) and gather repo metadata.
+      # Parents and children run concurrently; children are excluded from parent stats.
+    repo_entries = discover_repositories(extracted_data)
+    try:
+        history_filter = history_filter_from_options(advanced_options)
+    except ValueError as e:
+        print(f"[metadata_extractor] Ignoring invalid since/until option: {e}")
+        history_filter = None
+    repo_results = analyze_repositories(
+        repo_entries,
+        use_cache=advanced_options.get("commit_cache", True),
+        workers=advanced_options.get("repo_workers"),
+        budget=budget_from_options(advanced_options),
+        ownership=advanced_options.get("ownership_scan", False),
+        history_filter=history_filter,
+        stage_deadlines=deadlines_from_options(advanced_options),
+        renderer=renderer,
+    )
+
+    for entry, repo_info in zip(repo_entries, repo_results):
+        if repo_info and repo_info.get("is_valid", False):
+            
+            # Enrich contributor stats with categories (e.g. .py -> source_code)
+            if filters and "contributors" in repo_info:
+                ext_map = filters.get("extensions", {})
+                for contrib in repo_info["contributors"]:
+                    loc_by_cat = {}
+                    for ext, stats in contrib.get("loc_by_type", {}).items():
+                        cat = ext_map.get(ext.lower(), "uncategorized")
+                        if cat not in loc_by_cat:
+                            loc_by_cat[cat] = {"insertions": 0, "deletions": 0}
+                        loc_by_cat[cat]["insertions"] += stats.get("insertions", 0)
+                        loc_by_cat[cat]["deletions"] += stats.get("deletions", 0)
+                    contrib["loc_by_category"] = loc_by_cat
+
+            # Create a new project object
+            repositories.append({
+                "repo_name": repo_info["repo_name"],
+                "repo_root": repo_info["repo_root"],
+                "authors": repo_info["authors"],
+                "contributors": repo_info["contributors"],
+                "branch_count": repo_info["branch_count"],
+                "has_merges": repo_info["has_merges"],
+                "project_type": repo_info["project_type"],
+                "duration_days": repo_info["duration_days"],
+                "commit_frequency": repo_info["commit_frequency"],
+                "commits_per_week": repo_info.get("commits_per_week"),
+                "activity": repo_info.get("activity"),
+                "sampled": repo_info.get("sampled", False),
+                "confidence": repo_info.get("confidence", "exact"),
+                "history_filter": repo_info.get("history_filter"),
+                "partial": repo_info.get("partial", False),
+                "timed_out": repo_info.get("timed_out", []),
+                "clone_of": repo_info.get("clone_of"),
+                "related_repos": repo_info.get("related_repos", []),
+                "parent_repo": entry.get("parent_repo"),
+                "child_repos": entry.get("child_repos", []),
+                "submodule": entry.get("submodule", False),
+                "files": []  # will fill in the next step
+            })
+
+        else:
+            renderer.repo_status("REPO SKIPPED", "Invalid or failed repo:", entry["filename"])
+
+    #Attach files to the correct project: the deepest repo containing them,
+    # so a nested repo's files are not also counted in its parent
+    projects_by_root = {}
     for project in repositories:
-        root = project["repo_root"]
-
-        # initialize a set to accumulate dependencies
-        project_dependencies = set()
-
-        for file_entry in extracted_data:
-            # If file path starts with the repo root, it's part of that project
-            if file_entry["filename"].startswith(root):
-                project["files"].append(file_entry)
-
-                # If the file is a framework file, extract dependencies from it
-                if file_entry["category"] == "framework" and advanced_options.get("framework_scan", True):
-                    deps = detect_frameworks(file_entry)  # returns a list
-                    project_dependencies.update(deps)  # accumulate in a set
-
-        # Store the final list of dependencies in the project
-        project["frameworks"] = list(project_dependencies)
+        projects_by_root[project["repo_root"]] = project
+        project["frameworks"] = set()
+
+    for file_entry in extracted_data:
+        root = _nearest_ancestor(file_entry["filename"], projects_by_root)
+        if root is None:
+            continue
+        project = projects_by_root[root]
+        project["files"].append(file_entry)
+
+        # If the file is a framework file, extract dependencies from it
+        if file_entry["category"] == "framework" and advanced_options.get("framework_scan", True):
+            deps = detect_frameworks(file_entry)  # returns a list
+            project["frameworks"].update(deps)  # accumulate in a set
+
+    # Store the final list of dependencies in the project
+    for project in repositories:
+        project["frameworks"] = list(project["frameworks"])
 
-            
         # Return both structures
     return {
         "files": extracted_data,
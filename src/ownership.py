@@ -0,0 +1,166 @@
+"""
+Surviving-lines ownership: who wrote the code that is still in HEAD.
+
+Commit counts and numstat say who *changed* a repo; `git blame` says whose
+lines survived. Blaming every file is the slow part, so:
+
+  - HEAD's files come from the repository's GitBackend (tree reads through the
+    long-lived cat-file process, no per-directory git call); the history's
+    backend is reused when the caller passes it
+  - binary and very large files are skipped
+  - the remaining files are blamed in parallel by a bounded thread pool
+    (each blame is a subprocess, so threads are enough)
+  - results are cached per (repository, path, blob) in the commit cache, so
+    a rescan only re-blames files whose content changed
+  - blame processes run under the active analysis deadline (see deadlines),
+    so a stalled blame is killed instead of holding up the scan
+
+Blame needs a real object store. For archive-backed repos (.git read
+straight from the uploaded zip, see archive_git) only what blame reads -
+HEAD, config, refs and objects - is written to a temporary bare repository
+for the duration of the blame (see extracted_git_dir); logs, hooks, the
+index and the work tree stay in the zip.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import deadlines
+from git_backend import GitBackend
+
+DEFAULT_BLAME_WORKERS = min(8, os.cpu_count() or 1)
+
+# Generated/minified blobs are not worth blaming
+MAX_BLAME_BYTES = 1024 * 1024
+
+# git treats a blob as binary when its first 8000 bytes contain a NUL
+_BINARY_SNIFF = 8000
+_READ_BATCH = 64
+
+_AUTHOR_MAIL = b"author-mail <"
+
+# .git members blame needs (files at the top, or directories)
+_BLAME_MEMBERS = ("HEAD", "config", "packed-refs", "shallow")
+_BLAME_DIRS = ("refs/", "objects/")
+
+
+def blame_file(repo_root: str, head: str, path: str) -> Dict[str, int]:
+    """{author email: surviving lines} for one file at head."""
+    result = deadlines.run(
+        ["git", "-C", repo_root, "blame", "--line-porcelain", head, "--", path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    owners = Counter()
+    if result.returncode != 0:
+        return owners
+    for line in result.stdout.split(b"\n"):
+        if line.startswith(_AUTHOR_MAIL):
+            owners[line[len(_AUTHOR_MAIL):].rstrip(b">").decode("utf-8", errors="replace")] += 1
+    return dict(owners)
+
+
+def _repo_key(repo_root: str, head: str) -> str:
+    """Identifies the repository (its root commits) for cache keys."""
+    result = deadlines.run(
+        ["git", "-C", repo_root, "rev-list", "--max-parents=0", head],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    return ",".join(sorted(result.stdout.decode("ascii", errors="replace").split()))
+
+
+def _blameable(backend: GitBackend, files: List[Tuple[str, str, int]]) -> List[Tuple[str, str]]:
+    """(path, blob) of the text files small enough to blame."""
+    small = [(path, blob) for path, blob, size in files if 0 < size <= MAX_BLAME_BYTES]
+    keep = []
+    for i in range(0, len(small), _READ_BATCH):
+        batch = small[i:i + _READ_BATCH]
+        for (path, blob), (_, _, _, data) in zip(batch, backend.read_many([blob for _, blob in batch])):
+            if data is not None and b"\0" not in data[:_BINARY_SNIFF]:
+                keep.append((path, blob))
+    return keep
+
+
+def ownership_index(repo_root: str, commit_cache=None, workers: Optional[int] = None,
+                    excluded_paths=None, backend: Optional[GitBackend] = None) -> Counter:
+    """
+    {author email: lines of HEAD they last touched}, summed over HEAD's text files.
+    excluded_paths: repo-relative directories (nested repos) to leave out.
+    backend: the repository's GitBackend when the caller already holds one (it
+    stays open); otherwise one is opened for this call.
+    """
+    excluded = tuple(excluded_paths or ())
+    with nullcontext(backend) if backend is not None else GitBackend(repo_root) as backend:
+        head = backend.head()
+        if head is None:
+            return Counter()
+        files = [
+            entry for entry in backend.ls_tree(head)
+            if not any(entry[0] == p or entry[0].startswith(p + "/") for p in excluded)
+        ]
+
+        repo_key = _repo_key(repo_root, head) if commit_cache is not None else ""
+        cached = commit_cache.get_ownership(repo_key, [(path, blob) for path, blob, _ in files]) if commit_cache else {}
+
+        todo = _blameable(backend, [f for f in files if (f[0], f[1]) not in cached])
+
+    # pool threads don't inherit the caller's deadline: hand it on
+    deadline = deadlines.current_deadline()
+
+    def _blame(item):
+        with deadlines.active(deadline):
+            return blame_file(repo_root, head, item[0])
+
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_BLAME_WORKERS) as pool:
+        blamed = list(pool.map(_blame, todo))
+
+    if commit_cache is not None:
+        commit_cache.put_ownership(repo_key, head, [(path, blob, owners) for (path, blob), owners in zip(todo, blamed)])
+
+    totals = Counter()
+    for owners in list(cached.values()) + blamed:
+        totals.update(owners)
+    return totals
+
+
+@contextmanager
+def extracted_git_dir(archive_path: str, archive_member: str) -> Iterator[str]:
+    """
+    Writes the refs and objects of the archive's `<prefix>.git/` to a
+    temporary bare repository and yields its path; removed again on exit.
+    """
+    prefix = archive_member.rstrip("/") + "/"
+    git_dir = tempfile.mkdtemp(suffix=".git")
+    try:
+        with zipfile.ZipFile(archive_path, "r") as zf:
+            for info in zf.infolist():
+                rel = info.filename[len(prefix):] if info.filename.startswith(prefix) else None
+                if not rel or info.is_dir() or not (rel in _BLAME_MEMBERS or rel.startswith(_BLAME_DIRS)):
+                    continue
+                target = os.path.join(git_dir, *rel.split("/"))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if rel == "config":
+                    # a submodule's core.worktree points into the parent's work tree
+                    data = re.sub(rb"(?m)^\s*worktree\s*=.*\n?", b"", zf.read(info))
+                    data = re.sub(rb"(?m)^(\s*bare\s*=\s*)false", rb"\1true", data)
+                    with open(target, "wb") as f:
+                        f.write(data)
+                    continue
+                with zf.open(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+        for sub in ("refs", "objects"):
+            os.makedirs(os.path.join(git_dir, sub), exist_ok=True)
+        yield git_dir
+    finally:
+        shutil.rmtree(git_dir, ignore_errors=True)
@@ -1,6 +1,8 @@
 import sys
 import shutil
 
+from repo_budget import DEFAULT_BUDGET
+
 ### Permission Manager for enforcing privacy rules
 
 def _center_text(text):
@@ -72,6 +74,24 @@ def get_analysis_mode() -> str:
             print(_center_text("Invalid choice. Please enter 0, 1, or 2."))
 
 
+def get_history_filter() -> dict:
+    """
+    Prompts for the history filter options (see history_filter).
+    Empty answers leave that limit off.
+    """
+    options = {}
+    since = input(_center_text("Only commits since (YYYY-MM-DD, blank for no limit): ")).strip()
+    if since:
+        options["since"] = since
+    until = input(_center_text("Only commits until (YYYY-MM-DD, blank for no limit): ")).strip()
+    if until:
+        options["until"] = until
+    authors = input(_center_text("Only these author emails (comma separated, blank for all): ")).strip()
+    if authors:
+        options["authors"] = [a.strip() for a in authors.split(",") if a.strip()]
+    return options
+
+
 def get_advanced_options() -> dict:
     """
     Prompts the user for advanced analysis options.
@@ -80,6 +100,16 @@ def get_advanced_options() -> dict:
     _print_banner("ADVANCED OPTIONS")
     options = {}
     options["programming_scan"] = get_yes_no("Include programming analysis?")
+    if options["programming_scan"]:
+        use_model = get_yes_no("Use the statistical language model instead of regex heuristics? (more accurate, slower)")
+        options["language_engine"] = "model" if use_model else "regex"
+        by_lines = get_yes_no("Weight language shares by line count instead of file size? (reads every source file)")
+        options["language_weight"] = "lines" if by_lines else "bytes"
+    if get_yes_no("Sample very large repositories instead of reading their full history?"):
+        options.update(DEFAULT_BUDGET)
+    if get_yes_no("Limit repository history to a date range or specific authors?"):
+        options.update(get_history_filter())
+    options["ownership_scan"] = get_yes_no("Compute line ownership (git blame) per contributor? (slower)")
     options["framework_scan"] = get_yes_no("Include framework detection?")
     options["skills_gen"] = get_yes_no("Generate skills used?")
     options["resume_gen"] = get_yes_no("Generate resume?")
@@ -1,28 +1,56 @@
 # to print stuff -moved from scan manager
+#
+# Every report is formatted into a _Report (a list of lines) and written in one
+# go. Callers pick a renderer:
+#   - BufferedRenderer: the CLI. Terminal width is read once, each report is one write + flush
+#   - NullRenderer: the service layer / API. Reports are dropped without being formatted
+# The print_* functions are the one-off versions (terminal, or plain text to `file`).
 import shutil
+import sys
 
-def _center_text(text: str) -> str:
-    width = shutil.get_terminal_size(fallback=(80, 20)).columns
+
+def _terminal_width() -> int:
+    return shutil.get_terminal_size(fallback=(80, 20)).columns
+
+
+def _center_text(text: str, width: int = None) -> str:
+    if width is None:
+        width = _terminal_width()
     if len(text) >= width:
         return text
     padding = (width - len(text) + 1) // 2
     return " " * padding + text
 
 
-def _print_banner(title: str, line_char: str = "~", min_width: int = 23) -> None:
-    line_width = max(len(title), min_width)
-    line = line_char * line_width
-    print()
-    print(_center_text(line))
-    print(_center_text(title))
-    print(_center_text(line))
+class _Report:
+    """Lines of one report: centered to `width` for the terminal, as-is when plain (file output)."""
 
+    def __init__(self, width: int = None, plain: bool = False):
+        self.width = width
+        self.plain = plain
+        self.lines = []
 
-def _print_line(text: str, file=None) -> None:
-    if file:
-        print(text, file=file)
-    else:
-        print(_center_text(text))
+    def line(self, text: str) -> None:
+        self.lines.append(text if self.plain else _center_text(text, self.width))
+
+    def blank(self) -> None:
+        self.lines.append("")
+
+    def banner(self, title: str, plain_title: str, line_char: str = "~", min_width: int = 23) -> None:
+        """Centered banner on the terminal, `plain_title` after an empty line in a file."""
+        self.blank()
+        if self.plain:
+            self.lines.append(plain_title)
+            return
+        rule = line_char * max(len(title), min_width)
+        self.line(rule)
+        self.line(title)
+        self.line(rule)
+
+    def write(self, stream) -> None:
+        if self.lines:
+            stream.write("\n".join(self.lines) + "\n")
+            stream.flush()
 
 
 def is_noise(name: str) -> bool:
@@ -31,7 +59,8 @@ def is_noise(name: str) -> bool:
     return "bot" in n or "noreply" in n or "github-classroom" in n
 
 
-def print_repo_summary(
+def _format_repo_summary(
+    out,
     proj_name,
     repo_name,
     repo_root,
@@ -43,10 +72,10 @@ def print_repo_summary(
     repo_duration_days,
     commit_frequency,
 ):
-    _print_banner("REPOSITORY METADATA")
+    out.banner("REPOSITORY METADATA", "Repository Metadata")
 
     def _kv(label, value):
-        _print_line(f"{label:<14}: {value}")
+        out.line(f"{label:<14}: {value}")
 
     _kv("Project", proj_name)
     _kv("Repo Name", repo_name)
@@ -58,17 +87,14 @@ def print_repo_summary(
     _kv("Project Type", project_type)
     _kv("Repo Duration", f"{repo_duration_days} days")
     _kv("Commit Freq", commit_frequency)
-    print()
+    out.blank()
 
 
-def print_project_rankings(project_summaries, file=None):
+def _format_project_rankings(out, project_summaries):
     if not project_summaries:
         return
 
-    if file:
-        print("\nRanked Projects", file=file)
-    else:
-        _print_banner("RANKED PROJECTS")
+    out.banner("RANKED PROJECTS", "Ranked Projects")
 
     header = (
         f"{'Project':<30} "
@@ -77,11 +103,10 @@ def print_project_rankings(project_summaries, file=None):
         f"{'Languages':<25} {'Frameworks':<40} "
         f"{'Collab':>7} {'Score':>7}"
     )
-    if file:
-        print(f"\n{header}", file=file)
-    else:
-        _print_line(header)
-    _print_line("-" * 155, file=file)
+    if out.plain:
+        out.blank()
+    out.line(header)
+    out.line("-" * 155)
 
     for p in project_summaries:
         langs_str = p.get("languages", "") or ""
@@ -99,46 +124,37 @@ def print_project_rankings(project_summaries, file=None):
             f"{langs_str:<25} {fw_str:<40} "
             f"{p.get('is_collaborative', 'No'):>7} {p.get('score', 0):7.1f}"
         )
-        _print_line(line, file=file)
+        out.line(line)
 
 
-def print_chronological_projects(projects_chronological, file=None):
+def _format_chronological_projects(out, projects_chronological):
     if not projects_chronological:
         return
-    if file:
-        print("\nProjects in Chronological Order", file=file)
-    else:
-        _print_banner("PROJECTS IN CHRONOLOGICAL ORDER")
-    _print_line("-" * 80, file=file)
+    out.banner("PROJECTS IN CHRONOLOGICAL ORDER", "Projects in Chronological Order")
+    out.line("-" * 80)
     for p in projects_chronological:
-        _print_line(f"- {p['name']}: {p['first_used']} → {p['last_used']}", file=file)
+        out.line(f"- {p['name']}: {p['first_used']} → {p['last_used']}")
 
 
-def print_skills_timeline(skills_chronological, file=None):
+def _format_skills_timeline(out, skills_chronological):
     if not skills_chronological:
         return
-    if file:
-        print("\nSkills Exercised Over Time", file=file)
-    else:
-        _print_banner("SKILLS EXERCISED OVER TIME")
-    _print_line("-" * 80, file=file)
+    out.banner("SKILLS EXERCISED OVER TIME", "Skills Exercised Over Time")
+    out.line("-" * 80)
     for s in skills_chronological:
-        _print_line(f"- {s['first_used']} → {s['last_used']}: {s['skill']}", file=file)
+        out.line(f"- {s['first_used']} → {s['last_used']}: {s['skill']}")
 
 
-def print_resume_summaries(resume_summaries, file=None):
+def _format_resume_summaries(out, resume_summaries):
     if not resume_summaries:
         return
-    if file:
-        print("\nTop Project Résumé Summaries", file=file)
-    else:
-        _print_banner("TOP PROJECT RESUME SUMMARIES")
-    _print_line("-" * 80, file=file)
+    out.banner("TOP PROJECT RESUME SUMMARIES", "Top Project Résumé Summaries")
+    out.line("-" * 80)
     for bullet in resume_summaries:
-        _print_line(f"- {bullet}", file=file)
+        out.line(f"- {bullet}")
 
 
-def print_contributor_stats(project_summaries, file=None):
+def _format_contributor_stats(out, project_summaries):
     contributor_totals = {}  # name -> {adj, pct, count}
 
     for p in project_summaries or []:
@@ -165,27 +181,15 @@ def print_contributor_stats(project_summaries, file=None):
     if not leaderboard:
         return
 
-    if file:
-        print("\n=== Contributor Leaderboard (by total adjusted score) ===", file=file)
-    else:
-        _print_banner("CONTRIBUTOR LEADERBOARD")
+    out.banner("CONTRIBUTOR LEADERBOARD", "=== Contributor Leaderboard (by total adjusted score) ===")
 
-    _print_line(
-        f"{'Rank':>4}  {'Contributor':<28} {'Projects':>8} {'TotalAdj':>10} {'TotalPct':>9}",
-        file=file,
-    )
-    _print_line("-" * 70, file=file)
+    out.line(f"{'Rank':>4}  {'Contributor':<28} {'Projects':>8} {'TotalAdj':>10} {'TotalPct':>9}")
+    out.line("-" * 70)
 
     for i, (person, total_adj, total_pct, projects_count) in enumerate(leaderboard, start=1):
-        _print_line(
-            f"{i:4}  {person[:28]:<28} {projects_count:8} {total_adj:10.1f} {total_pct:8.1f}%",
-            file=file,
-        )
+        out.line(f"{i:4}  {person[:28]:<28} {projects_count:8} {total_adj:10.1f} {total_pct:8.1f}%")
 
-    if file:
-        print("\n=== Contributor Contribution Breakdown ===", file=file)
-    else:
-        _print_banner("CONTRIBUTOR CONTRIBUTION BREAKDOWN")
+    out.banner("CONTRIBUTOR CONTRIBUTION BREAKDOWN", "=== Contributor Contribution Breakdown ===")
 
     for person, _, _, _ in leaderboard:
         person_projects = []
@@ -200,14 +204,158 @@ def print_contributor_stats(project_summaries, file=None):
         if not person_projects:
             continue
 
-        if file:
-            print(f"\n-- {person} --", file=file)
-        else:
-            print()
-            _print_line(f"-- {person} --", file=file)
+        out.blank()
+        out.line(f"-- {person} --")
 
-        _print_line(f"{'Project':<32} {'Pct':>7} {'AdjScore':>10} {'Base':>10}", file=file)
-        _print_line("-" * 65, file=file)
+        out.line(f"{'Project':<32} {'Pct':>7} {'AdjScore':>10} {'Base':>10}")
+        out.line("-" * 65)
 
         for proj, pct, adj, base in person_projects[:3]:
-            _print_line(f"{proj[:32]:<32} {pct:5.1f}% {adj:10.1f} {base:10.1f}", file=file)
+            out.line(f"{proj[:32]:<32} {pct:5.1f}% {adj:10.1f} {base:10.1f}")
+
+
+def _format_bytes(size) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _format_largest_directories(out, directories):
+    if not directories:
+        return
+    out.banner("LARGEST DIRECTORIES", "Largest Directories")
+    out.line("-" * 80)
+    for d in directories:
+        out.line(f"- {d['path'] or '.'}/: {_format_bytes(d['size'])} in {d['files']} files")
+
+
+def _format_exports(out, paths):
+    for path in paths:
+        out.line(f"saved file to {path}")
+
+
+def _format_repo_status(out, title, lines):
+    out.banner(title, title)
+    for text in lines:
+        out.line(text)
+
+
+# --------------------------------------------------------
+# Renderers
+# --------------------------------------------------------
+
+class NullRenderer:
+    """Renders nothing: no formatting and no terminal queries (service layer / API)."""
+
+    enabled = False  # callers may skip building what would only be rendered
+
+    def repo_summary(self, *summary):
+        pass
+
+    def project_rankings(self, project_summaries):
+        pass
+
+    def chronological_projects(self, projects_chronological):
+        pass
+
+    def skills_timeline(self, skills_chronological):
+        pass
+
+    def resume_summaries(self, resume_summaries):
+        pass
+
+    def contributor_stats(self, project_summaries):
+        pass
+
+    def largest_directories(self, directories):
+        pass
+
+    def exports(self, paths):
+        pass
+
+    def repo_status(self, title, *lines):
+        pass
+
+
+class BufferedRenderer:
+    """
+    Terminal renderer for the CLI: the width is read once (or given), and
+    each report is formatted in memory and written with a single flush.
+    """
+
+    enabled = True
+
+    def __init__(self, stream=None, width: int = None):
+        self.stream = stream  # None: sys.stdout at write time
+        self.width = width if width is not None else _terminal_width()
+
+    def _render(self, formatter, *args):
+        out = _Report(width=self.width)
+        formatter(out, *args)
+        out.write(self.stream or sys.stdout)
+
+    def repo_summary(self, *summary):
+        self._render(_format_repo_summary, *summary)
+
+    def project_rankings(self, project_summaries):
+        self._render(_format_project_rankings, project_summaries)
+
+    def chronological_projects(self, projects_chronological):
+        self._render(_format_chronological_projects, projects_chronological)
+
+    def skills_timeline(self, skills_chronological):
+        self._render(_format_skills_timeline, skills_chronological)
+
+    def resume_summaries(self, resume_summaries):
+        self._render(_format_resume_summaries, resume_summaries)
+
+    def contributor_stats(self, project_summaries):
+        self._render(_format_contributor_stats, project_summaries)
+
+    def largest_directories(self, directories):
+        self._render(_format_largest_directories, directories)
+
+    def exports(self, paths):
+        self._render(_format_exports, paths)
+
+    def repo_status(self, title, *lines):
+        """Per-repo progress banner ("REPO ANALYZING", "REPO SKIPPED", ...) with its detail lines."""
+        self._render(_format_repo_status, title, lines)
+
+
+# --------------------------------------------------------
+# One-off printing (terminal, or plain text into `file`)
+# --------------------------------------------------------
+
+def _print_report(formatter, args, file=None):
+    if file:
+        out = _Report(plain=True)
+        formatter(out, *args)
+        out.write(file)
+    else:
+        BufferedRenderer()._render(formatter, *args)
+
+
+def print_repo_summary(*summary):
+    _print_report(_format_repo_summary, summary)
+
+
+def print_project_rankings(project_summaries, file=None):
+    _print_report(_format_project_rankings, (project_summaries,), file)
+
+
+def print_chronological_projects(projects_chronological, file=None):
+    _print_report(_format_chronological_projects, (projects_chronological,), file)
+
+
+def print_skills_timeline(skills_chronological, file=None):
+    _print_report(_format_skills_timeline, (skills_chronological,), file)
+
+
+def print_resume_summaries(resume_summaries, file=None):
+    _print_report(_format_resume_summaries, (resume_summaries,), file)
+
+
+def print_contributor_stats(project_summaries, file=None):
+    _print_report(_format_contributor_stats, (project_summaries,), file)
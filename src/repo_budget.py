@@ -0,0 +1,180 @@
+"""
+Per-repository analysis budgets and stratified commit sampling.
+
+Uploads sometimes contain full clones of big upstream projects (a forked
+framework, say). Walking their whole history with numstat can take minutes,
+so a scan can put a budget on every repo:
+
+    max_commits   - histories with more commits than this are sampled
+    max_age_days  - histories spanning more days than this are sampled
+    max_seconds   - wall time for one repo, a hard cap over every pass: a full
+                    pass that would run over it is abandoned and the repo is
+                    sampled instead, and a pass that still runs out of time
+                    stops there (the repo is then partial)
+
+Sampling keeps everything that is cheap exact: commit counts, authors, dates
+and merges come from a metadata-only `git log`. Only the per-file stats (the
+expensive part) are read for a stratified sample. Strata are author x month;
+each stratum gets a share of the sample proportional to its size (at least one
+commit while the sample is big enough) and its commits are picked evenly
+spaced. Contributor LOC totals are extrapolated with the inverse sampling
+fraction of each stratum. The sample is a fixed fraction of the history,
+capped by max_commits and by what fits in the time left (see sample_size).
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, List, Optional
+
+BUDGET_KEYS = ("max_commits", "max_seconds", "max_age_days")
+
+# Offered by the CLI when the user chooses to cap large repositories
+DEFAULT_BUDGET = {"max_commits": 5000, "max_seconds": 120, "max_age_days": 3650}
+
+# Sample size cap when max_commits is not set (age/time exceeded)
+DEFAULT_SAMPLE_SIZE = 2000
+
+# Share of an over-budget history whose per-file stats are read
+SAMPLE_FRACTION = 0.2
+
+# Sample sizes behind the confidence markers (~5% / ~10% margin on proportions)
+HIGH_CONFIDENCE_SAMPLE = 400
+MEDIUM_CONFIDENCE_SAMPLE = 100
+
+_STRATUM_SECONDS = 30 * 86400  # ~ one month of history
+
+
+def budget_from_options(options) -> Optional[Dict]:
+    """
+    Picks the budget keys out of the advanced options. None when no budget is set.
+    Raises ValueError for non-numeric values.
+    """
+    if not options:
+        return None
+    budget = {}
+    for key in BUDGET_KEYS:
+        value = options.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{key} must be a number, got {value!r}")
+        if value > 0:
+            budget[key] = value
+    return budget or None
+
+
+def exceeded_limits(budget: Dict, total_commits: int, first_date, last_date) -> List[str]:
+    """Names of the history-size limits (max_commits, max_age_days) a repo is over."""
+    reasons = []
+    if "max_commits" in budget and total_commits > budget["max_commits"]:
+        reasons.append("max_commits")
+    if "max_age_days" in budget and first_date is not None:
+        if (last_date - first_date) / 86400 > budget["max_age_days"]:
+            reasons.append("max_age_days")
+    return reasons
+
+
+def sample_size(budget: Dict, total_commits: int, commits_per_second: Optional[float] = None,
+                seconds_left: Optional[float] = None) -> int:
+    """
+    Commits to read stats for: SAMPLE_FRACTION of the history (but at least
+    MEDIUM_CONFIDENCE_SAMPLE), at most max_commits (DEFAULT_SAMPLE_SIZE when
+    unset) and, when the read rate is known, at most what fits in half of the
+    time left.
+    """
+    size = min(
+        budget.get("max_commits") or DEFAULT_SAMPLE_SIZE,
+        max(int(total_commits * SAMPLE_FRACTION), MEDIUM_CONFIDENCE_SAMPLE),
+    )
+    if commits_per_second is not None and seconds_left is not None:
+        size = min(size, int(commits_per_second * max(seconds_left, 0) / 2))
+    return max(1, min(size, total_commits))
+
+
+def stratum_of(commit: Dict):
+    return (commit["author_email"], commit["committed_date"] // _STRATUM_SECONDS)
+
+
+def allocate(counts: Counter, sample_size: int) -> Dict:
+    """
+    Splits sample_size over the strata: one commit each (largest strata first
+    if there are more strata than sample slots), the rest proportionally to
+    what is left in each stratum (largest remainder). Never exceeds a stratum.
+    """
+    total = sum(counts.values())
+    if sample_size >= total:
+        return dict(counts)
+
+    order = sorted(counts, key=lambda key: (-counts[key], key))
+    alloc = {key: 1 for key in order[:sample_size]}
+
+    remaining = sample_size - len(alloc)
+    if remaining > 0:
+        rest = {key: counts[key] - 1 for key in order}
+        rest_total = sum(rest.values())
+        shares = {key: remaining * rest[key] / rest_total for key in order}
+        extra = {key: int(shares[key]) for key in order}
+        left = remaining - sum(extra.values())
+        for key in sorted(order, key=lambda key: (-(shares[key] - extra[key]), key))[:left]:
+            extra[key] += 1
+        for key in order:
+            alloc[key] += extra[key]
+    return alloc
+
+
+class StratifiedSampler:
+    """
+    Picks commits from a history stream given the stratum sizes of that same
+    stream (counted in an earlier pass), and weights the picked commits so
+    that summed stats estimate the totals of the whole history.
+    """
+
+    def __init__(self, counts: Counter, sample_size: int):
+        self.counts = counts
+        self.alloc = allocate(counts, sample_size)
+        self.sample_size = sum(self.alloc.values())
+        self._seen = Counter()
+
+        # Strata that got no sample are covered by the rest of the author's history
+        author_total = Counter()
+        author_covered = Counter()
+        for (author, bucket), n in counts.items():
+            author_total[author] += n
+            if self.alloc.get((author, bucket)):
+                author_covered[author] += n
+        self.authors_total = len(author_total)
+        self.authors_sampled = len(author_covered)
+
+        self._weights = {}
+        for key, k in self.alloc.items():
+            if k:
+                author = key[0]
+                self._weights[key] = (self.counts[key] / k) * (author_total[author] / author_covered[author])
+
+    def pick(self, commit: Dict) -> bool:
+        """Call once per commit, in stream order. Spreads each stratum's picks evenly."""
+        return self.pick_stratum(stratum_of(commit))
+
+    def pick_stratum(self, key) -> bool:
+        """pick() for a commit whose stratum is already known."""
+        i = self._seen[key]
+        self._seen[key] += 1
+        k = self.alloc.get(key, 0)
+        n = self.counts[key]
+        return k > 0 and (i * k) // n != ((i + 1) * k) // n
+
+    def weight(self, commit: Dict) -> float:
+        return self._weights.get(stratum_of(commit), 0.0)
+
+    def confidence(self) -> str:
+        total = sum(self.counts.values())
+        if self.sample_size >= total:
+            return "exact"
+        if self.authors_sampled < self.authors_total:
+            return "low"
+        if self.sample_size >= HIGH_CONFIDENCE_SAMPLE:
+            return "high"
+        if self.sample_size >= MEDIUM_CONFIDENCE_SAMPLE:
+            return "medium"
+        return "low"
@@ -1,32 +1,443 @@
 # Module containing methods for repository extraction
 # Recieves entry marked as repo. .git file is only dealt with at the moment
 
-from git import Repo
+from array import array
 from collections import Counter, defaultdict
 from datetime import datetime
+import hashlib
 import os
-import shutil
+import time
 
+from activity_series import WeeklySeries, series_metrics
+from archive_git import ArchiveRepository
+from deadlines import DEFAULT_DEADLINES, AnalysisTimeout, Deadline, check_deadline
+from git_backend import GitBackend, InvalidRepositoryError, find_git_dir
+from git_history import iter_commit_headers, iter_git_log, iter_rev_list
+from history_filter import git_filter_args, matches
+from ownership import extracted_git_dir, ownership_index
+from print_utils import BufferedRenderer
+from repo_budget import StratifiedSampler, exceeded_limits, sample_size, stratum_of
 
-def _center_text(text):
-    width = shutil.get_terminal_size(fallback=(80, 20)).columns
-    if len(text) >= width:
-        return text
-    padding = (width - len(text) + 1) // 2
-    return " " * padding + text
 
+class RepoAccumulator:
+    """
+    Folds commit records (as yielded by git_history) into repo-level totals
+    in one pass. Nothing is kept per commit: memory grows with the number of
+    authors, extensions and distinct files they touched, not with history length
+    (plus one weekly activity vector per repo and per author, see activity_series).
 
-def _print_banner(title, line_char="~", min_width=23):
-    line_width = max(len(title), min_width)
-    line = line_char * line_width
-    print()
-    print(_center_text(line))
-    print(_center_text(title))
-    print(_center_text(line))
+    excluded_paths: repo-relative directories (nested repos / submodules)
+    whose files belong to another repository and are left out of the stats.
+    A commit that only touches excluded paths is skipped altogether: it adds
+    nothing to the commit counts, contribution percentages or duration.
+    """
 
+    def __init__(self, excluded_paths=None):
+        self.excluded_paths = tuple(excluded_paths or ())
+        self.total_commits = 0
+        self.first_date = None  # unix seconds
+        self.last_date = None
+        self.has_merges = False
+        self.author_counts = Counter()
+        self.author_files = defaultdict(set)
+        # author -> extension -> {insertions, deletions}
+        self.author_loc = defaultdict(lambda: defaultdict(lambda: {"insertions": 0, "deletions": 0}))
+        # weekly commits / changed lines, for the repo and per author
+        self.series = WeeklySeries()
+        self.author_series = defaultdict(WeeklySeries)
 
-def analyze_repo_type(repo_path):
-    _print_banner("REPO ANALYZING")
+    def add(self, commit):
+        if self.only_excluded(commit):
+            return
+        self.add_header(commit)
+        self.add_stats(commit)
+
+    def only_excluded(self, commit):
+        """True when the commit touches files and all of them are in excluded paths."""
+        files = commit["files"]
+        return bool(self.excluded_paths and files) and all(map(self._excluded, files))
+
+    def add_stats(self, commit, weight=1):
+        """Per-file stats only. weight > 1 extrapolates a sampled commit's LOC."""
+        email = commit["author_email"]
+        files = commit["files"]
+        if self.excluded_paths:
+            files = {path: stats for path, stats in files.items() if not self._excluded(path)}
+        self.author_files[email].update(files)
+        loc = self.author_loc[email]
+        changed = 0
+        for filepath, (insertions, deletions) in files.items():
+            _, ext = os.path.splitext(filepath)
+            ext = ext.lower() if ext else "no_extension"
+            loc[ext]["insertions"] += insertions * weight
+            loc[ext]["deletions"] += deletions * weight
+            changed += insertions + deletions
+        self.series.add_loc(commit["committed_date"], changed * weight)
+        self.author_series[email].add_loc(commit["committed_date"], changed * weight)
+
+    def reset_stats(self):
+        """Forgets the per-file stats (counts, dates and merges stay)."""
+        self.author_files = defaultdict(set)
+        self.author_loc = defaultdict(lambda: defaultdict(lambda: {"insertions": 0, "deletions": 0}))
+        self.series.clear_loc()
+        for series in self.author_series.values():
+            series.clear_loc()
+
+    def _excluded(self, path):
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.excluded_paths)
+
+    def add_header(self, commit):
+        """Counts, dates and merges - everything except per-file stats."""
+        email = commit["author_email"]
+        self.total_commits += 1
+        self.author_counts[email] += 1
+
+        date = commit["committed_date"]
+        if self.first_date is None or date < self.first_date:
+            self.first_date = date
+        if self.last_date is None or date > self.last_date:
+            self.last_date = date
+        self.series.add_commit(date)
+        self.author_series[email].add_commit(date)
+
+        # Merge commits signal teamwork or branching strategy
+        if commit["parent_count"] > 1:
+            self.has_merges = True
+
+    def remove_header(self, commit):
+        """
+        Takes back the counts add_header added for a commit that turns out to
+        touch only excluded paths. Dates and merges are not taken back; the
+        caller that knows the whole history fixes the dates (see set_dates).
+        """
+        email = commit["author_email"]
+        self.total_commits -= 1
+        self.author_counts[email] -= 1
+        if not self.author_counts[email]:
+            del self.author_counts[email]
+        self.series.remove_commit(commit["committed_date"])
+        self.author_series[email].remove_commit(commit["committed_date"])
+
+    def set_dates(self, first_date, last_date):
+        self.first_date = first_date
+        self.last_date = last_date
+
+    def contributors(self, owned_lines=None):
+        """
+        Contributor records (commit-count-based contribution), in first-seen order.
+        owned_lines ({email: surviving lines in HEAD}, see ownership.py) adds
+        an ownership_percentage next to contribution_percentage.
+        """
+        total_owned = sum(owned_lines.values()) if owned_lines else 0
+        contributors = []
+        for author, count in self.author_counts.items():
+            percent = (count / self.total_commits) * 100 if self.total_commits > 0 else 0
+            # extrapolated (sampled) totals are fractional until rounded here
+            loc = {
+                ext: {"insertions": round(d["insertions"]), "deletions": round(d["deletions"])}
+                for ext, d in self.author_loc[author].items()
+            }
+
+            record = {
+                "name": author,
+                "commit_count": count,
+                "contribution_percentage": round(percent, 1),
+            }
+            if owned_lines is not None:
+                owned = owned_lines.get(author, 0)
+                record["ownership_percentage"] = round(owned / total_owned * 100, 1) if total_owned else 0.0
+            record.update({
+                "files_edited": sorted(self.author_files[author]),
+                "insertions": sum(d["insertions"] for d in loc.values()),
+                "deletions": sum(d["deletions"] for d in loc.values()),
+                "loc_by_type": loc,
+                "activity": activity_summary(self.author_series[author].compact()),
+            })
+            contributors.append(record)
+        return contributors
+
+
+def activity_summary(series):
+    """Metrics of a compact weekly series (see activity_series) with the series itself."""
+    summary = series_metrics(series)
+    summary["series"] = series
+    return summary
+
+
+class _DiskHistory:
+    """History of a repository whose .git is on disk (git subprocesses)."""
+
+    def __init__(self, repo_root, commit_cache=None, history_filter=None):
+        # One backend per repo: refs come straight from the git dir (no process);
+        # its cat-file processes start only when the ownership stage reads trees
+        self.backend = GitBackend(repo_root)
+        self.repo_root = repo_root
+        self.commit_cache = commit_cache
+        # since/until/authors become git log arguments, so git skips the rest
+        self.rev_args = ("--all", *git_filter_args(history_filter))
+
+    def branches(self):
+        return self.backend.branches()
+
+    def headers(self):
+        return iter_commit_headers(self.repo_root, self.rev_args)
+
+    def history(self):
+        # One streamed `git log --all --numstat` for the whole history
+        # (instead of one `git diff` subprocess per commit via c.stats).
+        # With a cache only the commits it has not seen are walked.
+        if self.commit_cache is not None:
+            return self.commit_cache.iter_history(self.repo_root, self.rev_args)
+        return iter_git_log(self.repo_root, self.rev_args)
+
+    def tips(self):
+        return _tips(self.backend.refs(), self.backend.head())
+
+    def roots(self):
+        return sorted(iter_rev_list(self.repo_root, ("--all", "--max-parents=0")))
+
+    def commits(self, shas):
+        if self.commit_cache is not None:
+            return self.commit_cache.iter_commits(self.repo_root, shas)
+        if not shas:
+            return iter(())
+        return iter_git_log(self.repo_root, ("--no-walk=unsorted", "--stdin"), stdin_revs=shas)
+
+    def close(self):
+        self.backend.close()
+
+
+class _ArchiveHistory:
+    """History read from the .git members of the uploaded zip (nothing extracted)."""
+
+    def __init__(self, archive_path, archive_member, commit_cache=None, history_filter=None):
+        self.repo = ArchiveRepository(archive_path, archive_member)
+        self.commit_cache = commit_cache
+        self.history_filter = history_filter
+
+    def branches(self):
+        return self.repo.branches()
+
+    def headers(self):
+        # headers are cheap (no tree diffs), so the filter is applied here
+        return (c for c in self.repo.iter_headers() if matches(self.history_filter, c))
+
+    def history(self):
+        if self.commit_cache is not None:
+            return self.commit_cache.iter_through(lambda: (c["sha"] for c in self.headers()), self.repo.iter_commits)
+        if self.history_filter:
+            # diff only the matching commits
+            return self.repo.iter_commits([c["sha"] for c in self.headers()])
+        return self.repo.iter_history()
+
+    def tips(self):
+        return _tips(self.repo.refs(), self.repo.head())
+
+    def roots(self):
+        return sorted(c["sha"] for c in self.repo.iter_headers() if c["parent_count"] == 0)
+
+    def commits(self, shas):
+        if self.commit_cache is not None:
+            return self.commit_cache.iter_through(lambda: iter(shas), self.repo.iter_commits)
+        return self.repo.iter_commits(shas)
+
+    def close(self):
+        self.repo.close()
+
+
+def _tips(refs, head):
+    tips = set(refs.values())
+    if head:
+        tips.add(head)
+    return sorted(tips)
+
+
+def _open_history(repo_path, repo_root, commit_cache=None, history_filter=None):
+    """
+    Picks where the history is read from: the .git on disk, or - when the
+    upload's .git was left inside the archive (see file_parser) - the archive.
+    history_filter (see history_filter) limits headers() and history(); roots
+    and tips always describe the whole repository.
+    """
+    if repo_path.get("archive_path"):
+        try:
+            find_git_dir(repo_root)
+        except InvalidRepositoryError:
+            return _ArchiveHistory(repo_path["archive_path"], repo_path["archive_member"], commit_cache, history_filter)
+    return _DiskHistory(repo_root, commit_cache, history_filter)
+
+
+def repo_root_of(repo_path):
+    """Project directory of a .git folder entry (the parent directory of .git)."""
+    return os.path.dirname(repo_path["filename"].rstrip("/"))
+
+
+def fingerprint_repo(repo_path, stage_deadlines=None):
+    """
+    Identifies a repository's history without walking any diffs:
+        {"id": str, "roots": [root commit SHAs], "tips": [ref/HEAD SHAs]}
+    Copies of the same repo share roots and tips; forks of it share roots only.
+    Returns None if the entry is not a readable repository (or could not be
+    read within the "fingerprint" deadline, see deadlines).
+    """
+    if not repo_path.get("extension", "").endswith(".git") or repo_path.get("isFile") != False:
+        return None
+    try:
+        source = _open_history(repo_path, repo_root_of(repo_path))
+    except Exception:
+        return None
+    try:
+        with Deadline((stage_deadlines or DEFAULT_DEADLINES).get("fingerprint")):
+            roots, tips = source.roots(), source.tips()
+    except Exception:
+        return None
+    finally:
+        source.close()
+    digest = hashlib.sha1("\n".join(roots + ["--"] + tips).encode("ascii")).hexdigest()
+    return {"id": digest[:12], "roots": roots, "tips": tips}
+
+
+def _aggregate_within_budget(source, budget, headers):
+    """
+    Aggregates the history unless it is over budget (see repo_budget), in which
+    case counts/dates/merges stay exact and LOC comes from a stratified sample.
+    headers (an empty RepoAccumulator) is filled in place: the exact counts
+    first, then the per-file stats, so if the deadline hits it holds the
+    exact counts plus the stats of every commit read so far (partial).
+
+    Headers carry no paths, so the full pass takes back the counts of commits
+    that only touch excluded paths (see RepoAccumulator). The sampled pass
+    cannot see the commits it skips, so a sampled repo's counts include them.
+
+    max_seconds caps all passes together: the header pass stops when it is
+    spent, the full pass gives up after half of what is left (the sample gets
+    the other half) and the sampled pass stops when it is spent. A repo cut
+    short like that is marked partial.
+    Returns (accumulator, sampling info or None).
+    """
+    max_seconds = budget.get("max_seconds")
+    ends_at = None if max_seconds is None else time.monotonic() + max_seconds
+
+    def _spent(at=None):
+        return ends_at is not None and time.monotonic() > (ends_at if at is None else at)
+
+    # Cheap metadata-only pass: exact counts plus the stratum sizes. Each
+    # commit's raw SHA and stratum are kept so the sample is picked without
+    # walking the headers again.
+    strata = Counter()
+    stratum_ids = {}
+    shas = []
+    order = array("I")
+    for c in source.headers():
+        headers.add_header(c)
+        key = stratum_of(c)
+        strata[key] += 1
+        shas.append(bytes.fromhex(c["sha"]))
+        order.append(stratum_ids.setdefault(key, len(stratum_ids)))
+        check_deadline()
+        if _spent():
+            return headers, {"budget_exceeded": ["max_seconds"], "sample_size": 0, "confidence": "low",
+                             "partial": True}
+
+    reasons = exceeded_limits(budget, headers.total_commits, headers.first_date, headers.last_date)
+    rate = None
+
+    if not reasons:
+        # counts are already exact: this pass only adds the per-file stats
+        pass_start = time.monotonic()
+        give_up_at = None if ends_at is None else pass_start + (ends_at - pass_start) / 2
+        commits = source.history()
+        read = 0
+        # dates of the commits that are kept (only differ with excluded-only commits)
+        first_date = last_date = None
+        skipped = False
+        for c in commits:
+            if _spent(give_up_at):
+                reasons = ["max_seconds"]
+                break
+            if headers.only_excluded(c):
+                headers.remove_header(c)
+                skipped = True
+            else:
+                headers.add_stats(c)
+                date = c["committed_date"]
+                if first_date is None or date < first_date:
+                    first_date = date
+                if last_date is None or date > last_date:
+                    last_date = date
+            read += 1
+            check_deadline()
+        commits.close()
+        if not reasons:
+            if skipped:
+                headers.set_dates(first_date, last_date)
+            return headers, None
+        # too slow for a full pass: start over with a sample that fits in the rest
+        headers.reset_stats()
+        rate = read / max(time.monotonic() - pass_start, 1e-6)
+
+    seconds_left = None if ends_at is None else ends_at - time.monotonic()
+    sampler = StratifiedSampler(strata, sample_size(budget, headers.total_commits, rate, seconds_left))
+    keys = list(stratum_ids)
+    picked = [sha.hex() for sha, i in zip(shas, order) if sampler.pick_stratum(keys[i])]
+    del shas
+
+    partial = False
+    commits = source.commits(picked)
+    for c in commits:
+        if _spent():
+            partial = True
+            break
+        headers.add_stats(c, sampler.weight(c))
+        check_deadline()
+    if hasattr(commits, "close"):
+        commits.close()
+
+    sampling = {
+        "budget_exceeded": reasons,
+        "sample_size": len(picked),
+        "confidence": sampler.confidence(),
+    }
+    if partial:
+        sampling.update(confidence="low", partial=True)
+    return headers, sampling
+
+
+def _owned_lines(source, repo_path, repo_root, commit_cache=None):
+    """
+    Ownership index of HEAD (see ownership.py). Disk repos reuse the history's
+    GitBackend; archive-backed repos are blamed from a bare extraction.
+    """
+    excluded_paths = repo_path.get("excluded_paths")
+    if isinstance(source, _ArchiveHistory):
+        with extracted_git_dir(repo_path["archive_path"], repo_path["archive_member"]) as git_dir:
+            return ownership_index(git_dir, commit_cache, excluded_paths=excluded_paths)
+    return ownership_index(repo_root, commit_cache, excluded_paths=excluded_paths, backend=source.backend)
+
+
+def analyze_repo_type(repo_path, commit_cache=None, budget=None, ownership=False, history_filter=None,
+                      stage_deadlines=None, renderer=None):
+    """
+    Analyzes a .git folder entry and returns repo-level metadata, or None.
+    commit_cache (a commit_cache.CommitCache) lets previously seen commits be
+    served from the cache instead of being walked again.
+    budget (see repo_budget.budget_from_options) caps how much history is
+    walked; over-budget repos are sampled and marked with a confidence level.
+    repo_path["excluded_paths"] (set by repo discovery) lists nested repos whose
+    files are left out of this repo's stats.
+    ownership=True blames HEAD and adds ownership_percentage to each contributor.
+    history_filter (see history_filter.history_filter_from_options) limits the
+    analysis to a time window and/or some authors; contributors, duration and
+    frequency then describe only the matching commits.
+    stage_deadlines ({stage: seconds}, default deadlines.DEFAULT_DEADLINES) bound
+    the "history" and "ownership" stages; a stage that runs out of time is
+    stopped, and the repo is returned with what was collected, marked partial.
+    renderer (see print_utils) shows the progress banners: terminal by default,
+    a NullRenderer keeps headless scans silent.
+    """
+    if renderer is None:
+        renderer = BufferedRenderer()
+    renderer.repo_status("REPO ANALYZING")
 
     # Only proceed if it is a .git folder indicating .git is likely a legitimate repository directory.
     # Return project dictionary containing all repo-level metadata.
@@ -34,98 +445,98 @@ def analyze_repo_type(repo_path):
 
         # Compute repo root path by using parent directory of .git. 
         # This should be the actual project directory name.
-        repo_root = os.path.dirname(repo_path["filename"].rstrip("/"))
+        repo_root = repo_root_of(repo_path)
         repo_name = os.path.basename(repo_root)
 
+        stage_deadlines = stage_deadlines or DEFAULT_DEADLINES
+        timed_out = []
+
         try:
-            # Attempt to load repo. If this fails, it's not a valid git repo.
-            repo = Repo(repo_root)
+            # Attempt to open the repo. If this fails, it's not a valid git repo.
+            source = _open_history(repo_path, repo_root, commit_cache, history_filter)
+            try:
+                branches = []
+                # Filled in place, so a stage that runs out of time leaves what it collected
+                acc, sampling = RepoAccumulator(repo_path.get("excluded_paths")), None
+                try:
+                    with Deadline(stage_deadlines.get("history")):
+                        branches = source.branches()
+                        if budget:
+                            acc, sampling = _aggregate_within_budget(source, budget, acc)
+                        else:
+                            # Single pass: every record is folded in and dropped straight away
+                            for c in source.history():
+                                acc.add(c)
+                                check_deadline()
+                except AnalysisTimeout:
+                    timed_out.append("history")
 
-            # Collect all commits across all branches
-            commits = list(repo.iter_commits('--all'))
+                owned_lines = None
+                if ownership:
+                    try:
+                        with Deadline(stage_deadlines.get("ownership")):
+                            owned_lines = _owned_lines(source, repo_path, repo_root, commit_cache)
+                    except AnalysisTimeout:
+                        timed_out.append("ownership")
+            finally:
+                source.close()
 
-            # Extract authors and their edited files
-            author_counts = Counter()
-            author_files = defaultdict(set)
-            # author -> extension -> {insertions, deletions}
-            author_loc = defaultdict(lambda: defaultdict(lambda: {"insertions": 0, "deletions": 0}))
+            if timed_out:
+                renderer.repo_status("REPO ANALYSIS TIMED OUT", f"Recorded as partial (stages: {', '.join(timed_out)})")
 
-            for c in commits:
-                email = c.author.email
-                author_counts[email] += 1
-                try:
-                    # c.stats.files provides a dict of changed files
-                    stats = c.stats.files
-                    author_files[email].update(stats.keys())
-                    for filepath, stat in stats.items():
-                        _, ext = os.path.splitext(filepath)
-                        ext = ext.lower() if ext else "no_extension"
-                        author_loc[email][ext]["insertions"] += stat.get("insertions", 0)
-                        author_loc[email][ext]["deletions"] += stat.get("deletions", 0)
-                except Exception:
-                    pass
-
-            # Commit count per user lets us compute contribution percentage
-            total_commits = sum(author_counts.values())
-
-            # Build contributor records (commit-count-based contribution)
-            contributors = []
-            for author, count in author_counts.items():
-                percent = (count / total_commits) * 100 if total_commits > 0 else 0
-                
-                total_insertions = sum(d["insertions"] for d in author_loc[author].values())
-                total_deletions = sum(d["deletions"] for d in author_loc[author].values())
-
-                contributors.append({
-                    "name": author,
-                    "commit_count": count,
-                    "contribution_percentage": round(percent, 1),
-                    "files_edited": sorted(list(author_files[author])),
-                    "insertions": total_insertions,
-                    "deletions": total_deletions,
-                    "loc_by_type": dict(author_loc[author])
-                })
-
-            # Branch list for repo-level metadata
-            branches = [b.name for b in repo.branches]
-
-            # Determine if repo has merge commits (signals teamwork or branching strategy)
-            has_merges = any(len(c.parents) > 1 for c in commits)
-
-            if len(author_counts) > 1:
+            total_commits = acc.total_commits
+            contributors = acc.contributors(owned_lines)
+
+            if len(acc.author_counts) > 1:
                 project_type = "collaborative"
             else:
                 project_type = "individual"
 
                 # Compute project duration and commit frequency
-            if commits:
-                commit_dates = [datetime.fromtimestamp(c.committed_date) for c in commits]
-                first_commit = min(commit_dates)
-                last_commit = max(commit_dates)
+            if total_commits:
+                first_commit = datetime.fromtimestamp(acc.first_date)
+                last_commit = datetime.fromtimestamp(acc.last_date)
                 duration_days = (last_commit - first_commit).days + 1
 
                 duration_weeks = max(duration_days / 7, 1)  # avoid division by zero
-                commits_per_week = total_commits / duration_weeks
+                commits_per_week = round(total_commits / duration_weeks, 1)
                 commit_frequency = f"{commits_per_week:.1f} commits/week"
             else:
                 duration_days = 0
+                commits_per_week = 0.0
                 commit_frequency = "0 commits/week"
 
             # Return full project metadata block mapped into the entry during detailed extraction
-            return {
+            result = {
                 "is_valid": True,
                 "repo_name": repo_name,
                 "repo_root": repo_root,
-                "authors": list(author_counts.keys()),
+                "authors": list(acc.author_counts.keys()),
                 "contributors": contributors,            
                 "branch_count": len(branches),
-                "has_merges": has_merges,
+                "has_merges": acc.has_merges,
                 "project_type": project_type,
                 "duration_days": duration_days,            
-                "commit_frequency": commit_frequency       
+                "commit_frequency": commit_frequency,
+                "commits_per_week": commits_per_week,
+                "activity": activity_summary(acc.series.compact()),
+                "sampled": sampling is not None,
+                "confidence": sampling["confidence"] if sampling else "exact",
+                # a stage ran out of time, or the budget's max_seconds cut the history short
+                "partial": bool(timed_out) or bool(sampling and sampling.get("partial")),
             }
+            if timed_out:
+                result["timed_out"] = timed_out
+                if "history" in timed_out:
+                    # only part of the history was seen
+                    result["confidence"] = "low"
+            if history_filter:
+                result["history_filter"] = history_filter
+            if sampling:
+                result["sample_size"] = sampling["sample_size"]
+                result["budget_exceeded"] = sampling["budget_exceeded"]
+            return result
         except Exception as e:
             # TODO: add error to logs
-            _print_banner("REPO ANALYSIS FAILED")
-            print(_center_text(str(e)))
+            renderer.repo_status("REPO ANALYSIS FAILED", str(e))
             return None
@@ -8,13 +8,26 @@ from docx import Document
 from docx.shared import Pt
 
 
+# languages below this share of a project are left out of its résumé line
+MIN_LANGUAGE_SHARE = 0.05
+
+
+def _main_languages(p: dict) -> str:
+    """Languages by share (biggest first, minor ones dropped); the plain list for older scans."""
+    shares = p.get("language_shares")
+    if not shares:
+        return p.get("languages", "Unknown")
+    main = [lang for lang, share in sorted(shares.items(), key=lambda kv: -kv[1]) if share >= MIN_LANGUAGE_SHARE]
+    return ", ".join(main)
+
+
 def build_project_line(p: dict) -> str:
     """
     Builds a short resume description about a project (General/Team view).
     Used for the full resume summary.
     """
     name = p.get("project", "Unknown")
-    langs = p.get("languages", "Unknown")
+    langs = _main_languages(p)
     skills = p.get("skills", "NA")
     frameworks = p.get("frameworks", "None")
     duration = p.get("duration_days", 0)
@@ -243,7 +256,7 @@ def _build_personal_project_description(project_name, project_context, user_stat
     Constructs a sentence describing the user's specific contribution to a project.
     """
     # Context from the project as a whole
-    langs = project_context.get("languages", "Unknown")
+    langs = _main_languages(project_context)
     skills = project_context.get("skills", "NA")
     frameworks = project_context.get("frameworks", "None")
     
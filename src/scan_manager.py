@@ -5,9 +5,10 @@ from datetime import datetime
 from db import delete_full_scan_by_id, get_full_scan_by_id, list_full_scans
 from permission_manager import get_yes_no
 from resume_generator import generate_resume, generate_contributor_portfolio
+from services.scan_service import rescore_scans
 
 from print_utils import (
-    print_repo_summary,
+    BufferedRenderer,
     print_project_rankings,
     print_chronological_projects,
     print_skills_timeline,
@@ -49,8 +50,9 @@ def scan_manager():
                 ("1", "View stored project analyses"),
                 ("2", "Generate Resume/Portfolio"),
                 ("3", "Delete stored scans"),
+                ("4", "Rescore stored scans"),
             ],
-            prompt="Choose an option (0–3): ",
+            prompt="Choose an option (0–4): ",
         )
 
         if choice == "1":
@@ -59,6 +61,8 @@ def scan_manager():
             generate_portfolio_menu()
         elif choice == "3":
             delete_full_scan()
+        elif choice == "4":
+            rescore_stored_scans()
         elif choice == "0":
             break
         else:
@@ -118,11 +122,12 @@ def view_full_scan_details():
 
         # Print various sections of the report
 
-    print_project_rankings(project_summaries)
-    print_chronological_projects(projects_chronological)
-    print_skills_timeline(skills_chronological)
-    print_resume_summaries(resume_summaries)
-    print_contributor_stats(project_summaries)
+    renderer = BufferedRenderer()
+    renderer.project_rankings(project_summaries)
+    renderer.chronological_projects(projects_chronological)
+    renderer.skills_timeline(skills_chronological)
+    renderer.resume_summaries(resume_summaries)
+    renderer.contributor_stats(project_summaries)
 
     print(_center_text("\nEnd of scan view.\n"))
 
@@ -190,6 +195,40 @@ def delete_full_scan():
         print(_center_text("Deletion canceled."))
 
 
+# --------------------------------------------------------
+# RESCORE SCANS
+# --------------------------------------------------------
+"""
+    Re-applies the current score weights to one or all saved scans (scores, rankings, résumé lines)
+    from their stored features, without the original archives.
+"""
+
+def rescore_stored_scans():
+    scans = list_full_scans()
+    if not scans:
+        print(_center_text("No saved scans found to rescore."))
+        return
+
+    print()
+    print(_center_text("Select a scan to rescore:"))
+    _print_scan_list(scans)
+
+    choice = input(_center_text("Enter number (A for all, 0 to cancel): ")).strip().upper()
+    if choice == "A":
+        summary_ids = None
+    elif choice.isdigit() and 0 < int(choice) <= len(scans):
+        summary_ids = [scans[int(choice) - 1]["summary_id"]]
+    elif not choice.isdigit() or int(choice) == 0:
+        print(_center_text("Rescore canceled."))
+        return
+    else:
+        print(_center_text("Invalid selection."))
+        return
+
+    rescored = rescore_scans(summary_ids)
+    print(_center_text(f"Rescored {len(rescored)} scan(s)."))
+
+
 # --------------------------------------------------------
 # PORTFOLIO GENERATION
 # --------------------------------------------------------
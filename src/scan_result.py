@@ -0,0 +1,43 @@
+"""
+Lazy result object returned by analyze_projects
+
+- Each section (project_summaries, resume_summaries, ...) is built by its own
+  function on first access and memoized, so callers only pay for what they read
+- It is a read-only Mapping: save_full_scan, the exporters and the API read it
+  like the dict it replaces (dict(result) builds every section)
+
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List
+
+
+class ScanResult(Mapping):
+    """section name -> value, built by builders[name]() when first read."""
+
+    def __init__(self, builders: Dict[str, Callable[[], Any]]):
+        self._builders = dict(builders)
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        value = self._values[key] = self._builders[key]()
+        return value
+
+    def __iter__(self):
+        return iter(self._builders)
+
+    def __len__(self) -> int:
+        return len(self._builders)
+
+    def __repr__(self) -> str:
+        return f"ScanResult({dict(self)!r})"
+
+    def built(self) -> List[str]:
+        """Sections computed so far."""
+        return [key for key in self._builders if key in self._values]
@@ -1,30 +1,139 @@
 #scoring system
+#
+# Projects are scored from a columnar feature table (one array per feature,
+# one row per project): the score is a weighted sum of the capped features,
+# computed a whole column at a time. Re-ranking with other weights / caps is
+# one more pass over the same columns.
 
-def compute_project_score(
-    *,
-    volume_score,
-    activity_score,
-    variety_score,
-    duration_score,
-    collab_bonus,
-    branch_bonus,
-    merge_bonus,
-    commit_bonus,
-):
+from array import array
+from itertools import repeat
+from operator import add, mul
+from typing import Dict, Iterable, List, Mapping, Optional
+
+# column order is also the summation order
+FEATURES = ("volume", "activity", "variety", "duration", "collab", "branch", "merge", "commit")
+
+# feature -> points per unit
+DEFAULT_WEIGHTS = {
+    "volume": 1.0,     # files in the project
+    "activity": 1.0,   # code*3 + test*2 + doc + design files (see activity_points)
+    "variety": 1.0,    # skills*2 + effective languages*1.5 (see variety_points)
+    "duration": 0.5,   # days between first and last modification
+    "collab": 8.0,     # 1 if collaborative
+    "branch": 1.5,     # branch count
+    "merge": 5.0,      # 1 if the repo has merge commits
+    "commit": 0.2,     # commits per week
+}
+
+# feature -> cap applied before weighting (so giant repos don't dominate everything)
+DEFAULT_CAPS = {"volume": 60, "duration": 90, "branch": 5, "commit": 30}
+
+
+def activity_points(code_files, test_files, doc_files, design_files):
+    """Type of work: code counts most, then tests, then docs / design."""
+    return code_files * 3 + test_files * 2 + doc_files * 1 + design_files * 1
+
+
+def variety_points(skills_count, languages_count):
+    """Variety of skills / languages."""
+    return skills_count * 2 + languages_count * 1.5
+
+
+def effective_languages(shares: Mapping[str, float]) -> float:
+    """
+    Number of languages weighted by how much of each there is (1 / sum of
+    squared shares): two equal halves count 2, a stray file next to a big
+    codebase barely above 1.
     """
-    Centralized project scoring formula.
+    total = sum(share * share for share in shares.values())
+    return 1 / total if total else 0
 
-    Keeps scoring logic in one place so it can be
-    tuned without touching analysis code.
+
+def features_from_summary(p: Mapping) -> Dict[str, float]:
+    """
+    Score features rebuilt from a stored project summary, for scans saved
+    before the summaries carried "score_features".
     """
+    def _count(joined, none_value):
+        return 0 if not joined or joined == none_value else len(joined.split(", "))
+
+    commits_per_week = p.get("commits_per_week")
+    if commits_per_week is None:
+        try:
+            commits_per_week = float(str(p.get("commit_frequency")).split()[0])
+        except (ValueError, IndexError):
+            commits_per_week = 0
+    shares = p.get("language_shares")
+    languages = effective_languages(shares) if shares is not None else _count(p.get("languages"), "Unknown")
+    return {
+        "volume": p.get("total_files", 0),
+        "activity": activity_points(p.get("code_files", 0), p.get("test_files", 0),
+                                    p.get("doc_files", 0), p.get("design_files", 0)),
+        "variety": variety_points(_count(p.get("skills"), "NA"), languages),
+        "duration": p.get("duration_days", 0),
+        "collab": 1 if p.get("is_collaborative") == "Yes" else 0,
+        "branch": p.get("branch_count", 0),
+        "merge": 1 if p.get("has_merges") == "Yes" else 0,
+        "commit": commits_per_week or 0,
+    }
+
+
+def scoring_params(options: Optional[Mapping]) -> tuple:
+    """
+    (weights, caps) from the advanced options: `score_weights` / `score_caps`
+    override single features of the defaults; a cap of None removes it.
+    Raises ValueError for unknown features or non-numeric values.
+    """
+    options = options or {}
+    overrides = []
+    for key in ("score_weights", "score_caps"):
+        value = options.get(key) or {}
+        if not isinstance(value, Mapping):
+            raise ValueError(f"{key} must map score features to numbers")
+        overrides.append(value)
+    weights = {**DEFAULT_WEIGHTS, **overrides[0]}
+    caps = {**DEFAULT_CAPS, **overrides[1]}
+    unknown = (set(weights) | set(caps)) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown score features: {', '.join(sorted(map(str, unknown)))}")
+    for name, value in list(weights.items()) + [(n, c) for n, c in caps.items() if c is not None]:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Score weight / cap for {name} must be a number, got {value!r}")
+    return weights, caps
+
+
+class FeatureTable:
+    """Project features as columns: feature -> array('d'), one row per project."""
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array("d") for name in FEATURES}
+
+    def __len__(self):
+        return len(self.columns[FEATURES[0]])
+
+    def append(self, row: Mapping[str, float]) -> None:
+        """Adds one project; missing features count as 0."""
+        for name in FEATURES:
+            self.columns[name].append(row.get(name) or 0)
+
+    def row(self, i: int) -> Dict[str, float]:
+        return {name: self.columns[name][i] for name in FEATURES}
+
+    def scores(self, weights: Optional[Mapping] = None, caps: Optional[Mapping] = None) -> array:
+        """sum(weight * min(feature, cap)) per row, in FEATURES order."""
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        caps = DEFAULT_CAPS if caps is None else caps
+        total = array("d", bytes(8 * len(self)))
+        for name in FEATURES:
+            column = self.columns[name]
+            cap = caps.get(name)
+            if cap is not None:
+                column = map(min, column, repeat(cap))
+            total = array("d", map(add, total, map(mul, column, repeat(weights.get(name, 0.0)))))
+        return total
+
 
-    return (
-        volume_score
-        + activity_score
-        + variety_score
-        + duration_score
-        + collab_bonus
-        + branch_bonus
-        + merge_bonus
-        + commit_bonus
-    )
+def ranking(scores: Iterable[float]) -> List[int]:
+    """Row indices by score, highest first (ties keep row order)."""
+    scores = list(scores)
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
@@ -2,20 +2,34 @@
 Service helpers for running scans without CLI prompts.
 """
 
-from typing import Any, Mapping, Optional
+from typing import Any, Iterable, List, Mapping, Optional
 
-from alternative_analysis import analyze_projects
-from db import save_full_scan
+from alternative_analysis import analyze_projects, rescore_results
+from db import DB_NAME, rewrite_full_scans, save_full_scan
 from metadata_extractor import base_extraction, detailed_extraction, load_filters
+from print_utils import NullRenderer
+from scoring_utils import scoring_params
+
+
+def wants_export(advanced_options: Optional[Mapping[str, Any]]) -> bool:
+    """Headless scans export only when the options name export formats or tables."""
+    options = advanced_options or {}
+    return options.get("export_formats") is not None or options.get("export_tables") is not None
 
 
 def analyze_scan(
     file_list: list,
     analysis_mode: str,
     advanced_options: Optional[Mapping[str, Any]] = None,
+    renderer=None,
+    export: Optional[bool] = None,
 ) -> Optional[Mapping[str, Any]]:
     """
     Run the scan pipeline and return analysis results without persisting.
+    Reports and per-repo progress are not rendered unless a renderer is
+    given (the CLI passes a BufferedRenderer). Export files are written when export is True, or when
+    it is None and the options ask for them (see wants_export); otherwise
+    only the result sections a caller reads are ever built.
     """
     if not file_list:
         return None
@@ -23,12 +37,22 @@ def analyze_scan(
     filters = load_filters()
     scraped_data = base_extraction(file_list, filters)
 
+    renderer = renderer or NullRenderer()
     advanced_options = dict(advanced_options or {})
+    if export is None:
+        export = wants_export(advanced_options)
     detailed_data = None
     if analysis_mode and analysis_mode.lower() == "advanced":
-        detailed_data = detailed_extraction(scraped_data, advanced_options, filters)
+        detailed_data = detailed_extraction(scraped_data, advanced_options, filters, renderer)
 
-    return analyze_projects(scraped_data, filters, advanced_options, detailed_data)
+    return analyze_projects(
+        scraped_data,
+        filters,
+        advanced_options,
+        detailed_data,
+        write_csv=export,
+        renderer=renderer,
+    )
 
 
 def save_scan(
@@ -48,11 +72,33 @@ def run_scan(
     advanced_options: Optional[Mapping[str, Any]] = None,
     consent: bool = False,
     persist: bool = True,
+    renderer=None,
+    export: Optional[bool] = None,
 ) -> Optional[Mapping[str, Any]]:
     """
     Run a scan and optionally persist it.
     """
-    results = analyze_scan(file_list, analysis_mode, advanced_options)
+    results = analyze_scan(file_list, analysis_mode, advanced_options, renderer, export)
     if results and persist:
         save_scan(results, analysis_mode, consent)
     return results
+
+
+def rescore_scans(
+    summary_ids: Optional[Iterable[int]] = None,
+    score_weights: Optional[Mapping[str, float]] = None,
+    score_caps: Optional[Mapping[str, Any]] = None,
+    db_path: str = DB_NAME,
+) -> List[int]:
+    """
+    Recompute scores, rankings and résumé summaries of stored scans (all
+    when summary_ids is None) from their stored score features; the original
+    archives are not needed. Raises ValueError for unknown score features.
+    Returns the rescored scan IDs.
+    """
+    weights, caps = scoring_params({"score_weights": score_weights, "score_caps": score_caps})
+    return rewrite_full_scans(
+        lambda scan_data: rescore_results(scan_data, weights, caps),
+        summary_ids,
+        db_path,
+    )
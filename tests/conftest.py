@@ -1,4 +1,5 @@
 import os
+import subprocess
 import tempfile
 from pathlib import Path
 
@@ -11,3 +12,40 @@ def pytest_configure(config) -> None:
     os.environ["TEMP"] = str(temp_root)
     os.environ["TMP"] = str(temp_root)
     tempfile.tempdir = str(temp_root)
+
+
+# --------------------------------------------------------
+# Git test repositories (shared by the history / cache / archive tests)
+# --------------------------------------------------------
+
+def git(cwd, *args, email="dev@example.com", date=None) -> str:
+    """
+    Runs git in cwd as a fixed identity and returns its stdout.
+    date (ISO 8601) pins the author and committer dates.
+    """
+    env = dict(os.environ)
+    if date:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = date
+    return subprocess.run(
+        ["git", "-c", f"user.email={email}", "-c", "user.name=Dev", "-c", "protocol.file.allow=always", *args],
+        cwd=cwd, check=True, capture_output=True, text=True, env=env,
+    ).stdout.strip()
+
+
+def init_repo(root) -> Path:
+    """Creates root (and its parents) as an empty repository on branch main."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    git(root, "init", "-q", "-b", "main")
+    return root
+
+
+def commit_all(root, message="change", email="dev@example.com", date=None) -> None:
+    """Stages every change in root and commits it."""
+    git(root, "add", "-A")
+    git(root, "commit", "-qm", message, email=email, date=date)
+
+
+def repo_entry(root) -> dict:
+    """The .git folder entry file_parser records for a repository at root."""
+    return {"filename": str(Path(root) / ".git") + "/", "extension": ".git", "isFile": False}
@@ -0,0 +1,159 @@
+import json
+
+from activity_series import WEEK_SECONDS, WeeklySeries, series_metrics, week_of, week_start
+from alternative_analysis import analyze_projects
+from db import get_full_scan_by_id, save_full_scan
+from export_utils import export_scan
+from print_utils import NullRenderer
+from repository_extractor import RepoAccumulator, activity_summary
+
+# Monday 2024-01-01 00:00 UTC
+MONDAY = 1704067200
+
+
+def _commit(email, committed_date, files=None):
+    return {
+        "sha": "0" * 40,
+        "author_email": email,
+        "committed_date": committed_date,
+        "parent_count": 1,
+        "files": files or {},
+    }
+
+
+def test_weeks_start_on_monday():
+    """
+    SCENARIO: Timestamps on the Sunday before, the Monday and the Sunday after a week boundary
+    EXPECTED: Monday starts a new week and week_start maps back to it
+    """
+    assert week_of(MONDAY - 1) == week_of(MONDAY) - 1
+    assert week_of(MONDAY + WEEK_SECONDS - 1) == week_of(MONDAY)
+    assert week_start(week_of(MONDAY + 3 * 86400)) == MONDAY
+
+
+def test_series_grows_in_both_directions():
+    """
+    SCENARIO: Commits are added newest first, then one in between, with quiet weeks
+    EXPECTED: The compact form spans first..last active week with zeros for the gaps
+    """
+    series = WeeklySeries()
+    series.add_commit(MONDAY + 5 * WEEK_SECONDS)
+    series.add_loc(MONDAY + 5 * WEEK_SECONDS, 10)
+    series.add_commit(MONDAY)
+    series.add_commit(MONDAY + 86400)
+    series.add_commit(MONDAY + 2 * WEEK_SECONDS)
+    series.add_loc(MONDAY + 2 * WEEK_SECONDS, 2.6)
+
+    assert series.compact() == {
+        "start": MONDAY,
+        "commits": [2, 0, 1, 0, 0, 1],
+        "loc": [0, 0, 3, 0, 0, 10],
+    }
+    assert WeeklySeries().compact() is None
+
+
+def test_metrics_streaks_and_bursts():
+    """
+    SCENARIO: Active weeks 1,1,1 then a gap, then 9 and 1
+    EXPECTED: 5 active weeks, a 3-week streak, peak 9, one burst week
+    """
+    metrics = series_metrics({"start": MONDAY, "commits": [1, 1, 1, 0, 9, 1], "loc": [0] * 6})
+    assert metrics == {
+        "active_weeks": 5,
+        "longest_streak_weeks": 3,
+        "peak_week_commits": 9,
+        "burst_weeks": 1,
+    }
+    assert series_metrics(None)["active_weeks"] == 0
+
+
+def test_accumulator_builds_repo_and_author_series():
+    """
+    SCENARIO: Two authors commit in different weeks; one sampled commit is extrapolated
+    EXPECTED: Repo and per-contributor series agree with the commits; LOC is weighted
+    """
+    acc = RepoAccumulator()
+    acc.add(_commit("a@x.com", MONDAY, {"a.py": (3, 1)}))
+    acc.add(_commit("b@x.com", MONDAY + 86400, {"b.py": (1, 0)}))
+    late = _commit("a@x.com", MONDAY + 2 * WEEK_SECONDS, {"a.py": (2, 2)})
+    acc.add_header(late)
+    acc.add_stats(late, weight=2.5)
+
+    assert acc.series.compact() == {"start": MONDAY, "commits": [2, 0, 1], "loc": [5, 0, 10]}
+
+    a, b = acc.contributors()
+    assert a["activity"]["series"] == {"start": MONDAY, "commits": [1, 0, 1], "loc": [4, 0, 10]}
+    assert a["activity"]["active_weeks"] == 2
+    assert b["activity"]["series"] == {"start": MONDAY, "commits": [1], "loc": [1]}
+
+
+def test_analyze_projects_uses_numeric_commits_per_week():
+    """
+    SCENARIO: The repo metadata has a numeric commits_per_week but an unparsable frequency string
+    EXPECTED: The commit bonus still counts it and the activity metrics and series reach the summary
+    """
+    file_entry = {
+        "filename": "/root/proj/main.py",
+        "extension": ".py",
+        "category": "code",
+        "last_modified": "2024-01-01 10:00:00",
+        "created_time": "2024-01-01 10:00:00",
+        "isFile": True,
+    }
+    activity = dict(series_metrics({"start": MONDAY, "commits": [3], "loc": [0]}),
+                    series={"start": MONDAY, "commits": [3], "loc": [0]})
+
+    def run(commits_per_week):
+        project = {
+            "repo_name": "proj",
+            "repo_root": "/root/proj",
+            "commit_frequency": "often",
+            "commits_per_week": commits_per_week,
+            "activity": activity,
+            "files": [file_entry],
+        }
+        return analyze_projects([file_entry], filters={}, advanced_options={},
+                                detailed_data={"files": [file_entry], "projects": [project]},
+                                write_csv=False, renderer=NullRenderer())
+
+    fast, slow = run(20.0)["project_summaries"][0], run(0.0)["project_summaries"][0]
+    assert fast["score"] - slow["score"] == 4.0
+    assert fast["activity"] == {"active_weeks": 1, "longest_streak_weeks": 1,
+                                "peak_week_commits": 3, "burst_weeks": 0,
+                                "series": {"start": MONDAY, "commits": [3], "loc": [0]}}
+
+
+def test_weekly_series_are_saved_per_project_and_contributor(tmp_path):
+    """
+    SCENARIO: A repo with two authors is aggregated, analyzed and the scan is saved
+    EXPECTED: The stored scan holds the compact weekly series of the project and of each
+              contributor (summary and contributor profiles), and exports carry them too
+    """
+    acc = RepoAccumulator()
+    acc.add(_commit("a@x.com", MONDAY + 3600, {"a.py": (5, 1)}))
+    acc.add(_commit("b@x.com", MONDAY + WEEK_SECONDS, {"b.py": (2, 0)}))
+    acc.add(_commit("a@x.com", MONDAY + 2 * WEEK_SECONDS, {"a.py": (1, 1)}))
+    file_entry = {"filename": "/root/proj/a.py", "extension": ".py", "category": "code",
+                  "last_modified": "2024-01-01 10:00:00", "isFile": True}
+    project = {"repo_name": "proj", "repo_root": "/root/proj", "files": [file_entry],
+               "activity": activity_summary(acc.series.compact()), "contributors": acc.contributors()}
+    results = analyze_projects([file_entry], filters={}, advanced_options={},
+                               detailed_data={"files": [file_entry], "projects": [project]},
+                               write_csv=False, renderer=NullRenderer())
+
+    db_path = str(tmp_path / "scans.db")
+    save_full_scan(results, "advanced", False, db_path=db_path)
+    stored = get_full_scan_by_id(1, db_path=db_path)["scan_data"]
+
+    summary = stored["project_summaries"][0]
+    assert summary["activity"]["series"] == {"start": MONDAY, "commits": [1, 1, 1], "loc": [6, 2, 2]}
+    assert summary["per_contributor_activity"]["a@x.com"]["series"] == {
+        "start": MONDAY, "commits": [1, 0, 1], "loc": [6, 0, 2]}
+    assert summary["per_contributor_activity"]["b@x.com"]["series"] == {
+        "start": MONDAY + WEEK_SECONDS, "commits": [1], "loc": [2]}
+    [entry] = stored["contributor_profiles"]["b@x.com"]["projects"]
+    assert entry["activity"]["series"]["commits"] == [1]
+
+    export_scan(results, tables=["projects"], formats=["ndjson"], out_dir=str(tmp_path), scan_name="s")
+    row = json.loads((tmp_path / "s_projects.ndjson").read_text(encoding="utf-8"))
+    assert row["per_contributor_activity"]["a@x.com"]["series"]["commits"] == [1, 0, 1]
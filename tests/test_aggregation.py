@@ -0,0 +1,187 @@
+from collections import defaultdict
+from datetime import datetime
+
+from aggregation_utils import (
+    ProjectAccumulator,
+    index_repositories,
+    merge_contributor_profiles,
+    merge_skill_usage,
+)
+from alternative_analysis import analyze_projects
+from analysis_utils import epoch_to_datetime, record_epoch, span_days, to_epoch
+from print_utils import NullRenderer
+from resume_generator import build_project_line
+
+
+def _file(name, ext=".py", category="code", modified="2024-01-10T10:00:00", **extra):
+    return dict({"filename": name, "extension": ext, "category": category,
+                 "last_modified": modified, "isFile": True}, **extra)
+
+
+def test_index_repositories():
+    """
+    SCENARIO: Two repos share a name; a file is listed by both
+    EXPECTED: The name index keeps the first repo, the file index the last one that lists the file
+    """
+    shared = _file("/p/a.py")
+    first = {"repo_name": "app", "repo_root": "/p", "files": [shared]}
+    second = {"repo_name": "app", "repo_root": "/q", "files": [shared, _file("/q/b.py")]}
+
+    by_name, by_file = index_repositories({"projects": [first, second]})
+
+    assert by_name == {"app": first}
+    assert by_file["/p/a.py"] is second and by_file["/q/b.py"] is second
+    assert index_repositories(None) == ({}, {})
+
+
+def test_accumulator_single_pass():
+    """
+    SCENARIO: A project with clean files, mac junk, a .git folder entry and two files of one repo
+    EXPECTED: Junk is skipped but still counts for collab detection; the repo is folded in once
+    """
+    usage = {}
+    acc = ProjectAccumulator("app", {".md": "Markdown"}, usage)
+    repo = {"repo_name": "app", "repo_root": "/p", "authors": ["a@x", "b@x"], "branch_count": 3,
+            "has_merges": False, "project_type": "collaborative", "duration_days": 12,
+            "commit_frequency": "2.0 commits/week", "commits_per_week": 2.0}
+
+    acc.add_file({"filename": "/p/.git/", "isFile": False, "last_modified": "2020-01-01T00:00:00"}, None)
+    acc.add_file(_file("/p/__MACOSX/app.py"), None)
+    acc.add_file(_file("/p/._app.py"), None)
+    acc.add_file(_file("/p/app.py", modified="2024-01-01T00:00:00"), repo)
+    acc.add_file(_file("/p/tests/test_app.py", modified="2024-02-01T00:00:00"), repo)
+    acc.add_file(_file("/p/README.md", ext=".md", category="documentation"), None)
+
+    assert acc.clean_files == 3
+    assert acc.has_git_path is True
+    assert (epoch_to_datetime(acc.first_mod).month, epoch_to_datetime(acc.last_mod).month) == (1, 2)
+    assert acc.langs == {"Markdown"}
+    assert (acc.activity_counts["code"], acc.activity_counts["test"], acc.activity_counts["documentation"]) == (1, 1, 1)
+    assert list(acc.repo_roots) == ["/p"] and acc.repo_authors == {"a@x", "b@x"}
+    assert acc.has_merges_flags == [False]
+    assert (acc.branch_count, acc.project_type, acc.commits_per_week) == (3, "collaborative", 2.0)
+    assert set(usage) == acc.skills and all(info["count"] >= 1 for info in usage.values())
+
+
+def test_merge_partials():
+    """
+    SCENARIO: Two projects' partial skill usage and contributor profiles
+    EXPECTED: min first / max last / summed counts; skills unioned and projects appended in order
+    """
+    total_usage = {}
+    merge_skill_usage(total_usage, {"Python": {"first": datetime(2024, 3, 1), "last": datetime(2024, 4, 1), "count": 2}})
+    merge_skill_usage(total_usage, {"Python": {"first": datetime(2024, 1, 1), "last": datetime(2024, 2, 1), "count": 1}})
+    assert total_usage == {"Python": {"first": datetime(2024, 1, 1), "last": datetime(2024, 4, 1), "count": 3}}
+
+    profiles = defaultdict(lambda: {"skills": set(), "projects": []})
+    merge_contributor_profiles(profiles, {"a": {"skills": {"Python"}, "projects": [{"name": "one"}]}})
+    merge_contributor_profiles(profiles, {"a": {"skills": {"Java"}, "projects": [{"name": "two"}]}})
+    assert profiles["a"] == {"skills": {"Python", "Java"}, "projects": [{"name": "one"}, {"name": "two"}]}
+
+
+def test_parallel_projects_match_serial(capsys):
+    """
+    SCENARIO: The same scan is analyzed serially and with a process pool
+    EXPECTED: Identical results and identical terminal output
+    """
+    files, repos = [], []
+    for p in range(12):
+        rows = [_file(f"/x/p{p}/src/m{i}{ext}", ext=ext, modified=f"2024-0{1 + (p + i) % 9}-10T10:00:00")
+                for i, ext in enumerate([".py", ".js", ".md", ".java"][: 1 + p % 4])]
+        files.extend(rows)
+        if p % 2:
+            repos.append({"repo_name": f"p{p}", "repo_root": f"/x/p{p}", "authors": ["a@x", f"u{p}@x"],
+                          "contributors": [{"name": "a@x", "contribution_percentage": 60.0,
+                                            "files_edited": [rows[0]["filename"]], "loc_by_type": {".py": {}}}],
+                          "branch_count": p, "has_merges": True, "duration_days": p * 3,
+                          "commit_frequency": f"{p}.0 commits/week", "frameworks": ["flask"], "files": rows})
+    detailed = {"files": files, "projects": repos}
+
+    runs = []
+    for workers in (1, 3):
+        result = analyze_projects(files, {"languages": {".py": "Python"}}, {"analysis_workers": workers},
+                                  detailed, write_csv=False)
+        runs.append((repr(result), capsys.readouterr().out))
+
+    assert runs[0] == runs[1]
+    assert "a@x" in runs[0][0]
+
+
+def test_timestamps_normalized_once_with_explicit_unknown():
+    """
+    SCENARIO: Zip tuples, ISO strings, datetimes and garbage are normalized
+    EXPECTED: Wall-clock epoch seconds that round-trip to the same datetime; garbage is None, never "now"
+    """
+    ts = to_epoch((2024, 3, 1, 12, 30, 5))
+    assert ts == to_epoch("2024-03-01T12:30:05Z") == to_epoch(datetime(2024, 3, 1, 12, 30, 5))
+    assert epoch_to_datetime(ts) == datetime(2024, 3, 1, 12, 30, 5)
+    assert [to_epoch(v) for v in ((2024, 13, 1, 0, 0, 0), "yesterday", None, "")] == [None] * 4
+    assert record_epoch({"modified_ts": None, "last_modified": "2024-01-01T00:00:00"}) is None
+    assert span_days(ts, ts + 86400) == 2 and span_days(None, ts) == 0
+
+
+def test_unknown_times_do_not_fake_dates(capsys):
+    """
+    SCENARIO: One project has a file with an unparseable time, another has only such files
+    EXPECTED: Known times alone set the duration; the undated project has duration 0, no dates,
+              and is listed last with "unknown" dates
+    """
+    rows = [
+        _file("/dated/a.py", modified="2024-01-01T00:00:00"),
+        _file("/dated/b.py", modified="2024-01-05T00:00:00"),
+        _file("/dated/c.py", modified="not a date"),
+        _file("/undated/a.py", modified=(0, 0, 0, 0, 0, 0)),
+    ]
+    result = analyze_projects(rows, {}, {}, write_csv=False, renderer=NullRenderer())
+
+    by_name = {p["project"]: p for p in result["project_summaries"]}
+    assert by_name["dated"]["duration_days"] == 5
+    assert by_name["dated"]["total_files"] == 3
+    assert (by_name["undated"]["duration_days"], by_name["undated"]["first_modified"]) == (0, None)
+    assert result["projects_chronological"][-1] == {"name": "undated", "first_used": "unknown", "last_used": "unknown"}
+    assert result["skills_chronological"] == [{"skill": "Python Programming", "first_used": "2024-01-01", "last_used": "2024-01-05"}]
+
+
+def test_language_shares_weighted_by_bytes_without_vendored_code():
+    """
+    SCENARIO: A big Python project with one stray .js file, vendored node_modules and a minified bundle
+    EXPECTED: Shares follow bytes (vendored / generated files left out), biggest first; with
+              language_weight="lines" the sniffed line counts are used when every file has one
+    """
+    acc = ProjectAccumulator("app", {}, None)
+    acc.add_file(_file("/t/app/core.py", language="Python", size=9000, line_count=300), None)
+    acc.add_file(_file("/t/app/web.js", ext=".js", language="JavaScript", size=1000, line_count=100), None)
+    acc.add_file(_file("/t/app/node_modules/react/index.js", ext=".js", language="JavaScript", size=10 ** 6,
+                       logical_path="app/node_modules/react/index.js"), None)
+    acc.add_file(_file("/t/app/static/app.min.js", ext=".js", language="JavaScript", size=10 ** 5), None)
+
+    assert acc.langs == {"Python", "JavaScript"}
+    assert acc.language_shares() == ("bytes", {"Python": 0.9, "JavaScript": 0.1})
+    assert acc.language_shares("lines") == ("lines", {"Python": 0.75, "JavaScript": 0.25})
+
+    acc.add_file(_file("/t/app/util.py", language="Python", size=0), None)  # no line count
+    assert acc.language_shares("lines")[0] == "bytes"
+    assert ProjectAccumulator("empty", {}, None).language_shares() == (None, {})
+
+
+def test_language_shares_drive_score_and_resume():
+    """
+    SCENARIO: Two projects use Python and JavaScript, one evenly and one with a single tiny .js file
+    EXPECTED: The even one gets more language variety; the résumé line lists languages by share
+              and leaves the stray one out; shares are stored as numbers on the summary
+    """
+    rows = [
+        _file("/even/a.py", language="Python", size=500),
+        _file("/even/b.js", ext=".js", language="JavaScript", size=500),
+        _file("/stray/a.py", language="Python", size=99000),
+        _file("/stray/b.js", ext=".js", language="JavaScript", size=1000),
+    ]
+    result = analyze_projects(rows, {}, {}, write_csv=False, renderer=NullRenderer())
+
+    by_name = {p["project"]: p for p in result["project_summaries"]}
+    assert by_name["stray"]["language_shares"] == {"Python": 0.99, "JavaScript": 0.01}
+    assert by_name["stray"]["languages"] == "JavaScript, Python"
+    assert by_name["even"]["score_features"]["variety"] == 2 * 2 + 2 * 1.5
+    assert by_name["stray"]["score_features"]["variety"] < by_name["even"]["score_features"]["variety"]
+    assert "using Python;" in build_project_line(by_name["stray"])
+    assert "using JavaScript, Python;" in build_project_line(by_name["even"])
@@ -0,0 +1,147 @@
+import os
+import zipfile
+
+import pytest
+
+from archive_git import ArchiveGitError, ArchiveRepository, count_line_changes
+from conftest import commit_all, git, init_repo
+from file_parser import check_file_validity
+from git_history import iter_git_log
+from repository_extractor import analyze_repo_type
+
+
+def _zip_dir(src, zip_path):
+    """Zips src (directory entries included) under its own folder name."""
+    base = os.path.dirname(src)
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for dirpath, dirnames, filenames in os.walk(src):
+            rel = os.path.relpath(dirpath, base)
+            zf.write(dirpath, rel + "/")
+            for name in filenames:
+                zf.write(os.path.join(dirpath, name), os.path.join(rel, name))
+    return str(zip_path)
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Edits, deletes, a binary file, a mode change, a file->dir swap and a merge."""
+    root = init_repo(tmp_path / "proj")
+    body = [f"line {i}" for i in range(200)]
+
+    def commit(n, email="a@example.com"):
+        commit_all(root, f"c{n}", email=email, date=f"2022-03-01T10:00:{n:02d}")
+
+    (root / "src").mkdir()
+    (root / "src" / "app.py").write_text("\n".join(body) + "\n")
+    (root / "notes").write_text("a\nb\n")
+    commit(0)
+    for n in range(1, 6):
+        body[n * 7] = f"changed {n}"
+        body.insert(n * 11, f"added {n}")
+        (root / "src" / "app.py").write_text("\n".join(body) + "\n")
+        commit(n, email="b@example.com" if n % 2 else "a@example.com")
+    (root / "logo.png").write_bytes(b"\x89PNG\0\0" + bytes(range(256)))
+    os.chmod(root / "notes", 0o755)
+    commit(6)
+    git(root, "checkout", "-qb", "side")
+    os.remove(root / "notes")
+    (root / "notes").mkdir()
+    (root / "notes" / "todo.md").write_text("x\n")
+    commit(7, email="c@example.com")
+    git(root, "checkout", "-q", "main")
+    (root / "README").write_text("no newline at end")
+    commit(8)
+    git(root, "merge", "-q", "--no-edit", "side", email="a@example.com", date="2022-03-01T10:00:09")
+    return root
+
+
+@pytest.mark.parametrize("repack", [None, ["gc", "-q", "--aggressive"],
+                                    ["-c", "repack.useDeltaBaseOffset=false", "repack", "-adfq"]])
+def test_archive_history_matches_git_log(tmp_path, project, repack):
+    """
+    SCENARIO: The repo's objects are loose, gc'd into a pack (OFS deltas) or packed with REF deltas
+    EXPECTED: Reading the zip yields exactly what git log yields on disk
+    """
+    if repack:
+        git(project, *repack)
+        git(project, "pack-refs", "--all")
+    zip_path = _zip_dir(str(project), tmp_path / "up.zip")
+
+    with ArchiveRepository(zip_path, "proj/.git/") as repo:
+        assert list(repo.iter_history()) == list(iter_git_log(str(project)))
+        assert repo.branches() == ["main", "side"]
+
+
+@pytest.mark.parametrize("old, new, expected", [
+    (b"a\nb\nc\n", b"a\nB\nc\nd\n", (2, 1)),
+    (b"", b"x\ny\n", (2, 0)),
+    (b"x\ny\n", b"", (0, 2)),
+    (b"a\nb", b"a\nb\n", (1, 1)),     # adding the final newline changes the last line
+    (b"\0bin", b"\0bin2", (0, 0)),    # binary
+    (b"a\nb\nc\nd\n", b"d\nc\nb\na\n", (3, 3)),
+])
+def test_count_line_changes(old, new, expected):
+    """
+    SCENARIO: Blob pairs covering edits, adds, deletes, EOF newline and binary data
+    EXPECTED: Same insertions/deletions as git diff --numstat
+    """
+    assert count_line_changes(old, new) == expected
+
+
+def test_large_rewrites_are_bounded_and_cancellable():
+    """
+    SCENARIO: A 20k-line file is rewritten completely, and a diff runs under an expired deadline
+    EXPECTED: The rewrite is counted as every line deleted and re-added without a quadratic diff;
+              the diff loop stops at the deadline
+    """
+    import time
+    import archive_git
+    from deadlines import AnalysisTimeout, Deadline
+
+    old = b"".join(b"old %d\n" % i for i in range(20000))
+    new = b"".join(b"new %d\n" % i for i in range(20000))
+    start = time.monotonic()
+    assert count_line_changes(old, new) == (20000, 20000)
+    assert time.monotonic() - start < 5
+
+    with pytest.raises(AnalysisTimeout):
+        with Deadline(60) as deadline:
+            deadline.cancel()
+            archive_git._edit_distance([1, 2, 3], [4, 5, 6])
+
+
+def test_upload_analyzed_without_extracting_git_dir(tmp_path, project):
+    """
+    SCENARIO: A zipped project goes through check_file_validity and repo analysis
+    EXPECTED: .git is not written to disk, yet the analysis matches the on-disk repo
+    """
+    zip_path = _zip_dir(str(project), tmp_path / "up.zip")
+
+    tree = check_file_validity(zip_path)
+    git_entry = next(e for e in tree if e["filename"].endswith("/.git/"))
+    repo_entry = dict(git_entry, extension=".git")
+    extracted_root = os.path.dirname(git_entry["filename"].rstrip("/"))
+
+    assert git_entry["archive_member"] == "proj/.git/"
+    assert not os.path.exists(os.path.join(extracted_root, ".git"))
+    assert os.path.isfile(os.path.join(extracted_root, "src", "app.py"))
+
+    from_archive = analyze_repo_type(repo_entry)
+    on_disk = analyze_repo_type({"filename": str(project / ".git") + "/", "extension": ".git", "isFile": False})
+
+    assert from_archive["repo_root"] == extracted_root
+    from_archive.pop("repo_root"), on_disk.pop("repo_root")
+    assert from_archive == on_disk
+
+
+def test_missing_git_dir_in_archive(tmp_path):
+    """
+    SCENARIO: The prefix does not hold a repository
+    EXPECTED: ArchiveGitError
+    """
+    zip_path = tmp_path / "empty.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("proj/readme.txt", "hi")
+
+    with pytest.raises(ArchiveGitError):
+        ArchiveRepository(str(zip_path), "proj/.git/")
@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+import pytest
+
+import commit_cache
+from commit_cache import CommitCache
+from conftest import commit_all, init_repo
+from git_history import iter_git_log
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = init_repo(tmp_path / "repo")
+    for i in range(3):
+        (root / f"f{i}.py").write_text("x\n" * (i + 1))
+        commit_all(root, f"c{i}", email=f"dev{i % 2}@example.com")
+    return root
+
+
+def test_iter_history_matches_git_log_and_populates_cache(tmp_path, repo):
+    """
+    SCENARIO: First scan of a repository with an empty cache
+    EXPECTED: Same records/order as a plain git log, and all commits get cached
+    """
+    cache = CommitCache(str(tmp_path / "cache.db"))
+
+    records = list(cache.iter_history(str(repo)))
+
+    assert records == list(iter_git_log(str(repo)))
+    assert set(cache.get_many([r["sha"] for r in records])) == {r["sha"] for r in records}
+    cache.close()
+
+
+def test_rescan_only_walks_new_commits(tmp_path, repo):
+    """
+    SCENARIO: The repository gains one commit between two scans
+    EXPECTED: The second scan asks git log only for the new commit
+    """
+    cache = CommitCache(str(tmp_path / "cache.db"))
+    list(cache.iter_history(str(repo)))
+
+    (repo / "new.md").write_text("a\nb\n")
+    commit_all(repo, "new")
+
+    calls = []
+    real_log = commit_cache.iter_git_log
+
+    def spy(repo_root, rev_args=("--all",), stdin_revs=None):
+        calls.append(list(stdin_revs or []))
+        return real_log(repo_root, rev_args, stdin_revs)
+
+    with patch("commit_cache.iter_git_log", side_effect=spy):
+        records = list(cache.iter_history(str(repo)))
+
+    assert len(calls) == 1 and len(calls[0]) == 1
+    assert records[0]["files"] == {"new.md": (2, 0)}
+    assert records == list(iter_git_log(str(repo)))
+
+    # fully cached: no git log at all
+    with patch("commit_cache.iter_git_log", side_effect=AssertionError("walked")):
+        assert len(list(cache.iter_history(str(repo)))) == 4
+    cache.close()
+
+
+def test_put_many_round_trip(tmp_path):
+    """
+    SCENARIO: Records are stored and read back
+    EXPECTED: Identical dicts, unknown SHAs are simply absent
+    """
+    cache = CommitCache(str(tmp_path / "cache.db"))
+    record = {
+        "sha": "a" * 40,
+        "author_email": "x@example.com",
+        "authored_date": 1,
+        "committed_date": 2,
+        "parent_count": 2,
+        "files": {"a.py": (1, 2), "b/c.txt": (0, 0)},
+    }
+    cache.put_many([record])
+
+    assert cache.get_many(["a" * 40, "b" * 40]) == {"a" * 40: record}
+    cache.close()
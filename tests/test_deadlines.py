@@ -0,0 +1,204 @@
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import deadlines
+from deadlines import AnalysisTimeout, Deadline, check_deadline, deadlines_from_options
+from repository_extractor import analyze_repo_type
+
+SLEEPER = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+def _entry():
+    return {"filename": "/path/to/repo/.git/", "extension": ".git", "isFile": False}
+
+
+def _backend():
+    backend = MagicMock()
+    backend.branches.return_value = ["main"]
+    return backend
+
+
+def _commit(n):
+    return {
+        "sha": f"{n:040d}",
+        "author_email": "a@example.com",
+        "committed_date": 1700000000 + n * 86400,
+        "parent_count": 1,
+        "files": {"app.py": (1, 0)},
+    }
+
+
+def test_stalled_process_is_killed_at_the_deadline():
+    """
+    SCENARIO: A subprocess hangs while a 0.3s deadline is active
+    EXPECTED: It is killed at the deadline and reported as AnalysisTimeout, not as a git error
+    """
+    start = time.monotonic()
+    with pytest.raises(AnalysisTimeout):
+        with Deadline(0.3):
+            deadlines.run(SLEEPER, stdout=subprocess.PIPE)
+    assert time.monotonic() - start < 5
+
+
+def test_cancel_from_another_thread_and_nesting():
+    """
+    SCENARIO: An outer deadline without a time limit is cancelled from another thread while an inner stage waits
+    EXPECTED: The inner stage's process is killed too and cooperative checks raise
+    """
+    with Deadline() as outer:
+        with Deadline(60) as inner:
+            assert inner.remaining() > 59
+            proc = deadlines.popen(SLEEPER)
+            threading.Timer(0.2, outer.cancel).start()
+            assert proc.wait(timeout=10) != 0
+            deadlines.release(proc)
+            with pytest.raises(AnalysisTimeout):
+                check_deadline()
+    check_deadline()  # nothing active any more
+
+
+@pytest.mark.skipif(not hasattr(deadlines.resource, "prlimit"), reason="needs Linux prlimit")
+def test_git_processes_get_resource_limits():
+    """
+    SCENARIO: A process is started through deadlines.popen
+    EXPECTED: Its address space and CPU time are limited
+    """
+    proc = deadlines.popen(
+        [sys.executable, "-c",
+         "import resource; print(resource.getrlimit(resource.RLIMIT_AS)[0], resource.getrlimit(resource.RLIMIT_CPU)[0])"],
+        stdout=subprocess.PIPE,
+    )
+    out, _ = proc.communicate()
+    deadlines.release(proc)
+    assert out.split() == [str(deadlines.GIT_MAX_MEMORY_BYTES).encode(), str(deadlines.GIT_MAX_CPU_SECONDS).encode()]
+
+
+def test_options():
+    """
+    SCENARIO: Stage deadlines set, disabled and left at default in the advanced options
+    EXPECTED: Set values are used, <= 0 disables a stage, the rest keep their defaults
+    """
+    got = deadlines_from_options({"history_deadline": 30, "ownership_deadline": 0})
+    assert got == {"fingerprint": deadlines.DEFAULT_DEADLINES["fingerprint"], "history": 30, "ownership": None}
+    with pytest.raises(ValueError):
+        deadlines_from_options({"history_deadline": "30"})
+
+
+def test_concurrent_scans_keep_their_own_deadlines():
+    """
+    SCENARIO: Two threads (two API scans) run under their own deadlines; the first one's expires
+    EXPECTED: The second scan's process survives and it still sees its own deadline; a worker
+              thread handed the deadline with active() sees it, one without does not
+    """
+    first_in = threading.Event()
+    second_in = threading.Event()
+    seen = {}
+
+    def first():
+        with Deadline(0.2):
+            first_in.set()
+            second_in.wait(5)
+            with pytest.raises(AnalysisTimeout):
+                deadlines.run(SLEEPER, stdout=subprocess.PIPE)
+
+    def second():
+        first_in.wait(5)
+        with Deadline(60) as mine:
+            second_in.set()
+            proc = deadlines.popen(SLEEPER)
+            time.sleep(0.5)  # the first deadline expires (and its scan exits) meanwhile
+            seen["alive"] = proc.poll() is None
+            seen["current"] = deadlines.current_deadline() is mine
+            proc.kill()
+            proc.wait()
+            deadlines.release(proc)
+
+            worker = {}
+            handed = threading.Thread(target=lambda: worker.update(handed=_in_active(mine)))
+            bare = threading.Thread(target=lambda: worker.update(bare=deadlines.current_deadline()))
+            for t in (handed, bare):
+                t.start()
+                t.join()
+            seen["worker"] = worker
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(20)
+
+    assert seen["alive"] and seen["current"]
+    assert seen["worker"]["handed"] is True and seen["worker"]["bare"] is None
+
+
+def _in_active(deadline):
+    with deadlines.active(deadline):
+        return deadlines.current_deadline() is deadline
+
+
+def test_slow_history_is_recorded_as_partial():
+    """
+    SCENARIO: The history stream is slower than the history deadline
+    EXPECTED: The repo comes back partial with the commits aggregated before the deadline
+    """
+    def slow_log(*args, **kwargs):
+        for n in range(100):
+            time.sleep(0.02)
+            yield _commit(n)
+
+    with patch("repository_extractor.GitBackend", return_value=_backend()), \
+         patch("repository_extractor.iter_git_log", side_effect=slow_log):
+        result = analyze_repo_type(_entry(), stage_deadlines={"history": 0.3})
+
+    assert result["partial"] is True
+    assert result["timed_out"] == ["history"]
+    assert result["confidence"] == "low"
+    assert 0 < result["contributors"][0]["commit_count"] < 100
+    assert result["branch_count"] == 1
+
+
+def test_budgeted_history_keeps_partial_stats_on_timeout():
+    """
+    SCENARIO: A repo within its budget whose numstat pass is slower than the history deadline
+    EXPECTED: Commit counts stay exact (header pass) and the LOC read before the deadline is kept
+    """
+    def slow_log(*args, **kwargs):
+        for n in range(100):
+            time.sleep(0.02)
+            yield _commit(n)
+
+    headers = [_commit(n) for n in range(100)]
+    with patch("repository_extractor.GitBackend", return_value=_backend()), \
+         patch("repository_extractor.iter_commit_headers", return_value=iter(headers)), \
+         patch("repository_extractor.iter_git_log", side_effect=slow_log):
+        result = analyze_repo_type(_entry(), budget={"max_commits": 1000}, stage_deadlines={"history": 0.3})
+
+    assert result["partial"] is True and result["timed_out"] == ["history"]
+    contributor = result["contributors"][0]
+    assert contributor["commit_count"] == 100
+    assert 0 < contributor["insertions"] < 100
+
+
+def test_stalled_ownership_keeps_the_history():
+    """
+    SCENARIO: The ownership stage hangs in a subprocess
+    EXPECTED: The history results are kept, ownership is left out and the stage is reported
+    """
+    def hanging_blame(*args):
+        deadlines.run(SLEEPER, stdout=subprocess.PIPE)
+
+    with patch("repository_extractor.GitBackend", return_value=_backend()), \
+         patch("repository_extractor.iter_git_log", return_value=iter([_commit(0), _commit(1)])), \
+         patch("repository_extractor._owned_lines", side_effect=hanging_blame):
+        result = analyze_repo_type(_entry(), ownership=True, stage_deadlines={"ownership": 0.3})
+
+    assert result["partial"] is True
+    assert result["timed_out"] == ["ownership"]
+    assert result["confidence"] == "exact"
+    assert result["contributors"][0]["commit_count"] == 2
+    assert "ownership_percentage" not in result["contributors"][0]
@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from conftest import commit_all, git, init_repo, repo_entry
 from metadata_extractor import detailed_extraction
 
 def test_detailed_extraction_valid_repo():
@@ -76,3 +77,186 @@ def test_detailed_extraction_non_repo(capsys):
     # No repo analysis should be printed
     captured = capsys.readouterr()
     assert "Repo analysis" not in captured.out
+
+
+def _make_repo(root, email):
+    init_repo(root)
+    (root / "main.py").write_text("print('hi')\n")
+    commit_all(root, "init", email=email)
+    return dict(repo_entry(root), category="repository")
+
+
+def test_analyze_repositories_parallel_keeps_order_and_isolates_failures(tmp_path):
+    """
+    SCENARIO: Three repo entries analyzed in a process pool, the middle one is broken
+    EXPECTED: Results come back in input order; only the broken repo yields None
+    """
+    from metadata_extractor import analyze_repositories
+
+    entries = [
+        _make_repo(tmp_path / "alpha", "a@example.com"),
+        {"filename": str(tmp_path / "broken" / ".git") + "/", "extension": ".git", "isFile": False, "category": "repository"},
+        _make_repo(tmp_path / "beta", "b@example.com"),
+    ]
+
+    results = analyze_repositories(entries, use_cache=False, workers=3)
+
+    assert [r["repo_name"] if r else None for r in results] == ["alpha", None, "beta"]
+    assert results[0]["authors"] == ["a@example.com"]
+    assert results[2]["authors"] == ["b@example.com"]
+
+
+def test_analyze_repositories_survives_worker_crash(tmp_path, monkeypatch):
+    """
+    SCENARIO: One repo kills its worker process outright (e.g. OOM kill)
+    EXPECTED: The other repos still get analyzed; the crashing one yields None
+    """
+    import multiprocessing
+    import os
+    import metadata_extractor
+
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("needs fork so the patched analyzer reaches the workers")
+
+    def fake_analyze(entry, **kwargs):
+        if "crash" in entry["filename"]:
+            os._exit(1)
+        return {"is_valid": True, "repo_name": entry["filename"]}
+
+    monkeypatch.setattr(metadata_extractor, "analyze_repo_type", fake_analyze)
+    entries = [{"filename": name} for name in ("one", "crash", "two")]
+
+    results = metadata_extractor.analyze_repositories(entries, use_cache=False, workers=2)
+
+    assert results[0]["repo_name"] == "one"
+    assert results[1] is None
+    assert results[2]["repo_name"] == "two"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_clone_families_share_work_and_report_relationships(tmp_path, monkeypatch, workers):
+    """
+    SCENARIO: An upload holds a repo, an identical copy of it, a fork with one extra commit and an unrelated repo
+    EXPECTED: The copy is not re-analyzed, the fork is its own task that runs after the original
+              and only walks its new commit (shared persistent cache), also with several
+              workers, and relationships are reported
+    """
+    import shutil
+    import metadata_extractor
+    from git_history import iter_git_log as real_log
+
+    original = _make_repo(tmp_path / "orig", "a@example.com")
+    shutil.copytree(tmp_path / "orig", tmp_path / "copy")
+    shutil.copytree(tmp_path / "orig", tmp_path / "fork")
+    (tmp_path / "fork" / "extra.py").write_text("x = 1\n")
+    commit_all(tmp_path / "fork", "extra", email="f@example.com")
+    other = _make_repo(tmp_path / "other", "o@example.com")
+
+    def entry(name):
+        return dict(original, filename=str(tmp_path / name / ".git") + "/")
+
+    entries = [original, entry("copy"), entry("fork"), other]
+
+    # walks are logged to a file, so the ones made in worker processes are seen too
+    walk_log = tmp_path / "walked.log"
+
+    def spy(repo_root, rev_args=("--all",), stdin_revs=None):
+        with open(walk_log, "a", encoding="utf-8") as f:
+            f.write(f"{repo_root}\t{len(stdin_revs) if stdin_revs is not None else 'all'}\n")
+        return real_log(repo_root, rev_args, stdin_revs)
+
+    from commit_cache import CommitCache
+    monkeypatch.setattr(metadata_extractor, "CommitCache", lambda: CommitCache(str(tmp_path / "cache.db")))
+    with patch("repository_extractor.iter_git_log", side_effect=spy), \
+         patch("commit_cache.iter_git_log", side_effect=spy):
+        results = metadata_extractor.analyze_repositories(entries, use_cache=True, workers=workers)
+
+    orig, copy, fork, unrelated = results
+    root = lambda name: str(tmp_path / name)
+
+    assert copy["clone_of"] == root("orig") and orig["clone_of"] is None
+    assert copy["repo_name"] == "copy" and copy["contributors"] == orig["contributors"]
+    assert copy["fingerprint"] == orig["fingerprint"] != fork["fingerprint"]
+    assert sorted(fork["related_repos"]) == [root("copy"), root("orig")]
+    assert orig["related_repos"] == [root("fork")]
+    assert unrelated["related_repos"] == [] and unrelated["clone_of"] is None
+    assert [c["name"] for c in fork["contributors"]] == ["f@example.com", "a@example.com"]
+
+    # the fork waits for the original, so it only walks its own commit, with 1 or 2 workers
+    walked = [tuple(line.split("\t")) for line in walk_log.read_text(encoding="utf-8").splitlines()]
+    assert sorted(walked) == sorted([(root("orig"), "1"), (root("fork"), "1"), (root("other"), "1")])
+
+
+def test_submodules_and_nested_repos_form_a_hierarchy(tmp_path):
+    """
+    SCENARIO: An uploaded monorepo has a submodule (git dir in .git/modules) and a sibling repo whose name extends it
+    EXPECTED: Parent/child links are reported, the submodule's files and gitlink
+              are not counted in the parent, and the sibling keeps its own files
+    """
+    import os
+    import zipfile
+    from file_parser import check_file_validity
+    from metadata_extractor import base_extraction, load_filters
+
+    lib_src = init_repo(tmp_path / "lib_src")
+    (lib_src / "lib.py").write_text("def f():\n    return 1\n")
+    commit_all(lib_src, "lib", email="lib@example.com")
+
+    upload = tmp_path / "upload"
+    app = init_repo(upload / "app")
+    (app / "main.py").write_text("print('app')\n")
+    commit_all(app, "app")
+    git(app, "submodule", "add", "-q", str(lib_src), "vendor/lib")
+    git(app, "commit", "-qm", "add lib")
+    _make_repo(upload / "app2", "other@example.com")
+
+    zip_path = tmp_path / "upload.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for dirpath, _, filenames in os.walk(upload):
+            rel = os.path.relpath(dirpath, upload)
+            if rel != ".":
+                zf.write(dirpath, rel + "/")
+            for name in filenames:
+                zf.write(os.path.join(dirpath, name), os.path.join(rel, name) if rel != "." else name)
+
+    filters = load_filters()
+    data = base_extraction(check_file_validity(str(zip_path)), filters)
+    result = detailed_extraction(data, {"framework_scan": False, "programming_scan": False, "commit_cache": False})
+
+    projects = {p["repo_name"]: p for p in result["projects"]}
+    assert sorted(projects) == ["app", "app2", "lib"]
+    app_p, lib_p, app2_p = projects["app"], projects["lib"], projects["app2"]
+
+    assert lib_p["parent_repo"] == app_p["repo_root"] and lib_p["submodule"] is True
+    assert app_p["child_repos"] == [lib_p["repo_root"]] and app_p["parent_repo"] is None
+    assert app2_p["parent_repo"] is None
+
+    # lib's history comes from app/.git/modules inside the archive
+    assert lib_p["authors"] == ["lib@example.com"]
+    app_files = {f for c in app_p["contributors"] for f in c["files_edited"]}
+    assert app_files == {"main.py", ".gitmodules"}  # no vendor/lib gitlink
+
+    names = lambda p: {os.path.relpath(f["filename"], p["repo_root"]) for f in p["files"] if f["isFile"]}
+    assert "lib.py" in names(lib_p)
+    assert not any(n.startswith("vendor") for n in names(app_p))
+    # "app2" starts with "app" but its files stay out of app
+    assert all(f["filename"].startswith(app_p["repo_root"] + os.sep) or f["filename"].rstrip("/") == app_p["repo_root"]
+               for f in app_p["files"])
+    assert "main.py" in names(app2_p)
+
+
+def test_forks_of_one_template_are_separate_tasks():
+    """
+    SCENARIO: Three submissions forked from one template (shared root, different tips), one of them uploaded twice
+    EXPECTED: Only the byte-identical copy is grouped; every fork is its own task, unreadable repos too
+    """
+    import metadata_extractor
+
+    def fp(tip):
+        return {"id": f"id-{tip}", "roots": ["template-root"], "tips": [tip]}
+
+    entries = [{"filename": f"/s{i}/.git/"} for i in range(5)]
+    fingerprints = [fp("a"), fp("b"), fp("a"), fp("c"), None]
+
+    assert metadata_extractor._group_identical_copies(entries, fingerprints) == [[0, 2], [1], [3], [4]]
+    assert metadata_extractor._group_clone_families(fingerprints) == [[0, 1, 2, 3], [4]]
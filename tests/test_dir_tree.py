@@ -0,0 +1,78 @@
+import io
+
+from alternative_analysis import analyze_projects
+from dir_tree import DirTree
+from export_utils import export_scan
+from print_utils import BufferedRenderer, NullRenderer
+
+
+def _file(path, size, category="source_code", language="Python", ts=1704880800):
+    return {"filename": "/tmp/x/" + path, "logical_path": path, "size": size, "category": category,
+            "language": language, "modified_ts": ts, "isFile": True}
+
+
+FILES = [
+    {"filename": "/tmp/x/app/", "logical_path": "app/", "size": 0, "isFile": False, "category": "uncategorized"},
+    {"filename": "/tmp/x/app/empty/", "logical_path": "app/empty/", "size": 0, "isFile": False},
+    _file("app/main.py", 100, ts=1000),
+    _file("app/services/api.py", 300, ts=3000),
+    _file("app/services/db/models.py", 500, ts=2000),
+    _file("app/README.md", 50, category="documentation", language="", ts=None),
+    _file("site/index.js", 700, category="web_code", language="JavaScript", ts=500),
+]
+
+
+def test_subtree_aggregates_bottom_up():
+    """
+    SCENARIO: A tree of nested directories with files of different sizes, kinds and times
+    EXPECTED: Every directory totals its whole subtree; unknown times are ignored; empty
+              directories exist with zero totals; paths are normalized on lookup
+    """
+    tree = DirTree.from_records(FILES)
+
+    services = tree["./app/services/"]
+    assert (services["size"], services["files"]) == (800, 2)
+    assert services["languages"] == {"Python": 2}
+    assert (services["first_ts"], services["last_ts"]) == (2000, 3000)
+    assert services["children"] == ["app/services/db"]
+
+    app = tree["app"]
+    assert (app["size"], app["files"]) == (950, 4)
+    assert app["categories"] == {"source_code": 3, "documentation": 1}
+    assert app["children"] == ["app/empty", "app/services"]
+    assert tree["app/empty"]["files"] == 0 and tree["app/empty"]["first_ts"] is None
+
+    root = tree[""]
+    assert (root["size"], root["files"], root["first_ts"], root["last_ts"]) == (1650, 5, 500, 3000)
+    assert root["children"] == ["app", "site"]
+    assert "app/services/db" in tree and "app/main.py" not in tree
+
+
+def test_largest_directories():
+    """
+    SCENARIO: The largest directories are asked for
+    EXPECTED: Biggest subtree first, root left out unless asked for
+    """
+    tree = DirTree.from_records(FILES)
+    assert [d["path"] for d in tree.largest(3)] == ["app", "app/services", "site"]
+    assert tree.largest(1, include_root=True)[0]["path"] == ""
+
+
+def test_scan_exposes_tree_report_and_export(tmp_path):
+    """
+    SCENARIO: A scan of files carrying their path inside the zip
+    EXPECTED: Projects are grouped by the top folder inside the zip, the tree is a lazy section,
+              the CLI lists the largest directories and the tree is exported as a table
+    """
+    null = analyze_projects(FILES, {}, {}, write_csv=False, renderer=NullRenderer())
+    assert "directory_tree" not in null.built()
+    assert sorted(p["project"] for p in null["project_summaries"]) == ["app", "site"]
+    assert null["directory_tree"]["app/services"]["size"] == 800
+
+    out = io.StringIO()
+    analyze_projects(FILES, {}, {}, write_csv=False, renderer=BufferedRenderer(stream=out, width=80))
+    assert "- app/services/: 800 B in 2 files" in out.getvalue()
+
+    export_scan(null, tables=["directories"], formats=["ndjson"], out_dir=str(tmp_path), scan_name="s")
+    rows = (tmp_path / "s_directories.ndjson").read_text(encoding="utf-8").splitlines()
+    assert len(rows) == len(null["directory_tree"])
@@ -0,0 +1,106 @@
+import csv
+import json
+import os
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+import file_parser
+from alternative_analysis import analyze_projects
+from export_utils import export_options, export_scan
+from print_utils import BufferedRenderer, NullRenderer
+
+RESULTS = {
+    "project_summaries": [{"project": "app", "total_files": 2, "score": 12.5,
+                           "first_modified": datetime(2024, 1, 10, 10, 0),
+                           "per_contributor_scores": {"a@x": 6.25}}],
+    "contributor_profiles": {"a@x": {"skills": ["Python"],
+                                     "projects": [{"name": "app", "pct": 50.0, "score": 6.25, "commit_count": 3}]}},
+    "skills_chronological": [{"skill": "Python", "first_used": "2024-01-10", "last_used": "2024-01-10"}],
+}
+
+
+def _files(n):
+    return lambda: (("app", {"filename": f"/app/m{i}.py", "extension": ".py", "modified_ts": 1704880800 + i})
+                    for i in range(n))
+
+
+def test_tables_in_both_formats_with_per_scan_names(tmp_path):
+    """
+    SCENARIO: A scan is exported as CSV and NDJSON, then exported again under the same name
+    EXPECTED: One file per table and format named after the scan; nested values as JSON;
+              the second export gets its own names instead of overwriting the first
+    """
+    paths = export_scan(RESULTS, _files(3), formats=["csv", "ndjson"], out_dir=str(tmp_path), scan_name="s1")
+
+    assert sorted(os.path.basename(p) for p in paths) == sorted(
+        f"s1_{table}.{fmt}" for table in ("projects", "contributors", "files", "skills", "directories") for fmt in ("csv", "ndjson"))
+
+    with open(tmp_path / "s1_projects.csv", encoding="utf-8") as f:
+        row = next(csv.DictReader(f))
+    assert (row["project"], row["score"], row["first_modified"]) == ("app", "12.5", "2024-01-10T10:00:00")
+    assert json.loads(row["per_contributor_scores"]) == {"a@x": 6.25}
+
+    with open(tmp_path / "s1_contributors.ndjson", encoding="utf-8") as f:
+        contributor = json.loads(f.readline())
+    assert {k: contributor[k] for k in ("contributor", "project", "pct", "score", "insertions", "skills")} == {
+        "contributor": "a@x", "project": "app", "pct": 50.0, "score": 6.25, "insertions": None, "skills": "Python"}
+    with open(tmp_path / "s1_files.ndjson", encoding="utf-8") as f:
+        assert [json.loads(line)["last_modified"] for line in f] == [
+            "2024-01-10T10:00:00", "2024-01-10T10:00:01", "2024-01-10T10:00:02"]
+
+    again = export_scan(RESULTS, tables=["skills"], out_dir=str(tmp_path), scan_name="s1")
+    assert [os.path.basename(p) for p in again] == ["s1-2_skills.csv"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_file_table_streams_at_constant_memory(tmp_path):
+    """
+    SCENARIO: The per-file table of a 20k-file scan is exported from a generator
+    EXPECTED: Every row is written while memory stays far below the size of the table
+    """
+    tracemalloc.start()
+    export_scan(RESULTS, _files(20_000), formats=["ndjson"], tables=["files"], out_dir=str(tmp_path), scan_name="big")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    with open(tmp_path / "big_files.ndjson", "rb") as f:
+        assert sum(1 for _ in f) == 20_000
+    assert peak < 512 * 1024
+
+
+def test_unwritable_target_never_prompts(tmp_path, monkeypatch, capsys):
+    """
+    SCENARIO: The export target cannot be written (e.g. the file is locked)
+    EXPECTED: A warning is printed and the table skipped, without asking for input
+    """
+    monkeypatch.setattr("builtins.input", lambda *a: pytest.fail("export prompted"))
+    monkeypatch.setattr(os, "replace", lambda *a: (_ for _ in ()).throw(PermissionError("locked")))
+
+    assert export_scan(RESULTS, tables=["projects"], out_dir=str(tmp_path), scan_name="s") == []
+    assert "[WARN] Could not export projects" in capsys.readouterr().out
+    assert os.listdir(tmp_path) == []
+
+
+def test_options_and_analyze_projects_stage(tmp_path, monkeypatch, capsys):
+    """
+    SCENARIO: analyze_projects exports with options from the advanced options
+    EXPECTED: Only the requested tables / formats are written under the scan name; the CLI renderer
+              reports them, the null renderer stays silent; unknown options are rejected
+    """
+    monkeypatch.setattr(file_parser, "OUTPUT_DIR", str(tmp_path))
+    rows = [{"filename": "/app/m.py", "extension": ".py", "category": "code",
+             "last_modified": "2024-01-10T10:00:00", "isFile": True}]
+    options = {"export_formats": "ndjson", "export_tables": ["projects", "files"], "export_name": "run"}
+
+    analyze_projects(rows, {}, options, renderer=BufferedRenderer(width=80))
+    assert sorted(os.listdir(tmp_path)) == ["run_files.ndjson", "run_projects.ndjson"]
+    assert "saved file to" in capsys.readouterr().out
+
+    analyze_projects(rows, {}, options, renderer=NullRenderer())
+    assert "run-2_projects.ndjson" in os.listdir(tmp_path)
+    assert capsys.readouterr().out == ""
+
+    with pytest.raises(ValueError):
+        export_options({"export_formats": ["xlsx"]})
@@ -2,7 +2,7 @@ import pytest
 import json
 import os
 from unittest.mock import patch, mock_open
-from metadata_extractor import load_filters, base_extraction
+from metadata_extractor import load_filters, base_extraction, count_lines
 
 
 # ---------- load_filters TESTS ----------
@@ -217,3 +217,16 @@ def test_base_extraction_no_filters(mock_load_filters, capsys):
     # Since filters are empty, no files should be extracted
     assert result == []
 
+
+
+# ---------- count_lines TESTS ----------
+
+def test_count_lines(tmp_path):
+    """SCENARIO: Files with and without a trailing newline, an empty file and a missing one
+       EXPECTED: Every line is counted once; missing files give None"""
+    (tmp_path / "a.py").write_bytes(b"x = 1\ny = 2\n")
+    (tmp_path / "b.py").write_bytes(b"x = 1\ny = 2")
+    (tmp_path / "c.py").write_bytes(b"")
+
+    assert [count_lines(str(tmp_path / n)) for n in ("a.py", "b.py", "c.py")] == [2, 2, 0]
+    assert count_lines(str(tmp_path / "missing.py")) is None
@@ -0,0 +1,103 @@
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+import git_backend
+from conftest import commit_all, git, init_repo
+from git_backend import GitBackend, InvalidRepositoryError
+from repository_extractor import analyze_repo_type
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = init_repo(tmp_path / "repo")
+    for i in range(3):
+        (root / f"f{i}.txt").write_text(f"line {i}\n")
+        commit_all(root, f"c{i}")
+    return root
+
+
+def test_branches_from_loose_and_packed_refs(repo):
+    """
+    SCENARIO: Some branches are packed into packed-refs, others are loose files
+    EXPECTED: All local branches are listed (no tags/remotes), loose refs win
+    """
+    git(repo, "branch", "feature/a")
+    git(repo, "tag", "v1")
+    git(repo, "pack-refs", "--all")
+    git(repo, "branch", "dev", "HEAD~1")
+
+    backend = GitBackend(str(repo))
+
+    assert backend.branches() == ["dev", "feature/a", "main"]
+    assert backend.refs("refs/heads/")["refs/heads/dev"] == git(repo, "rev-parse", "HEAD~1")
+    assert "refs/tags/v1" in backend.refs()
+
+
+def test_object_lookups_share_one_process(repo):
+    """
+    SCENARIO: Many object lookups, including unknown names, through one backend
+    EXPECTED: Answers come back in order and only one process per mode is started
+    """
+    head = git(repo, "rev-parse", "HEAD")
+    real_popen = subprocess.Popen
+    started = []
+
+    def spy(cmd, **kwargs):
+        started.append(cmd[-1])
+        return real_popen(cmd, **kwargs)
+
+    with patch.object(git_backend.subprocess, "Popen", side_effect=spy), GitBackend(str(repo)) as backend:
+        names = [head, "HEAD~1", "0" * 40, "HEAD:f0.txt"] * 50
+        infos = backend.info_many(names)
+        objects = backend.read_many(names)
+        commits = backend.read_commits(["HEAD", "HEAD~2"])
+
+    assert started == ["--batch-check", "--batch"]
+    assert [i[2] for i in infos[:4]] == ["commit", "commit", None, "blob"]
+    assert objects[3][3] == b"line 0\n"
+    assert objects[2] == (names[2], None, None, None)
+    assert commits[0]["sha"] == head
+    assert commits[0]["parents"] == [git(repo, "rev-parse", "HEAD~1")]
+    assert commits[1]["parents"] == []
+
+
+def test_one_backend_serves_history_and_ownership(repo):
+    """
+    SCENARIO: A repository on disk is analyzed without, then with ownership
+    EXPECTED: The history alone starts no cat-file; with ownership the history's backend is
+              reused, so one backend and at most one cat-file process per mode serve the repo
+    """
+    real_popen = subprocess.Popen
+    started = []
+
+    def spy(cmd, **kwargs):
+        started.append(cmd)
+        return real_popen(cmd, **kwargs)
+
+    entry = {"filename": str(repo / ".git") + "/", "extension": ".git", "isFile": False}
+    with patch.object(git_backend.subprocess, "Popen", side_effect=spy):
+        result = analyze_repo_type(entry)
+    assert result["branch_count"] == 1 and sum(c["commit_count"] for c in result["contributors"]) == 3
+    assert started and not [cmd for cmd in started if "cat-file" in cmd]
+
+    started.clear()
+    with patch.object(git_backend.subprocess, "Popen", side_effect=spy), \
+         patch("repository_extractor.GitBackend", side_effect=GitBackend) as backends, \
+         patch("ownership.GitBackend", side_effect=AssertionError("second backend")):
+        result = analyze_repo_type(entry, ownership=True)
+
+    modes = [cmd[-1] for cmd in started if "cat-file" in cmd]
+    assert backends.call_count == 1
+    assert modes and len(modes) == len(set(modes))
+    assert sum(c["ownership_percentage"] for c in result["contributors"]) == 100.0
+
+
+def test_rejects_non_repository(tmp_path):
+    """
+    SCENARIO: The directory has no git metadata
+    EXPECTED: InvalidRepositoryError
+    """
+    with pytest.raises(InvalidRepositoryError):
+        GitBackend(str(tmp_path))
@@ -0,0 +1,68 @@
+import pytest
+
+from conftest import commit_all, git, init_repo
+from git_history import iter_git_log, parse_git_log
+
+
+RAW_LOG = (
+    b"\x1e" + b"a" * 40 + b"\x1fdev@example.com\x1f1700000000\x1f1700000000\x1f" + b"b" * 40 + b" " + b"c" * 40 + b"\0"
+    b"\x1e" + b"b" * 40 + b"\x1fdev@example.com\x1f1680000000\x1f1690000000\x1f\0"
+    b"\n3\t1\tsrc/app.py\0-\t-\timg/logo.png\0" + b"12\t0\tdocs/read me.md\0"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(RAW_LOG)])
+def test_parse_git_log_handles_any_chunking(chunk_size):
+    """
+    SCENARIO: Raw `git log` output arrives split at arbitrary byte offsets
+    EXPECTED: The same commit records are produced regardless of chunk size
+    """
+    chunks = [RAW_LOG[i:i + chunk_size] for i in range(0, len(RAW_LOG), chunk_size)]
+    commits = list(parse_git_log(chunks))
+
+    assert [c["sha"] for c in commits] == ["a" * 40, "b" * 40]
+    merge, root = commits
+    assert merge["parent_count"] == 2
+    assert merge["files"] == {}
+    assert root["parent_count"] == 0
+    assert root["committed_date"] == 1690000000
+    assert root["files"] == {
+        "src/app.py": (3, 1),
+        "img/logo.png": (0, 0),          # binary → 0/0 like GitPython
+        "docs/read me.md": (12, 0),
+    }
+
+
+def test_iter_git_log_reads_real_repository(tmp_path):
+    """
+    SCENARIO: A small repository with a branch and a merge commit
+    EXPECTED: One record per commit; the merge is diffed against its first parent
+    """
+    init_repo(tmp_path)
+    (tmp_path / "a.py").write_text("1\n2\n")
+    commit_all(tmp_path, "first")
+    git(tmp_path, "checkout", "-qb", "feature")
+    (tmp_path / "b.py").write_text("x\n")
+    commit_all(tmp_path, "feature", email="other@example.com")
+    git(tmp_path, "checkout", "-q", "main")
+    (tmp_path / "a.py").write_text("1\n3\n")
+    commit_all(tmp_path, "edit")
+    git(tmp_path, "merge", "-q", "--no-edit", "feature")
+
+    commits = list(iter_git_log(str(tmp_path)))
+
+    assert len(commits) == 4
+    merge = next(c for c in commits if c["parent_count"] == 2)
+    assert merge["files"] == {"b.py": (1, 0)}
+    edit = next(c for c in commits if c["files"] == {"a.py": (1, 1)})
+    assert edit["author_email"] == "dev@example.com"
+    assert sum(c["author_email"] == "other@example.com" for c in commits) == 1
+
+
+def test_iter_git_log_raises_on_invalid_repo(tmp_path):
+    """
+    SCENARIO: The path is not a git repository
+    EXPECTED: RuntimeError carrying git's message
+    """
+    with pytest.raises(RuntimeError, match="git log failed"):
+        list(iter_git_log(str(tmp_path / "missing")))
@@ -0,0 +1,117 @@
+import os
+import zipfile
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+import git_history
+from commit_cache import CommitCache
+from conftest import commit_all, init_repo, repo_entry
+from history_filter import git_filter_args, history_filter_from_options, matches
+from repository_extractor import analyze_repo_type
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Commits in Jan, Feb and Mar 2024 by a@ and ba@ (an email that contains a@'s)."""
+    root = init_repo(tmp_path / "repo")
+    for n, (email, date) in enumerate([
+        ("a@example.com", "2024-01-10T12:00:00"),
+        ("ba@example.com", "2024-02-10T12:00:00"),
+        ("A@Example.com", "2024-02-20T12:00:00"),
+        ("ba@example.com", "2024-03-10T12:00:00"),
+    ]):
+        (root / "f.txt").write_text("x\n" * (n + 1))
+        commit_all(root, f"c{n}", email=email, date=date)
+    return root
+
+
+def test_options_parsing():
+    """
+    SCENARIO: Dates as ISO strings / epoch seconds and authors as a comma separated string
+    EXPECTED: Epoch bounds (date-only until covers the whole day) and lowercased, deduplicated authors
+    """
+    flt = history_filter_from_options({"since": "2024-02-01", "until": "2024-02-29", "authors": "B@x.com, a@x.com,b@x.com"})
+    assert flt == {
+        "since": int(datetime(2024, 2, 1).timestamp()),
+        "until": int(datetime(2024, 2, 29, 23, 59, 59).timestamp()),
+        "authors": ["a@x.com", "b@x.com"],
+    }
+    assert history_filter_from_options({"since": 1700000000}) == {"since": 1700000000}
+    assert history_filter_from_options({"since": "", "authors": []}) is None
+    assert git_filter_args(None) == []
+    with pytest.raises(ValueError):
+        history_filter_from_options({"until": "last tuesday"})
+
+
+def test_matches_is_inclusive_and_case_insensitive():
+    """
+    SCENARIO: Commits exactly on the bounds and with differently-cased emails
+    EXPECTED: Bounds are inclusive; emails match exactly, ignoring case
+    """
+    flt = {"since": 100, "until": 200, "authors": ["a@x.com"]}
+    assert matches(flt, {"committed_date": 100, "author_email": "A@X.com"})
+    assert matches(flt, {"committed_date": 200, "author_email": "a@x.com"})
+    assert not matches(flt, {"committed_date": 201, "author_email": "a@x.com"})
+    assert not matches(flt, {"committed_date": 150, "author_email": "ba@x.com"})
+
+
+def test_filter_pushed_down_to_git(repo):
+    """
+    SCENARIO: A February window for a@ is analyzed from disk
+    EXPECTED: git itself returns only the matching commit; contributors and duration follow it
+    """
+    flt = history_filter_from_options({"since": "2024-02-01", "until": "2024-02-29", "authors": ["a@example.com"]})
+
+    calls = []
+    real_log = git_history._stream_git
+
+    def spy(repo_root, args, stdin_lines=None):
+        calls.append(args)
+        return real_log(repo_root, args, stdin_lines)
+
+    with patch("git_history._stream_git", side_effect=spy):
+        result = analyze_repo_type(repo_entry(repo), history_filter=flt)
+
+    assert all("--author=<a@example.com>" in args for args in calls)
+    assert [c["name"] for c in result["contributors"]] == ["A@Example.com"]
+    assert result["contributors"][0]["commit_count"] == 1
+    assert result["duration_days"] == 1
+    assert result["history_filter"] == flt
+
+    window = analyze_repo_type(repo_entry(repo), history_filter=history_filter_from_options({"since": "2024-02-01"}))
+    assert sorted(c["name"] for c in window["contributors"]) == ["A@Example.com", "ba@example.com"]
+    assert window["duration_days"] == 30
+
+
+def test_cache_and_archive_paths_agree_with_git(tmp_path, repo):
+    """
+    SCENARIO: The same filter is applied through the commit cache and through the archive reader
+    EXPECTED: Both produce the same analysis as the plain git path
+    """
+    flt = history_filter_from_options({"until": "2024-02-15", "authors": ["a@example.com", "ba@example.com"]})
+    plain = analyze_repo_type(repo_entry(repo), history_filter=flt)
+
+    cache = CommitCache(str(tmp_path / "cache.db"))
+    cached = analyze_repo_type(repo_entry(repo), commit_cache=cache, history_filter=flt)
+    cache.close()
+
+    zip_path = tmp_path / "up.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for dirpath, _, filenames in os.walk(repo):
+            rel = os.path.relpath(dirpath, tmp_path)
+            zf.write(dirpath, rel + "/")
+            for name in filenames:
+                zf.write(os.path.join(dirpath, name), os.path.join(rel, name))
+    work_tree = tmp_path / "extracted" / "repo"
+    work_tree.mkdir(parents=True)
+    archived = analyze_repo_type(dict(repo_entry(work_tree), archive_path=str(zip_path), archive_member="repo/.git/"),
+                                 history_filter=flt)
+
+    assert [c["name"] for c in plain["contributors"]] == ["ba@example.com", "a@example.com"]
+    archived.pop("repo_root")
+    plain.pop("repo_root")
+    cached.pop("repo_root")
+    assert cached == plain
+    assert archived == plain
@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import patch
+
+from language_detector import get_language_detector, detect_language_from_snippet
+from language_model import LanguageModel, detect_language_from_model, extract_features, get_model
+from metadata_extractor import detect_language_by_content, detailed_extraction
+
+
+@pytest.mark.parametrize("filename, expected_lang, content", [
+    ("python_test.spoof", "Python", "import os\ndef main():\n    print('Hello')"),
+    ("fake_script.py",    "C",      "#include <stdio.h>\nint main() { printf(\"I am C code\"); }"),
+    ("shebang_bash",      "Shell",  "#!/bin/bash\necho 'Hello'"),
+    ("sql_strict.txt",    "SQL",    "SELECT * FROM users WHERE id = 1;"),
+    ("false_positive.txt", None,    "class Summary of the meeting\n - Point 1"),
+    ("sql_weak.txt",      None,     "Please SELECT one option."),
+])
+def test_model_engine_detection(tmp_path, filename, expected_lang, content):
+    """
+    SCENARIO: Files are sniffed with the shipped statistical model
+    EXPECTED: Same answers as the regex engine on clear-cut and prose cases
+    """
+    file_path = tmp_path / filename
+    file_path.write_text(content, encoding="utf-8")
+
+    assert detect_language_by_content(str(file_path), engine="model") == expected_lang
+
+
+def test_get_language_detector_selects_engine():
+    """
+    SCENARIO: Engine names are resolved to detector functions
+    EXPECTED: "model" gives the model engine, anything else the regex engine
+    """
+    assert get_language_detector("model") is detect_language_from_model
+    assert get_language_detector("regex") is detect_language_from_snippet
+    assert get_language_detector("unknown") is detect_language_from_snippet
+
+
+def test_train_save_load_round_trip(tmp_path):
+    """
+    SCENARIO: A model is trained from a tiny corpus, saved and loaded back
+    EXPECTED: The loaded arrays match and predictions are unchanged
+    """
+    corpus = tmp_path / "corpus"
+    (corpus / "Python").mkdir(parents=True)
+    (corpus / "Go").mkdir()
+    (corpus / "_none").mkdir()
+    (corpus / "Python" / "a.py").write_text("import os\ndef run(self):\n    return self.value\n")
+    (corpus / "Go" / "a.go").write_text("package main\nfunc main() {\n\tfmt.Println(x)\n}\n")
+    (corpus / "_none" / "a.txt").write_text("the meeting is on friday and the notes are in the folder\n")
+
+    model = LanguageModel.train(str(corpus))
+    out = tmp_path / "model.bin"
+    model.save(str(out))
+    loaded = LanguageModel.load(str(out))
+
+    assert loaded.labels == ["Go", "Python", "_none"]
+    assert loaded.vocab == model.vocab
+    assert list(loaded.table) == list(model.table)
+    assert loaded.predict("def run(self):\n    import os", ".py") == "Python"
+    assert loaded.predict("func main() {\n\tfmt.Println(y)\n}", "") == "Go"
+    assert loaded.predict("notes from the meeting on friday", ".txt") is None
+
+
+def test_packed_rows_score_like_the_float_table():
+    """
+    SCENARIO: A snippet is scored through the packed feature -> row index
+    EXPECTED: Every label's score matches the per-label sum over the float32 table
+    """
+    model = get_model()
+    features = extract_features("import os\nfrom x import y\ndef main():\n    print(main)", ".py")
+    index = {feat: i for i, feat in enumerate(model.vocab)}
+    n = len(model.vocab)
+
+    totals, known = model.scores(features)
+
+    assert known == sum(c for feat, c in features.items() if feat in index)
+    for j, prior in enumerate(model.priors):
+        expected = prior + sum(c * model.table[j * n + index[feat]] for feat, c in features.items() if feat in index)
+        assert totals[j] == pytest.approx(expected, abs=1e-4)
+    assert model.score_features(f for f, c in features.items() for _ in range(c)) == (totals, known)
+
+
+def test_load_rejects_foreign_file(tmp_path):
+    """
+    SCENARIO: The model path points at a file that is not a model
+    EXPECTED: ValueError is raised
+    """
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"not a model\n")
+    with pytest.raises(ValueError):
+        LanguageModel.load(str(bad))
+
+
+def test_detailed_extraction_passes_engine_option():
+    """
+    SCENARIO: advanced_options selects the model engine
+    EXPECTED: Content detection is called with engine="model"
+    """
+    extracted_data = [
+        {"filename": "/tmp/x/notes.txt", "extension": ".txt", "isFile": True,
+         "category": "documentation", "language": ""}
+    ]
+    options = {"programming_scan": True, "framework_scan": False, "language_engine": "model"}
+
+    with patch("metadata_extractor.detect_language_by_content", return_value="Python") as mock_detect:
+        detailed_extraction(extracted_data, options)
+
+    mock_detect.assert_called_once_with("/tmp/x/notes.txt", "model")
+    assert extracted_data[0]["language"] == "Python"
+    assert extracted_data[0]["category"] == "source_code"
@@ -1,6 +1,7 @@
-from unittest.mock import MagicMock
+from unittest.mock import ANY, MagicMock
 
 import main
+from print_utils import BufferedRenderer
 
 
 def test_orchestrator_basic_mode(monkeypatch):
@@ -22,8 +23,9 @@ def test_orchestrator_basic_mode(monkeypatch):
 
     assert not mock_advanced.called
     mock_analyze.assert_called_once_with(
-        ["fake/path/project.zip"], "basic", {}
+        ["fake/path/project.zip"], "basic", {}, renderer=ANY, export=True
     )
+    assert isinstance(mock_analyze.call_args.kwargs["renderer"], BufferedRenderer)
     mock_save.assert_called_once()
 
 
@@ -45,6 +47,6 @@ def test_orchestrator_advanced_mode(monkeypatch):
     main.orchestrator(main.UserConfig(consent=True))
 
     mock_analyze.assert_called_once_with(
-        ["fake/path/project.zip"], "advanced", {"programming_scan": True}
+        ["fake/path/project.zip"], "advanced", {"programming_scan": True}, renderer=ANY, export=True
     )
     mock_save.assert_called_once()
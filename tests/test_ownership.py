@@ -0,0 +1,133 @@
+import os
+import zipfile
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+
+import ownership
+from commit_cache import CommitCache
+from conftest import commit_all, init_repo, repo_entry
+from file_parser import check_file_validity
+from metadata_extractor import base_extraction, detailed_extraction, load_filters
+from ownership import ownership_index
+from repository_extractor import analyze_repo_type
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """a@ writes 3 lines of app.py, b@ rewrites one and adds notes.md (2 lines), c@ adds only a binary."""
+    root = init_repo(tmp_path / "repo")
+    (root / "app.py").write_text("one\ntwo\nthree\n")
+    commit_all(root, email="a@example.com")
+    (root / "app.py").write_text("one\nTWO\nthree\n")
+    (root / "notes.md").write_text("x\ny\n")
+    commit_all(root, email="b@example.com")
+    (root / "logo.png").write_bytes(b"\x89PNG\0\0\0")
+    commit_all(root, email="c@example.com")
+    return root
+
+
+def test_ownership_percentage_next_to_contribution(repo):
+    """
+    SCENARIO: Three contributors; one only ever committed a binary file
+    EXPECTED: Ownership follows surviving text lines (a: 2, b: 3), binaries are not blamed
+    """
+    assert ownership_index(str(repo)) == {"a@example.com": 2, "b@example.com": 3}
+
+    result = analyze_repo_type(repo_entry(repo), ownership=True)
+    by_name = {c["name"]: c for c in result["contributors"]}
+
+    assert by_name["a@example.com"]["ownership_percentage"] == 40.0
+    assert by_name["b@example.com"]["ownership_percentage"] == 60.0
+    assert by_name["c@example.com"]["ownership_percentage"] == 0.0
+    keys = list(by_name["a@example.com"])
+    assert keys.index("ownership_percentage") == keys.index("contribution_percentage") + 1
+
+    # off by default
+    assert "ownership_percentage" not in analyze_repo_type(repo_entry(repo))["contributors"][0]
+
+
+def test_rescan_only_reblames_changed_blobs(tmp_path, repo):
+    """
+    SCENARIO: Ownership is computed with a cache, then one file changes and it is computed again
+    EXPECTED: A rescan with no changes blames nothing; after the change only that file is blamed
+    """
+    cache = CommitCache(str(tmp_path / "cache.db"))
+    first = ownership_index(str(repo), cache)
+
+    with patch("ownership.blame_file", side_effect=AssertionError("re-blamed")):
+        assert ownership_index(str(repo), cache) == first
+
+    (repo / "notes.md").write_text("x\ny\nz\n")
+    commit_all(repo, email="a@example.com")
+
+    blamed = []
+    real_blame = ownership.blame_file
+
+    def spy(repo_root, head, path):
+        blamed.append(path)
+        return real_blame(repo_root, head, path)
+
+    with patch("ownership.blame_file", side_effect=spy):
+        assert ownership_index(str(repo), cache) == {"a@example.com": 3, "b@example.com": 3}
+    assert blamed == ["notes.md"]
+    cache.close()
+
+
+def _zip_repo(repo, zip_path):
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for dirpath, _, filenames in os.walk(repo):
+            rel = os.path.relpath(dirpath, repo.parent)
+            zf.write(dirpath, rel + "/")
+            for name in filenames:
+                zf.write(os.path.join(dirpath, name), os.path.join(rel, name))
+    return str(zip_path)
+
+
+def test_archive_backed_repo_is_blamed_from_a_bare_extraction(tmp_path, repo):
+    """
+    SCENARIO: The repo's .git only exists inside the uploaded zip
+    EXPECTED: Ownership matches the on-disk repo; only refs and objects are written out, to a
+              temporary bare repo that is removed again, and no .git lands in the work tree
+    """
+    zip_path = _zip_repo(repo, tmp_path / "up.zip")
+    work_tree = tmp_path / "extracted" / "repo"
+    work_tree.mkdir(parents=True)
+    entry = dict(repo_entry(work_tree), archive_path=zip_path, archive_member="repo/.git/")
+
+    real_extract = ownership.extracted_git_dir
+    written = []
+
+    @contextmanager
+    def spy(*args):
+        with real_extract(*args) as git_dir:
+            written.extend(sorted(os.listdir(git_dir)))
+            yield git_dir
+
+    with patch("repository_extractor.extracted_git_dir", spy):
+        result = analyze_repo_type(entry, ownership=True)
+
+    assert {c["name"]: c["ownership_percentage"] for c in result["contributors"]} == {
+        "a@example.com": 40.0, "b@example.com": 60.0, "c@example.com": 0.0,
+    }
+    assert set(written) <= {"HEAD", "config", "packed-refs", "refs", "objects"}
+    assert not (work_tree / ".git").exists()
+
+
+def test_uploaded_zip_gets_ownership_end_to_end(tmp_path, repo):
+    """
+    SCENARIO: A zipped repo is uploaded and scanned with ownership_scan on
+    EXPECTED: The upload keeps .git in the zip, and the repo's contributors still get
+              their ownership_percentage
+    """
+    file_list = check_file_validity(_zip_repo(repo, tmp_path / "up.zip"))
+    filters = load_filters()
+
+    detailed = detailed_extraction(base_extraction(file_list, filters), {"ownership_scan": True, "commit_cache": False}, filters)
+
+    [found] = detailed["projects"]
+    assert not os.path.exists(os.path.join(found["repo_root"], ".git"))
+    assert {c["name"]: c["ownership_percentage"] for c in found["contributors"]} == {
+        "a@example.com": 40.0, "b@example.com": 60.0, "c@example.com": 0.0,
+    }
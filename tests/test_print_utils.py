@@ -0,0 +1,67 @@
+import io
+import os
+from unittest.mock import patch
+
+from alternative_analysis import analyze_projects
+from print_utils import BufferedRenderer, NullRenderer, print_project_rankings
+
+SUMMARIES = [{"project": "app", "total_files": 2, "score": 9.5,
+              "per_contributor_scores": {"a@x": 5.0}, "per_contributor_pct": {"a@x": 100.0}}]
+
+
+class _CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def _files():
+    return [{"filename": f"/app/src/m{i}.py", "extension": ".py", "category": "code",
+             "last_modified": "2024-01-10T10:00:00", "isFile": True} for i in range(3)]
+
+
+def test_null_renderer_formats_nothing(capsys):
+    """
+    SCENARIO: A scan is analyzed with a NullRenderer (service layer)
+    EXPECTED: Same results as a rendered run, nothing written and the terminal size never queried
+    """
+    with patch("print_utils.shutil.get_terminal_size") as size:
+        headless = analyze_projects(_files(), {}, {}, write_csv=False, renderer=NullRenderer())
+    assert capsys.readouterr().out == ""
+    assert not size.called
+
+    rendered = analyze_projects(_files(), {}, {}, write_csv=False, renderer=BufferedRenderer(width=80))
+    assert "RANKED PROJECTS" in capsys.readouterr().out
+    assert repr(headless) == repr(rendered)
+
+
+def test_buffered_renderer_one_write_per_report():
+    """
+    SCENARIO: Several reports go through one BufferedRenderer
+    EXPECTED: The terminal width is read once and each report is written in a single write
+    """
+    stream = _CountingStream()
+    with patch("print_utils.shutil.get_terminal_size", return_value=os.terminal_size((200, 50))) as size:
+        renderer = BufferedRenderer(stream=stream)
+        renderer.project_rankings(SUMMARIES)
+        renderer.contributor_stats(SUMMARIES)
+        renderer.resume_summaries([])  # empty report: nothing written
+    assert size.call_count == 1
+    assert stream.writes == 2
+    assert all(line == "" or line.startswith(" ") for line in stream.getvalue().splitlines())
+
+
+def test_file_output_is_plain():
+    """
+    SCENARIO: A report is printed into a file
+    EXPECTED: Plain headings and uncentered lines
+    """
+    f = io.StringIO()
+    print_project_rankings(SUMMARIES, file=f)
+    lines = f.getvalue().splitlines()
+    assert lines[:3] == ["", "Ranked Projects", ""]
+    assert lines[3].startswith("Project") and lines[5].startswith("app")
@@ -0,0 +1,167 @@
+import time
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+import repository_extractor
+from conftest import commit_all, init_repo, repo_entry
+from repo_budget import StratifiedSampler, allocate, budget_from_options, sample_size
+from repository_extractor import analyze_repo_type
+
+
+@pytest.fixture
+def big_repo(tmp_path):
+    """30 commits by a@ and 10 by b@; every commit adds exactly 3 lines to a .py file."""
+    root = init_repo(tmp_path / "big")
+    for i in range(40):
+        email = "b@example.com" if i % 4 == 3 else "a@example.com"
+        (root / f"m{i}.py").write_text("x\ny\nz\n")
+        commit_all(root, f"c{i}", email=email, date=f"2020-01-01T00:00:{i:02d}")
+    return repo_entry(root)
+
+
+def test_budget_from_options_ignores_unset_limits():
+    """
+    SCENARIO: Advanced options with some, none or invalid budget keys
+    EXPECTED: Only positive limits are kept; no limits means no budget; non-numbers raise ValueError
+    """
+    assert budget_from_options({"max_commits": 100, "max_seconds": None, "skills_gen": True}) == {"max_commits": 100}
+    assert budget_from_options({"max_age_days": 0}) is None
+    assert budget_from_options(None) is None
+    with pytest.raises(ValueError):
+        budget_from_options({"max_commits": "5000"})
+
+
+def test_allocate_is_proportional_and_covers_every_stratum():
+    """
+    SCENARIO: A 10-commit sample over strata of 80, 15 and 5 commits
+    EXPECTED: Every stratum is represented, the rest is proportional, total is exact
+    """
+    counts = Counter({("a", 0): 80, ("b", 0): 15, ("c", 0): 5})
+
+    alloc = allocate(counts, 10)
+
+    assert sum(alloc.values()) == 10
+    assert alloc == {("a", 0): 7, ("b", 0): 2, ("c", 0): 1}
+    assert allocate(counts, 500) == dict(counts)
+
+
+def test_sampler_picks_exactly_the_allocation():
+    """
+    SCENARIO: Commits of one stratum are streamed past the sampler
+    EXPECTED: Exactly the allocated number are picked, spread through the stream
+    """
+    commits = [{"author_email": "a", "committed_date": 0} for _ in range(9)]
+    sampler = StratifiedSampler(Counter({("a", 0): 9}), 3)
+
+    picked = [i for i, c in enumerate(commits) if sampler.pick(c)]
+
+    assert picked == [2, 5, 8]
+    assert sampler.weight(commits[0]) == 3.0
+
+
+def test_over_commit_budget_samples_and_extrapolates(big_repo):
+    """
+    SCENARIO: A 40-commit repo is analyzed with max_commits=10
+    EXPECTED: Counts/authors stay exact, LOC is extrapolated from 10 sampled commits
+    """
+    full = analyze_repo_type(big_repo)
+    sampled = analyze_repo_type(big_repo, budget={"max_commits": 10})
+
+    assert full["sampled"] is False and full["confidence"] == "exact"
+    assert sampled["sampled"] is True
+    assert sampled["sample_size"] == 10
+    assert sampled["budget_exceeded"] == ["max_commits"]
+    assert sampled["confidence"] == "low"  # 10 commits is below the medium threshold
+
+    assert sampled["authors"] == full["authors"]
+    for got, want in zip(sampled["contributors"], full["contributors"]):
+        assert got["commit_count"] == want["commit_count"]
+        assert got["contribution_percentage"] == want["contribution_percentage"]
+        # uniform commits: the extrapolation is exact
+        assert (got["insertions"], got["deletions"]) == (want["insertions"], want["deletions"])
+        assert set(got["files_edited"]) <= set(want["files_edited"])
+    assert sampled["duration_days"] == full["duration_days"]
+
+
+def test_within_budget_is_exact(big_repo):
+    """
+    SCENARIO: All limits are comfortably above the repo's size
+    EXPECTED: Same result as an unbudgeted analysis, marked exact
+    """
+    budget = {"max_commits": 1000, "max_age_days": 365, "max_seconds": 600}
+
+    assert analyze_repo_type(big_repo, budget=budget) == analyze_repo_type(big_repo)
+
+
+def test_budgeted_pass_skips_commits_touching_only_excluded_paths(tmp_path):
+    """
+    SCENARIO: A repo whose nested vendor/lib directory gets commits of its own, analyzed
+              with and without a (generous) budget
+    EXPECTED: Both leave out the vendor-only commits: same counts, authors and duration
+    """
+    root = init_repo(tmp_path / "app")
+    (root / "vendor" / "lib").mkdir(parents=True)
+    for i, (path, email) in enumerate([("app.py", "a@example.com"), ("vendor/lib/x.c", "b@example.com"),
+                                       ("app.py", "a@example.com"), ("vendor/lib/y.c", "b@example.com")]):
+        (root / path).write_text(f"{i}\n")
+        commit_all(root, f"c{i}", email=email, date=f"2020-01-{i * 9 + 1:02d}T00:00:00")
+    entry = dict(repo_entry(root), excluded_paths=["vendor/lib"])
+
+    full = analyze_repo_type(entry)
+    budgeted = analyze_repo_type(entry, budget={"max_commits": 1000})
+
+    assert [(c["name"], c["commit_count"]) for c in full["contributors"]] == [("a@example.com", 2)]
+    assert full["duration_days"] == 19  # Jan 1 - Jan 19, not the vendor-only Jan 28
+    assert budgeted == full
+
+
+def test_spent_time_budget_stops_every_pass(big_repo):
+    """
+    SCENARIO: The wall-time budget is already spent after the first commit
+    EXPECTED: max_seconds is a hard cap: even the header pass stops there, and the repo is partial
+    """
+    result = analyze_repo_type(big_repo, budget={"max_seconds": 1e-9})
+
+    assert result["sampled"] is True and result["partial"] is True
+    assert result["budget_exceeded"] == ["max_seconds"]
+    assert result["confidence"] == "low"
+    assert sum(c["commit_count"] for c in result["contributors"]) < 40
+
+
+def test_slow_full_pass_is_sampled_within_the_time_budget(big_repo):
+    """
+    SCENARIO: Reading numstats is slow (50ms per commit); the repo has a 1s budget
+    EXPECTED: The full pass gives up halfway through the budget, a sample sized for the time
+              left is read, counts stay exact and the whole analysis stays within the budget
+    """
+    real_log = repository_extractor.iter_git_log
+
+    def slow_log(*args, **kwargs):
+        for c in real_log(*args, **kwargs):
+            time.sleep(0.05)
+            yield c
+
+    start = time.monotonic()
+    with patch("repository_extractor.iter_git_log", side_effect=slow_log):
+        result = analyze_repo_type(big_repo, budget={"max_seconds": 1.0})
+    elapsed = time.monotonic() - start
+
+    assert result["sampled"] is True and result["partial"] is False
+    assert result["budget_exceeded"] == ["max_seconds"]
+    assert 0 < result["sample_size"] < 20
+    assert sum(c["commit_count"] for c in result["contributors"]) == 40
+    assert elapsed < 1.5
+
+
+def test_sample_size_is_a_fraction_capped_by_commits_and_time():
+    """
+    SCENARIO: Sample sizes for histories just over, far over and within a time-limited budget
+    EXPECTED: A fixed fraction (not max_commits) just over the limit; max_commits far over it;
+              never more than fits in half of the time left
+    """
+    assert sample_size({"max_commits": 5000}, 5001) == 1000
+    assert sample_size({"max_commits": 5000}, 10 ** 6) == 5000
+    assert sample_size({"max_age_days": 365}, 60) == 60
+    assert sample_size({"max_seconds": 10}, 10 ** 6, commits_per_second=50, seconds_left=4) == 100
@@ -1,6 +1,26 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from repository_extractor import analyze_repo_type
+from repository_extractor import RepoAccumulator, analyze_repo_type
+
+
+def _commit(email, parent_count=1, files=None, committed_date=1700000000):
+    """Commit record in the shape yielded by git_history.iter_git_log."""
+    return {
+        "sha": "0" * 40,
+        "author_email": email,
+        "committed_date": committed_date,
+        "parent_count": parent_count,
+        "files": files or {},
+    }
+
+
+def _backend(branches):
+    """GitBackend stand-in that lists the given branches."""
+    backend = MagicMock()
+    backend.__enter__.return_value = backend
+    backend.branches.return_value = branches
+    return backend
+
 
 def test_valid_git_repo_single_author_single_branch(monkeypatch):
     """
@@ -13,16 +33,11 @@ def test_valid_git_repo_single_author_single_branch(monkeypatch):
         "isFile": False
     }
 
-    mock_repo = MagicMock()
-    mock_commit = MagicMock()
-    mock_commit.author.email = "author@example.com"
-    mock_commit.parents = []
-
-    # Patch Repo to return the mock
-    with patch("repository_extractor.Repo", return_value=mock_repo):
-        mock_repo.iter_commits.return_value = [mock_commit]
-        mock_repo.branches = [MagicMock(name="main")]
+    commits = [_commit("author@example.com")]
 
+    # Patch the git backend (branches) and the git log stream (commits)
+    with patch("repository_extractor.GitBackend", return_value=_backend(["main"])), \
+         patch("repository_extractor.iter_git_log", return_value=iter(commits)):
         result = analyze_repo_type(repo_path)
 
         assert result is not None
@@ -45,19 +60,13 @@ def test_valid_git_repo_collaborative():
         "isFile": False
     }
 
-    mock_repo = MagicMock()
-    mock_commit1 = MagicMock()
-    mock_commit1.author.email = "author1@example.com"
-    mock_commit1.parents = []
-
-    mock_commit2 = MagicMock()
-    mock_commit2.author.email = "author2@example.com"
-    mock_commit2.parents = [MagicMock(), MagicMock()]  # two parents → merge commit
+    commits = [
+        _commit("author1@example.com"),
+        _commit("author2@example.com", parent_count=2),  # two parents → merge commit
+    ]
 
-    mock_repo.branches = [MagicMock(name="main"), MagicMock(name="dev")]
-    mock_repo.iter_commits.side_effect = lambda *args, **kwargs: [mock_commit1, mock_commit2]
-
-    with patch("repository_extractor.Repo", return_value=mock_repo):
+    with patch("repository_extractor.GitBackend", return_value=_backend(["main", "dev"])), \
+         patch("repository_extractor.iter_git_log", return_value=iter(commits)):
         result = analyze_repo_type(repo_path)
 
         assert result is not None
@@ -93,6 +102,83 @@ def test_git_repo_raises_exception(monkeypatch):
         "isFile": False
     }
 
-    with patch("repository_extractor.Repo", side_effect=Exception("Failed to open")):
+    with patch("repository_extractor.GitBackend", side_effect=Exception("Failed to open")):
         result = analyze_repo_type(repo_path)
         assert result is None
+
+
+def test_contributor_loc_aggregated_from_numstat():
+    """
+    SCENARIO: Commits carry per-file numstat
+    EXPECTED: Insertions/deletions are summed per author and per extension
+    """
+    repo_path = {
+        "filename": "/path/to/repo/.git/",
+        "extension": ".git",
+        "isFile": False
+    }
+    commits = [
+        _commit("a@example.com", files={"src/app.py": (10, 2), "README": (3, 0)}, committed_date=1700000000),
+        _commit("a@example.com", files={"src/app.py": (5, 5)}, committed_date=1700000000 + 13 * 86400),
+        _commit("b@example.com", files={"web/index.HTML": (7, 1)}, committed_date=1700000000 + 86400),
+    ]
+
+    with patch("repository_extractor.GitBackend", return_value=_backend([])), \
+         patch("repository_extractor.iter_git_log", return_value=iter(commits)):
+        result = analyze_repo_type(repo_path)
+
+    by_name = {c["name"]: c for c in result["contributors"]}
+    a = by_name["a@example.com"]
+    assert a["commit_count"] == 2
+    assert a["files_edited"] == ["README", "src/app.py"]
+    assert (a["insertions"], a["deletions"]) == (18, 7)
+    assert a["loc_by_type"][".py"] == {"insertions": 15, "deletions": 7}
+    assert a["loc_by_type"]["no_extension"] == {"insertions": 3, "deletions": 0}
+    assert by_name["b@example.com"]["loc_by_type"][".html"] == {"insertions": 7, "deletions": 1}
+    assert result["duration_days"] == 14
+    assert result["commit_frequency"] == "1.5 commits/week"
+
+
+def test_accumulator_single_pass_over_generator():
+    """
+    SCENARIO: Commits arrive as a one-shot generator with out-of-order dates
+    EXPECTED: One pass yields min/max dates, merge flag and per-author LOC totals
+    """
+    def stream():
+        yield _commit("a@x.com", files={"a.py": (3, 1)}, committed_date=500)
+        yield _commit("b@x.com", parent_count=2, committed_date=100)
+        yield _commit("a@x.com", files={"b.py": (2, 0), "README": (1, 1)}, committed_date=900)
+
+    acc = RepoAccumulator()
+    for c in stream():
+        acc.add(c)
+
+    assert (acc.total_commits, acc.first_date, acc.last_date) == (3, 100, 900)
+    assert acc.has_merges is True
+
+    a, b = acc.contributors()
+    assert (a["name"], a["commit_count"], a["contribution_percentage"]) == ("a@x.com", 2, 66.7)
+    assert a["files_edited"] == ["README", "a.py", "b.py"]
+    assert (a["insertions"], a["deletions"]) == (6, 2)
+    assert a["loc_by_type"] == {
+        ".py": {"insertions": 5, "deletions": 1},
+        "no_extension": {"insertions": 1, "deletions": 1},
+    }
+    assert b["files_edited"] == [] and b["loc_by_type"] == {}
+
+
+def test_commits_touching_only_excluded_paths_are_skipped():
+    """
+    SCENARIO: Some commits only touch a nested repo's directory, one touches both
+    EXPECTED: The nested-only commits add no commit, author, date or LOC; the mixed one counts
+    """
+    acc = RepoAccumulator(["vendor/lib"])
+    acc.add(_commit("a@x.com", files={"app.py": (4, 0)}, committed_date=500))
+    acc.add(_commit("b@x.com", files={"vendor/lib/x.c": (90, 0)}, committed_date=9000))
+    acc.add(_commit("a@x.com", files={"vendor/lib/y.c": (5, 5), "app.py": (1, 0)}, committed_date=900))
+    acc.add(_commit("a@x.com", files={"vendor/lib": (0, 0)}, committed_date=100))
+
+    assert (acc.total_commits, acc.first_date, acc.last_date) == (2, 500, 900)
+    [a] = acc.contributors()
+    assert (a["name"], a["commit_count"], a["contribution_percentage"]) == ("a@x.com", 2, 100.0)
+    assert (a["insertions"], a["files_edited"]) == (5, ["app.py"])
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import db
+from alternative_analysis import analyze_projects
+from api import _json_safe
+from print_utils import BufferedRenderer, NullRenderer
+from scan_result import ScanResult
+
+
+def _rows():
+    return [{"filename": f"/{proj}/m{i}{ext}", "extension": ext, "category": "code",
+             "last_modified": f"2024-0{1 + i}-10T10:00:00", "isFile": True}
+            for proj, ext in (("app", ".py"), ("site", ".js")) for i in range(3)]
+
+
+def test_sections_are_built_once_on_first_read():
+    """
+    SCENARIO: A ScanResult whose sections count how often they are built
+    EXPECTED: Nothing is built up front; each section is built once, on first read; Mapping methods work
+    """
+    calls = []
+    result = ScanResult({"a": lambda: calls.append("a") or 1, "b": lambda: calls.append("b") or 2})
+
+    assert calls == [] and len(result) == 2 and list(result) == ["a", "b"]
+    assert result["a"] == 1 and result["a"] == 1
+    assert calls == ["a"] and result.built() == ["a"]
+    assert dict(result) == {"a": 1, "b": 2} and result.get("c") is None and "b" in result
+    assert calls == ["a", "b"]
+
+
+def test_headless_callers_pay_only_for_what_they_read():
+    """
+    SCENARIO: A scan is analyzed with a NullRenderer and only the ranking is read
+    EXPECTED: No section is built by analyze_projects itself; reading the rankings builds only them,
+              and the lazily built sections match an eagerly rendered run
+    """
+    with patch("alternative_analysis._resume_summaries") as resume:
+        headless = analyze_projects(_rows(), {}, {}, write_csv=False, renderer=NullRenderer())
+        assert headless.built() == []
+        assert [p["project"] for p in headless["project_summaries"]] == ["app", "site"]
+        assert headless.built() == ["project_summaries"]
+        assert not resume.called
+
+    rendered = analyze_projects(_rows(), {}, {}, write_csv=False, renderer=BufferedRenderer(width=80))
+    assert set(rendered.built()) == {"project_summaries", "projects_chronological", "skills_chronological",
+                                     "resume_summaries", "directory_tree"}
+    assert dict(headless) == dict(rendered)
+
+
+def test_lazy_result_is_saved_and_serialized_like_a_dict(tmp_path):
+    """
+    SCENARIO: A lazy result goes through save_full_scan and the API's JSON conversion
+    EXPECTED: Both see every section
+    """
+    result = analyze_projects(_rows(), {}, {"skills_gen": False}, write_csv=False, renderer=NullRenderer())
+
+    payload = _json_safe({"results": result})["results"]
+    assert set(payload) == set(result)
+    assert payload["skills_chronological"] == []
+
+    db_path = str(tmp_path / "scans.db")
+    db.save_full_scan(result, "basic", False, db_path=db_path)
+    stored = db.get_full_scan_by_id(1, db_path=db_path)["scan_data"]
+    assert [p["project"] for p in stored["project_summaries"]] == ["app", "site"]
+    assert stored["scoring"] == payload["scoring"]
@@ -1,5 +1,13 @@
+import os
+import zipfile
 from unittest.mock import MagicMock
 
+import pytest
+
+import db
+from conftest import commit_all, init_repo
+from file_parser import check_file_validity
+from print_utils import BufferedRenderer, NullRenderer
 from services import scan_service
 
 
@@ -22,6 +30,66 @@ def test_analyze_scan_basic(monkeypatch):
     assert result == {"project_summaries": []}
     assert not mock_detailed.called
     mock_analyze.assert_called_once()
+    assert isinstance(mock_analyze.call_args.kwargs["renderer"], NullRenderer)
+    assert mock_analyze.call_args.kwargs["write_csv"] is False
+
+
+def test_headless_scan_exports_only_when_asked(monkeypatch):
+    """
+    SCENARIO: Scans run through the service layer with and without export options
+    EXPECTED: No export (and no section built for it) unless the options name formats or
+              tables, or the caller asks for it (the CLI does)
+    """
+    monkeypatch.setattr(scan_service, "load_filters", lambda: {})
+    monkeypatch.setattr(scan_service, "base_extraction", lambda files, filters: [{"filename": "a/b.py"}])
+    mock_analyze = MagicMock(return_value={"project_summaries": []})
+    monkeypatch.setattr(scan_service, "analyze_projects", mock_analyze)
+
+    for options, export, expected in [
+        ({}, None, False),
+        ({"export_formats": "ndjson"}, None, True),
+        ({"export_tables": ["projects"]}, None, True),
+        ({}, True, True),
+        ({"export_formats": "csv"}, False, False),
+    ]:
+        scan_service.analyze_scan(["x.zip"], "basic", options, export=export)
+        assert mock_analyze.call_args.kwargs["write_csv"] is expected, (options, export)
+
+
+def test_headless_advanced_scan_prints_nothing(tmp_path, capfd):
+    """
+    SCENARIO: An upload with a valid and a broken repo is scanned in advanced mode with two
+              repo workers, headless and then with the CLI's terminal renderer
+    EXPECTED: The headless scan writes nothing, in this process or in the workers; the
+              rendered scan shows the per-repo banners
+    """
+    upload = tmp_path / "upload"
+    app = init_repo(upload / "app")
+    (app / "main.py").write_text("print('app')\n")
+    commit_all(app)
+    (upload / "broken" / ".git").mkdir(parents=True)
+    (upload / "broken" / "notes.md").write_text("x\n")
+    zip_path = tmp_path / "upload.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for dirpath, _, filenames in os.walk(upload):
+            rel = os.path.relpath(dirpath, tmp_path)
+            zf.write(dirpath, rel + "/")
+            for name in filenames:
+                zf.write(os.path.join(dirpath, name), os.path.join(rel, name))
+    file_list = check_file_validity(str(zip_path))
+    options = {"commit_cache": False, "repo_workers": 2}
+    capfd.readouterr()
+
+    results = scan_service.analyze_scan(file_list, "advanced", options)
+
+    assert capfd.readouterr() == ("", "")
+    assert [p["project"] for p in results["project_summaries"] if p.get("repo_root")] == ["app"]
+
+    scan_service.analyze_scan(file_list, "advanced", options, renderer=BufferedRenderer(width=80))
+
+    out = capfd.readouterr().out
+    assert out.count("REPO ANALYZING") == 2
+    assert "REPO SKIPPED" in out
 
 
 def test_run_scan_persists(monkeypatch):
@@ -40,3 +108,35 @@ def test_run_scan_persists(monkeypatch):
 
     assert result == {"project_summaries": []}
     mock_save.assert_called_once_with({"project_summaries": []}, "basic", True)
+
+
+def test_rescore_scans_updates_stored_scans(tmp_path):
+    """
+    SCENARIO: Two stored scans, one saved before score features were persisted; both are rescored
+    EXPECTED: Scores and ranking follow the new weights for both, other scans' data is untouched
+    """
+    db_path = str(tmp_path / "scans.db")
+    summaries = [
+        {"project": "small", "total_files": 2, "score": 2.0, "per_contributor_pct": {"a@x": 100.0},
+         "score_features": {"volume": 2}},
+        {"project": "large", "total_files": 50, "score": 50.0, "per_contributor_pct": {},
+         "score_features": {"volume": 50}},
+    ]
+    db.save_full_scan({"project_summaries": summaries}, "basic", False, db_path=db_path)
+    legacy = [dict(p) for p in summaries]
+    for p in legacy:
+        del p["score_features"]
+    db.save_full_scan({"project_summaries": legacy}, "basic", False, db_path=db_path)
+    db.save_full_scan({"project_summaries": summaries}, "basic", False, db_path=db_path)
+
+    assert scan_service.rescore_scans([1, 2], score_caps={"volume": 10}, db_path=db_path) == [1, 2]
+
+    for summary_id in (1, 2):
+        data = db.get_full_scan_by_id(summary_id, db_path=db_path)["scan_data"]
+        assert [(p["project"], p["score"]) for p in data["project_summaries"]] == [("large", 10.0), ("small", 2.0)]
+        assert data["project_summaries"][1]["per_contributor_scores"] == {"a@x": 2.0}
+        assert data["scoring"]["caps"]["volume"] == 10
+    assert db.get_full_scan_by_id(3, db_path=db_path)["scan_data"]["project_summaries"][0]["project"] == "small"
+
+    with pytest.raises(ValueError):
+        scan_service.rescore_scans(score_weights={"volume": "lots"}, db_path=db_path)
@@ -0,0 +1,107 @@
+import copy
+import json
+
+import pytest
+
+from alternative_analysis import analyze_projects, rescore_results
+from print_utils import NullRenderer
+from scoring_utils import DEFAULT_CAPS, DEFAULT_WEIGHTS, FeatureTable, features_from_summary, ranking, scoring_params
+
+
+def _row(**overrides):
+    row = {"volume": 10, "activity": 25, "variety": 5.5, "duration": 30,
+           "collab": 1, "branch": 2, "merge": 0, "commit": 4.0}
+    row.update(overrides)
+    return row
+
+
+def test_scores_match_the_scalar_formula():
+    """
+    SCENARIO: Projects below and above every cap are scored as one table
+    EXPECTED: Each score equals the per-project weighted sum of capped features
+    """
+    table = FeatureTable()
+    table.append(_row())
+    table.append(_row(volume=500, duration=400, branch=9, commit=80.0, merge=1))
+    table.append({"volume": 1})  # missing features count as 0
+
+    scores = table.scores()
+
+    assert list(scores) == [
+        10 * 1.0 + 25 + 5.5 + min(30, 90) * 0.5 + 8 + min(2, 5) * 1.5 + 0 + min(4.0, 30) * 0.2,
+        60 * 1.0 + 25 + 5.5 + 90 * 0.5 + 8 + 5 * 1.5 + 5 + 30 * 0.2,
+        1.0,
+    ]
+    assert table.row(2) == dict.fromkeys(table.columns, 0.0) | {"volume": 1.0}
+
+
+def test_rescoring_with_other_weights_and_caps():
+    """
+    SCENARIO: The same table is ranked with the defaults, then with commits weighted heavily and uncapped
+    EXPECTED: The ranking flips without rebuilding the table; ties keep row order
+    """
+    table = FeatureTable()
+    table.append(_row(volume=40, commit=0.0))
+    table.append(_row(volume=10, commit=50.0))
+    table.append(_row(volume=40, commit=0.0))
+
+    assert ranking(table.scores()) == [0, 2, 1]
+
+    weights, caps = scoring_params({"score_weights": {"commit": 2.0}, "score_caps": {"commit": None}})
+    assert caps == dict(DEFAULT_CAPS, commit=None)
+    assert ranking(table.scores(weights, caps)) == [1, 0, 2]
+
+
+def test_unknown_feature_is_rejected():
+    """
+    SCENARIO: The options weight a feature that does not exist
+    EXPECTED: ValueError naming it
+    """
+    with pytest.raises(ValueError, match="stars"):
+        scoring_params({"score_weights": {"stars": 1.0}})
+
+
+def _scan():
+    """Two projects: 'big' wins on volume, 'busy' has a lot of commits; u@x works on both."""
+    files, repos = [], []
+    for name, count, cpw in (("big", 40, 0.0), ("busy", 5, 30.0)):
+        rows = [{"filename": f"/{name}/src/m{i}.py", "extension": ".py", "category": "code",
+                 "last_modified": "2024-01-10T10:00:00", "isFile": True} for i in range(count)]
+        files.extend(rows)
+        repos.append({"repo_name": name, "repo_root": f"/{name}", "commits_per_week": cpw, "files": rows,
+                      "contributors": [{"name": "u@x", "contribution_percentage": 50.0}]})
+    return analyze_projects(files, {}, {}, {"files": files, "projects": repos},
+                            write_csv=False, renderer=NullRenderer())
+
+
+def test_rescore_results_without_archives():
+    """
+    SCENARIO: Analysis results are rescored with the defaults, then with commits weighted heavily
+    EXPECTED: Defaults reproduce the analysis; new weights re-rank projects, contributor shares and résumé lines
+    """
+    results = dict(_scan())
+    assert [p["project"] for p in results["project_summaries"]] == ["big", "busy"]
+    before = copy.deepcopy(results)
+
+    assert rescore_results(copy.deepcopy(results)) == before
+
+    rescored = rescore_results(results, dict(DEFAULT_WEIGHTS, commit=10.0))
+    busy = rescored["project_summaries"][0]
+    assert busy["project"] == "busy"
+    assert busy["score"] == before["project_summaries"][1]["score"] + 30 * (10.0 - 0.2)
+    assert busy["per_contributor_scores"] == {"u@x": busy["score"] * 0.5}
+    assert [e["score"] for e in rescored["contributor_profiles"]["u@x"]["projects"] if e["name"] == "busy"] \
+        == [busy["score"] * 0.5]
+    assert rescored["resume_summaries"][0].startswith("Contributed to project 'busy'")
+    assert rescored["scoring"]["weights"]["commit"] == 10.0
+
+
+def test_features_rebuilt_for_older_scans():
+    """
+    SCENARIO: A stored summary from before score features were persisted
+    EXPECTED: Its features are rebuilt from the summary fields and give the same score
+    """
+    for p in _scan()["project_summaries"]:
+        stored = json.loads(json.dumps(p, default=str))
+        persisted = stored.pop("score_features")
+        assert features_from_summary(stored) == persisted
@@ -42,3 +42,20 @@ def test_language_detection(tmp_path, filename, expected_lang, content):
     detected = detect_language_by_content(str(file_path))
     
     assert detected == expected_lang
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_language_detection_on_raw_buffers(wrap):
+    """
+    Verifies that detection works on undecoded buffers (bytes / bytearray / memoryview)
+    and agrees with the str path, including for non-UTF-8 noise in the snippet.
+    """
+    from language_detector import detect_language_from_snippet
+
+    content = "#include <stdio.h>\n// caf\xe9\nint main() { return 0; }"
+    raw = content.encode("latin-1")
+
+    assert detect_language_from_snippet(wrap(raw), ".txt") == "C"
+    assert detect_language_from_snippet(content, ".txt") == "C"
+    assert detect_language_from_snippet(wrap(b"#!/usr/bin/env python\nx = 1"), "") == "Python"
+    assert detect_language_from_snippet(wrap(b"Please SELECT one option."), ".txt") is None
@@ -0,0 +1,121 @@
+"""
+Benchmark: regex heuristics vs. statistical model for language detection.
+
+Reports accuracy and time per snippet for each engine on a labelled sample set.
+
+Usage (from the project root):
+    python utils/bench_language_engines.py
+    python utils/bench_language_engines.py --samples path/to/labelled_dir --repeat 200
+
+A labelled directory follows the training corpus layout: <Label>/<files>,
+where the "_none" folder means "no language expected".
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from language_detector import LANGUAGE_ENGINES, get_language_detector
+from language_model import NONE_LABEL
+
+# Held-out snippets (not part of utils/language_corpus). Mirrors the spoofing /
+# polyglot cases in tests/test_spoof_advanced.py plus a few longer files.
+SAMPLES = [
+    ("python_test.spoof", "Python", "import os\ndef main():\n    print('Hello')"),
+    ("java_test.spoof", "Java", "package com.example;\npublic class Test {}"),
+    ("js_test.spoof", "JavaScript", "import React from 'react';\nconsole.log('JS Detected');"),
+    ("html_test.spoof", "HTML", "<!DOCTYPE html>\n<html><body><h1>Hello</h1></body></html>"),
+    ("fake_script.py", "C", "#include <stdio.h>\nint main() { printf(\"I am C code\"); }"),
+    ("fake_source.c", "Python", "import os\ndef main():\n    print('I am actually Python')"),
+    ("hidden_code.txt", "C", "#include <stdio.h>\nint main() { return 0; }"),
+    ("no_ext_python", "Python", "import sys\nprint('No extension')"),
+    ("shebang_bash", "Shell", "#!/bin/bash\necho 'Hello'"),
+    ("false_positive.txt", None, "class Summary of the meeting\n - Point 1"),
+    ("sql_strict.txt", "SQL", "SELECT * FROM users WHERE id = 1;"),
+    ("sql_weak.txt", None, "Please SELECT one option."),
+    ("typescript_check.ts", "TypeScript", "console.log('test');\nconst x: string = 'hello';"),
+    ("go_lang.go", "Go", "package main\nfunc main() {}"),
+    ("ruby_lang.rb", "Ruby", "def my_method\n  puts 'hello'\nend"),
+    ("php_short.php", "PHP", "<?= 'Hello' ?>"),
+    ("styles.css", "CSS", "nav ul {\n  list-style: none;\n  padding: 0;\n}\n"),
+    ("Widget.cs", "C#", "using System;\nclass Widget { public int Size { get; set; } }"),
+    ("vec.cc", "C++", "#include <vector>\nstd::vector<int> v;\nint main() { std::cout << v.size(); }"),
+    ("feed.xml", "XML", "<?xml version=\"1.0\"?>\n<rss><channel><title>t</title></channel></rss>"),
+    ("notes.md", None, "# Sprint review\n\nWe finished the login page and the export feature."),
+    (
+        "long_module.py",
+        "Python",
+        "\n".join(
+            ["import logging", "", "logger = logging.getLogger(__name__)", ""]
+            + [f"def handler_{i}(event):\n    logger.info('event %s', event)\n    return {{'ok': True}}\n" for i in range(40)]
+        ),
+    ),
+    (
+        "long_app.js",
+        "JavaScript",
+        "\n".join(
+            ["const express = require('express');", "const app = express();"]
+            + [f"app.get('/r{i}', (req, res) => {{ res.json({{ id: {i} }}); }});" for i in range(60)]
+        ),
+    ),
+]
+
+
+def load_labelled_dir(root):
+    samples = []
+    for label in sorted(os.listdir(root)):
+        label_dir = os.path.join(root, label)
+        if not os.path.isdir(label_dir):
+            continue
+        expected = None if label == NONE_LABEL else label
+        for name in sorted(os.listdir(label_dir)):
+            with open(os.path.join(label_dir, name), "r", encoding="utf-8", errors="ignore") as f:
+                samples.append((name, expected, f.read(4096)))
+    return samples
+
+
+def run(samples, repeat):
+    print(f"{'Engine':<8} {'Accuracy':>10} {'us/snippet':>12}")
+    print("-" * 32)
+    for engine in LANGUAGE_ENGINES:
+        detect = get_language_detector(engine)
+        # warm-up (loads the model file once)
+        detect("", "")
+
+        correct = 0
+        misses = []
+        for name, expected, content in samples:
+            got = detect(content, os.path.splitext(name)[1])
+            if got == expected:
+                correct += 1
+            else:
+                misses.append((name, expected, got))
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for name, _, content in samples:
+                detect(content, os.path.splitext(name)[1])
+        elapsed = time.perf_counter() - start
+        per_snippet = elapsed / (repeat * len(samples)) * 1e6
+
+        print(f"{engine:<8} {correct / len(samples):>9.1%} {per_snippet:>12.1f}")
+        for name, expected, got in misses:
+            print(f"    miss: {name:<22} expected={expected} got={got}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", help="labelled directory (<Label>/<files>) to evaluate instead of the built-in set")
+    parser.add_argument("--repeat", type=int, default=100, help="timing repetitions over the sample set")
+    args = parser.parse_args()
+
+    samples = load_labelled_dir(args.samples) if args.samples else SAMPLES
+    print(f"{len(samples)} labelled snippets, {args.repeat} timing passes\n")
+    run(samples, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Sample.App
+{
+    public class Program
+    {
+        public static void Main(string[] args)
+        {
+            var items = new List<string> { "a", "b" };
+            foreach (var item in items.Where(i => i.Length > 0))
+            {
+                Console.WriteLine(item);
+            }
+        }
+
+        public string Name { get; set; }
+
+        private async Task<int> LoadAsync()
+        {
+            await Task.Delay(10);
+            return 1;
+        }
+    }
+}
@@ -0,0 +1,32 @@
+#include <iostream>
+#include <vector>
+#include <string>
+
+namespace app {
+
+template <typename T>
+class Stack {
+public:
+    void push(const T& value) { items_.push_back(value); }
+    T pop() {
+        T v = items_.back();
+        items_.pop_back();
+        return v;
+    }
+    bool empty() const { return items_.empty(); }
+private:
+    std::vector<T> items_;
+};
+
+}  // namespace app
+
+int main() {
+    app::Stack<std::string> s;
+    s.push("hello");
+    std::cout << s.pop() << std::endl;
+    auto values = std::vector<int>{1, 2, 3};
+    for (const auto& v : values) {
+        std::cout << v << "\n";
+    }
+    return 0;
+}
@@ -0,0 +1,21 @@
+#pragma once
+#include <memory>
+
+using namespace std;
+
+class Shape {
+public:
+    virtual ~Shape() = default;
+    virtual double area() const = 0;
+};
+
+class Circle : public Shape {
+public:
+    explicit Circle(double r) : r_(r) {}
+    double area() const override { return 3.14159 * r_ * r_; }
+private:
+    double r_;
+};
+
+unique_ptr<Shape> make_circle(double r) { return make_unique<Circle>(r); }
+int read() { int x; cin >> x; cout << x; return x; }
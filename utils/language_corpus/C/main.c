@@ -0,0 +1,32 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#define MAX_LEN 256
+
+typedef struct node {
+    int value;
+    struct node *next;
+} node_t;
+
+static node_t *push(node_t *head, int value) {
+    node_t *n = malloc(sizeof(node_t));
+    if (n == NULL) {
+        return head;
+    }
+    n->value = value;
+    n->next = head;
+    return n;
+}
+
+int main(int argc, char **argv) {
+    char buf[MAX_LEN];
+    node_t *list = NULL;
+    for (int i = 1; i < argc; i++) {
+        list = push(list, atoi(argv[i]));
+    }
+    strncpy(buf, "done", MAX_LEN);
+    printf("%s\n", buf);
+    free(list);
+    return 0;
+}
@@ -0,0 +1,9 @@
+#ifndef UTIL_H
+#define UTIL_H
+
+#include "config.h"
+
+unsigned int hash(const char *s);
+void *xmalloc(size_t n);
+
+#endif /* UTIL_H */
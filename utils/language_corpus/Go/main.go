@@ -0,0 +1,26 @@
+package main
+
+import (
+	"fmt"
+	"net/http"
+	"os"
+)
+
+type Server struct {
+	Addr string
+}
+
+func (s *Server) Start() error {
+	http.HandleFunc("/", func(w http.ResponseWriter, r *http.Request) {
+		fmt.Fprintf(w, "ok")
+	})
+	return http.ListenAndServe(s.Addr, nil)
+}
+
+func main() {
+	s := &Server{Addr: ":8080"}
+	if err := s.Start(); err != nil {
+		fmt.Println(err)
+		os.Exit(1)
+	}
+}
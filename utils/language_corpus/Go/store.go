@@ -0,0 +1,27 @@
+package store
+
+import "sync"
+
+type Store struct {
+	mu    sync.Mutex
+	items map[string]int
+}
+
+func New() *Store {
+	return &Store{items: make(map[string]int)}
+}
+
+func (s *Store) Add(key string, n int) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.items[key] += n
+}
+
+func (s *Store) Keys() []string {
+	keys := []string{}
+	for k := range s.items {
+		keys = append(keys, k)
+	}
+	go func() {}()
+	return keys
+}
@@ -0,0 +1,27 @@
+package com.example.app;
+
+import java.util.ArrayList;
+import java.util.List;
+
+public class Main {
+    private final List<String> names = new ArrayList<>();
+
+    public static void main(String[] args) {
+        Main app = new Main();
+        for (String arg : args) {
+            app.add(arg);
+        }
+        System.out.println("Count: " + app.size());
+    }
+
+    public void add(String name) {
+        if (name == null) {
+            throw new IllegalArgumentException("name");
+        }
+        names.add(name);
+    }
+
+    public int size() {
+        return names.size();
+    }
+}
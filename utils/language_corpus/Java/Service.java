@@ -0,0 +1,26 @@
+package org.sample.service;
+
+import java.io.IOException;
+import java.util.Map;
+import java.util.HashMap;
+
+public interface Repository<T> {
+    T findById(long id) throws IOException;
+}
+
+@Override
+public String toString() {
+    return "Service{" + "cache=" + cache + '}';
+}
+
+public class Service implements Runnable {
+    private static final int LIMIT = 10;
+    protected Map<String, Integer> cache = new HashMap<>();
+
+    @Override
+    public void run() {
+        synchronized (this) {
+            cache.put("runs", cache.getOrDefault("runs", 0) + 1);
+        }
+    }
+}
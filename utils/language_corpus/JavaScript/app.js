@@ -0,0 +1,18 @@
+import React from 'react';
+import { useState } from 'react';
+
+const API_URL = 'https://example.com/api';
+
+function Counter(props) {
+  const [count, setCount] = useState(0);
+  return <button onClick={() => setCount(count + 1)}>{count}</button>;
+}
+
+async function loadItems() {
+  const res = await fetch(`${API_URL}/items`);
+  const data = await res.json();
+  console.log('loaded', data.length);
+  return data.map((item) => item.name);
+}
+
+export default Counter;
@@ -0,0 +1,18 @@
+#!/usr/bin/env node
+const express = require('express');
+const path = require('path');
+
+var app = express();
+let port = process.env.PORT || 3000;
+
+app.get('/', function (req, res) {
+  res.sendFile(path.join(__dirname, 'index.html'));
+});
+
+document.addEventListener('DOMContentLoaded', () => {
+  const el = document.getElementById('root');
+  el.innerHTML = '';
+});
+
+module.exports = app;
+app.listen(port, () => console.log(`listening on ${port}`));
@@ -0,0 +1,17 @@
+<?php
+namespace App\Controllers;
+
+use App\Models\User;
+
+class UserController extends Controller
+{
+    public function index($request)
+    {
+        $users = User::all();
+        foreach ($users as $user) {
+            echo $user->name . "<br>";
+        }
+        return view('users.index', ['users' => $users]);
+    }
+}
+?>
@@ -0,0 +1,13 @@
+<html>
+<body>
+<?= htmlspecialchars($title) ?>
+<?php
+$items = array(1, 2, 3);
+function render_item($item) {
+    return "<li>" . $item . "</li>";
+}
+echo implode("", array_map('render_item', $items));
+if (isset($_GET['q'])) { $q = $_GET['q']; }
+?>
+</body>
+</html>
@@ -0,0 +1,11 @@
+#!/usr/bin/perl
+use strict;
+use warnings;
+
+my %counts;
+my @lines = <STDIN>;
+foreach my $line (@lines) {
+    chomp $line;
+    $counts{$line}++;
+}
+print "$_: $counts{$_}\n" for sort keys %counts;
@@ -0,0 +1,32 @@
+import os
+import sys
+from collections import defaultdict
+
+
+class Inventory:
+    """Keeps track of items and quantities."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = defaultdict(int)
+
+    def add(self, item, qty=1):
+        if qty <= 0:
+            raise ValueError("quantity must be positive")
+        self.items[item] += qty
+
+    def total(self):
+        return sum(self.items.values())
+
+
+def main(argv=None):
+    argv = argv or sys.argv[1:]
+    inv = Inventory("store")
+    for arg in argv:
+        inv.add(arg)
+    print(f"{inv.name}: {inv.total()} items")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import json
+from pathlib import Path
+
+def load_config(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def flatten(rows):
+    return [x for row in rows for x in row]
+
+def find_files(root, suffix=".py"):
+    for p in Path(root).rglob("*" + suffix):
+        if p.is_file():
+            yield p
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+async def fetch(session, url):
+    async with session.get(url) as resp:
+        return await resp.text()
+
+lambda x: x * 2
+results = {k: v for k, v in enumerate(range(10)) if v % 2 == 0}
+assert isinstance(results, dict)
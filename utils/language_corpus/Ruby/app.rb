@@ -0,0 +1,25 @@
+require 'json'
+require_relative 'helper'
+
+module Shop
+  class Cart < Base
+    attr_reader :items
+
+    def initialize
+      @items = []
+    end
+
+    def add(item)
+      @items << item
+      self
+    end
+
+    def total
+      @items.map { |i| i[:price] }.sum
+    end
+  end
+end
+
+cart = Shop::Cart.new
+cart.add(price: 3).add(price: 4)
+puts cart.total
@@ -0,0 +1,14 @@
+#!/usr/bin/env ruby
+def greet(name)
+  puts "Hello, #{name}"
+end
+
+class Task
+  def run
+    [1, 2, 3].each do |n|
+      greet(n.to_s) unless n.nil?
+    end
+  end
+end
+
+Task.new.run if __FILE__ == $PROGRAM_NAME
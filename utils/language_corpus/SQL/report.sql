@@ -0,0 +1,9 @@
+SELECT u.name, COUNT(o.id) AS orders
+FROM users u
+LEFT JOIN orders o ON o.user_id = u.id
+WHERE o.created_at >= '2024-01-01'
+GROUP BY u.name
+ORDER BY orders DESC;
+
+UPDATE orders SET status = 'shipped' WHERE id = 10;
+DELETE FROM sessions WHERE expired = 1;
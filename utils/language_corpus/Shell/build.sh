@@ -0,0 +1,16 @@
+#!/bin/bash
+set -euo pipefail
+
+BUILD_DIR="${1:-build}"
+
+if [ ! -d "$BUILD_DIR" ]; then
+  mkdir -p "$BUILD_DIR"
+fi
+
+for f in src/*.txt; do
+  echo "copying $f"
+  cp "$f" "$BUILD_DIR/"
+done
+
+export PATH="$HOME/bin:$PATH"
+echo "done" > /dev/null 2>&1
@@ -0,0 +1,8 @@
+#!/bin/sh
+# deploy helper
+case "$1" in
+  start) echo "starting" ;;
+  stop)  echo "stopping" ;;
+  *)     echo "usage: $0 {start|stop}"; exit 1 ;;
+esac
+grep -q foo file.txt && echo found || true
@@ -0,0 +1,23 @@
+import { Injectable } from '@angular/core';
+
+export interface User {
+  id: number;
+  name: string;
+  active: boolean;
+}
+
+export type Maybe<T> = T | null;
+
+@Injectable()
+export class UserService {
+  private users: User[] = [];
+
+  add(user: User): void {
+    this.users.push(user);
+  }
+
+  find(id: number): Maybe<User> {
+    const found = this.users.find((u: User) => u.id === id);
+    return found ?? null;
+  }
+}
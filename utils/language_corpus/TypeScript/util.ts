@@ -0,0 +1,17 @@
+const greeting: string = 'hello';
+let total: number = 0;
+
+function sum(values: number[]): number {
+  return values.reduce((a: number, b: number) => a + b, 0);
+}
+
+enum Color { Red, Green, Blue }
+
+export function isReady(flag: boolean, data?: any): boolean {
+  console.log(greeting, data as string);
+  return flag && total >= 0;
+}
+
+interface Props {
+  readonly title: string;
+}